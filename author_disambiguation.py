@@ -0,0 +1,310 @@
+"""
+Author disambiguation for mentions without an OpenReview id.
+
+Mentions come from the author table (with their papers' co-authors and affiliations)
+and from the Reference.author strings (comma-separated or "Last, First" lists).
+They are grouped into blocks by normalized surname + first initial ("SMITH J").
+Within a block, only mention pairs sharing some evidence (email, co-author,
+affiliation) are scored, so the work grows with the number of mentions rather than
+with the square of a block's size.
+Matching pairs are merged with union-find; two different OpenReview ids are never merged.
+
+    python author_disambiguation.py              # print cluster statistics for the database
+    python author_disambiguation.py --no-references
+"""
+import re
+import argparse
+import logging
+from itertools import combinations
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from name_normalizer import clean, normalize
+
+logger = logging.getLogger(__name__)
+
+_REFERENCE_SPLIT_RE = re.compile(r"\s*(?:,|;|\band\b|&)\s*", re.IGNORECASE)
+# Separators between authors of a "Last, First" list, where commas are inside names
+_LAST_FIRST_SPLIT_RE = re.compile(r"\s*(?:;|\band\b|&)\s*", re.IGNORECASE)
+_INITIALS_RE = re.compile(r"^(?:[A-Z]\.?[\s-]*)+$")
+
+
+@dataclass
+class AuthorMention:
+    """One occurrence of an author name, with the evidence available around it."""
+
+    mention_id: str
+    name: str
+    author_id: Optional[str] = None  # OpenReview id when known
+    email: Optional[str] = None
+    coauthors: set = field(default_factory=set)  # raw co-author names
+    affiliations: set = field(default_factory=set)  # raw affiliation names
+
+
+@dataclass
+class AuthorCluster:
+    """Mentions resolved to one person; author_id is set when one of them carries an OpenReview id."""
+
+    author_id: Optional[str]
+    mention_ids: list
+
+
+def split_name(name: str) -> tuple[list[str], str]:
+    """
+    Split a display name into (given-name tokens, surname), cleaned.
+    Handles "First M. Last", "Last, First" and Vancouver-style "Last FM".
+    """
+    if "," in name:
+        surname, _, given = name.partition(",")
+        surname_tokens = clean(surname).split()
+        return clean(given).split(), surname_tokens[-1] if surname_tokens else ""
+    raw = name.split()
+    # "Hinton GE": trailing initials, at most three so an upper-case "Jian WANG" is left alone
+    # (a two-letter upper-case surname such as "Yang LI" is still read as initials)
+    if len(raw) > 1 and _INITIALS_RE.match(raw[-1]) and len(clean(raw[-1])) <= 3 and not _INITIALS_RE.match(raw[0]):
+        surname_tokens = clean(" ".join(raw[:-1])).split()
+        if surname_tokens:
+            return list(clean(raw[-1])), surname_tokens[-1]
+    tokens = clean(name.replace(".", ". ")).split()
+    if not tokens:
+        return [], ""
+    return tokens[:-1], tokens[-1]
+
+
+def blocking_key(name: str) -> Optional[str]:
+    """Normalized surname + first initial, e.g. "Jane A. Smith" -> "SMITH J"; None when unusable."""
+    given, surname = split_name(name)
+    if not surname:
+        return None
+    return f"{surname} {given[0][0]}" if given else surname
+
+
+def _first_names_compatible(a: list[str], b: list[str]) -> Optional[bool]:
+    """True for the same full first name, None when only initials agree, False on a conflict."""
+    if not a or not b:
+        return None
+    first_a, first_b = a[0], b[0]
+    if len(first_a) > 1 and len(first_b) > 1:
+        return True if first_a == first_b else False
+    return None if first_a[0] == first_b[0] else False
+
+
+class _Prepared:
+    """Normalized evidence of a mention, computed once."""
+
+    __slots__ = ("mention", "given", "email", "coauthor_keys", "affiliations")
+
+    def __init__(self, mention: AuthorMention):
+        self.mention = mention
+        self.given = split_name(mention.name)[0]
+        self.email = mention.email.strip().lower() if mention.email else None
+        self.coauthor_keys = {k for k in map(blocking_key, mention.coauthors) if k}
+        self.affiliations = {normalize(a) for a in mention.affiliations if a}
+
+
+class AuthorResolver:
+    """
+    Cluster author mentions.
+
+    Pair score: email match 1.0; each shared co-author 0.4 (at most 0.8); shared affiliation 0.4;
+    same full first name 0.3, matching initial only 0.1. Pairs scoring >= `threshold` are merged.
+    Conflicting full first names or OpenReview ids are never merged, not even through other mentions.
+    """
+
+    def __init__(self, threshold: float = 0.5, max_block_size: int = 5000, max_posting_size: int = 200):
+        self.threshold = threshold
+        # Blocks larger than this ("WANG Y") are split further by full first name
+        self.max_block_size = max_block_size
+        # Evidence shared by more mentions than this inside one block is not discriminative
+        self.max_posting_size = max_posting_size
+
+    def score(self, a: _Prepared, b: _Prepared) -> float:
+        names = _first_names_compatible(a.given, b.given)
+        if names is False:
+            return 0.0
+        if a.email and a.email == b.email:
+            return 1.0
+        score = 0.3 if names else 0.1
+        score += min(0.8, 0.4 * len(a.coauthor_keys & b.coauthor_keys))
+        if a.affiliations & b.affiliations:
+            score += 0.4
+        return score
+
+    def _blocks(self, prepared: list[_Prepared]) -> Iterable[list[int]]:
+        blocks = defaultdict(list)
+        for index, p in enumerate(prepared):
+            key = blocking_key(p.mention.name)
+            if key:
+                blocks[key].append(index)
+        for key, members in blocks.items():
+            if len(members) <= self.max_block_size:
+                yield members
+                continue
+            sub_blocks = defaultdict(list)
+            for index in members:
+                given = prepared[index].given
+                sub_blocks[given[0] if given else ""].append(index)
+            logger.info("Split block %s (%d mentions) into %d sub-blocks", key, len(members), len(sub_blocks))
+            # Initial-only mentions ("J") form their own sub-block here
+            yield from sub_blocks.values()
+
+    def _candidate_pairs(self, prepared: list[_Prepared], members: list[int]) -> set[tuple[int, int]]:
+        postings = defaultdict(list)
+        for index in members:
+            p = prepared[index]
+            if p.email:
+                postings[("email", p.email)].append(index)
+            for key in p.coauthor_keys:
+                postings[("coauthor", key)].append(index)
+            for affiliation in p.affiliations:
+                postings[("affiliation", affiliation)].append(index)
+        pairs = set()
+        for posting in postings.values():
+            if 1 < len(posting) <= self.max_posting_size:
+                pairs.update(combinations(posting, 2))
+        return pairs
+
+    def resolve(self, mentions: list[AuthorMention]) -> list[AuthorCluster]:
+        prepared = [_Prepared(m) for m in mentions]
+        parent = list(range(len(prepared)))
+        # OpenReview ids and full first names present in each cluster root; an initial-only
+        # mention must not bridge "Jane Smith" and "John Smith" into one cluster
+        ids = [{p.mention.author_id} if p.mention.author_id else set() for p in prepared]
+        first_names = [{p.given[0]} if p.given and len(p.given[0]) > 1 else set() for p in prepared]
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int):
+            ri, rj = find(i), find(j)
+            if ri == rj or (ids[ri] and ids[rj] and ids[ri] != ids[rj]):
+                return
+            # A shared OpenReview id outranks the first names ("Jon" / "Jonathan")
+            if not ids[ri] & ids[rj] and first_names[ri] and first_names[rj] and not first_names[ri] & first_names[rj]:
+                return
+            parent[rj] = ri
+            ids[ri] |= ids[rj]
+            first_names[ri] |= first_names[rj]
+
+        # The same OpenReview id is always one person
+        by_author_id = {}
+        for index, p in enumerate(prepared):
+            if p.mention.author_id:
+                union(by_author_id.setdefault(p.mention.author_id, index), index)
+
+        for members in self._blocks(prepared):
+            scored = [
+                (self.score(prepared[i], prepared[j]), i, j)
+                for i, j in self._candidate_pairs(prepared, members)
+            ]
+            # Strongest evidence first, so cannot-link conflicts keep the better merge
+            for score, i, j in sorted(scored, reverse=True):
+                if score >= self.threshold:
+                    union(i, j)
+
+        clusters = defaultdict(list)
+        for index in range(len(prepared)):
+            clusters[find(index)].append(index)
+        return [
+            AuthorCluster(
+                author_id=next(iter(ids[root]), None),
+                mention_ids=[prepared[i].mention.mention_id for i in members],
+            )
+            for root, members in clusters.items()
+        ]
+
+
+def split_reference_authors(author_string: str) -> list[str]:
+    """
+    Author names of a Reference.author string as "First Last".
+
+    "Smith, John; Doe, Jane", "Smith, J. and Doe, J." and "Smith, J., Doe, K., & Lee, M." are
+    "Last, First" lists and are reordered; anything else ("John Smith, Jane Doe and Bob Lee")
+    is split on commas, semicolons, "and" and "&". A lone "Smith, John" counts as one author
+    when the part before the comma is one word or the part after it is initials.
+    """
+    chunks = [c.strip(" ,") for c in _LAST_FIRST_SPLIT_RE.split(author_string)]
+    chunks = [c for c in chunks if c]
+    names = []
+    for chunk in chunks:
+        parts = [p.strip() for p in chunk.split(",")]
+        if not all(parts):
+            break
+        if len(parts) == 2 and (len(chunks) > 1 or len(parts[0].split()) == 1 or _INITIALS_RE.match(parts[1])):
+            names.append(f"{parts[1]} {parts[0]}")
+        elif len(parts) > 2 and len(parts) % 2 == 0 and all(_INITIALS_RE.match(p) for p in parts[1::2]):
+            names.extend(f"{first} {last}" for last, first in zip(parts[::2], parts[1::2]))
+        else:
+            break
+    else:
+        if names:
+            return names
+    return [n for n in _REFERENCE_SPLIT_RE.split(author_string) if n]
+
+
+def mentions_from_database(session, include_references: bool = True) -> list[AuthorMention]:
+    """
+    Build mentions for every author (with co-authors and affiliations from their papers)
+    and, optionally, for every name in Reference.author.
+    """
+    from models import Author, Affiliation, AuthorAffiliation, Reference, paper_author
+
+    authors = {
+        author_id: AuthorMention(mention_id=f"author:{author_id}", name=name, author_id=author_id, email=email)
+        for author_id, name, email in session.query(Author.author_id, Author.name, Author.email)
+    }
+    for author_id, affiliation in (
+        session.query(AuthorAffiliation.author_id, Affiliation.name)
+        .join(Affiliation, Affiliation.affiliation_id == AuthorAffiliation.affiliation_id)
+    ):
+        authors[author_id].affiliations.add(affiliation)
+
+    paper_authors = defaultdict(list)
+    for paper_id, author_id in session.query(paper_author.c.paper_id, paper_author.c.author_id):
+        paper_authors[paper_id].append(author_id)
+    for author_ids in paper_authors.values():
+        for author_id in author_ids:
+            authors[author_id].coauthors.update(
+                authors[other].name for other in author_ids if other != author_id
+            )
+
+    mentions = list(authors.values())
+    if include_references:
+        for reference_id, author_string in session.query(Reference.reference_id, Reference.author).filter(
+            Reference.author.isnot(None)
+        ):
+            names = split_reference_authors(author_string)
+            for position, name in enumerate(names):
+                mentions.append(
+                    AuthorMention(
+                        mention_id=f"reference:{reference_id}:{position}",
+                        name=name,
+                        coauthors={n for n in names if n != name},
+                    )
+                )
+    return mentions
+
+
+if __name__ == "__main__":
+    from db_manager import DBManager
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--no-references', action='store_true', help='only cluster the author table')
+    parser.add_argument('--threshold', type=float, default=0.5)
+    args = parser.parse_args()
+
+    session = DBManager().get_session()
+    try:
+        mentions = mentions_from_database(session, include_references=not args.no_references)
+    finally:
+        session.close()
+
+    clusters = AuthorResolver(threshold=args.threshold).resolve(mentions)
+    merged = [c for c in clusters if len(c.mention_ids) > 1]
+    print(f"{len(mentions)} mentions -> {len(clusters)} clusters ({len(merged)} with merges)")
+    for cluster in sorted(merged, key=lambda c: len(c.mention_ids), reverse=True)[:20]:
+        print(f"{cluster.author_id or '-':<30} {len(cluster.mention_ids):>5}  {', '.join(cluster.mention_ids[:5])}")
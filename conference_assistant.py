@@ -1,15 +1,16 @@
-import ast
-import pandas as pd
 from datetime import datetime
 
 from db_manager import DBManager
+from utility import load_metadata
 from repositories import (
     AuthorRepository,
     PaperRepository,
     KeywordRepository,
     ConferenceRepository,
-    ConferenceInstanceRepository
+    ConferenceInstanceRepository,
+    StatisticsRepository
 )
+from repositories.query_cache import ingest_generation
 
 class ConferenceAssistant:
     def __init__(
@@ -32,9 +33,10 @@ class ConferenceAssistant:
         self.website        = website
         self.category       = category
         self.description    = description
-        self.csv_file_path  = input_file
+        self.input_file     = input_file
         self.instance_id    = None
-        self.db_manager     = DBManager()
+        # Ingest reads back what it just wrote, so it stays on the primary
+        self.db_manager     = DBManager(reader_url=None)
 
     def upsert_conference(self):
         session = self.db_manager.get_session()
@@ -50,15 +52,19 @@ class ConferenceAssistant:
     def upsert_instance(self):
         session = self.db_manager.get_session()
         instance_repo = ConferenceInstanceRepository(session)
-        instance = instance_repo.upsert(
-            conference_id=self.conference_id,
-            name=self.conference,
-            year=self.year,
+        # Unresolved details are left out so they do not overwrite values stored earlier
+        details = dict(
             start_date=self.start_date,
             end_date=self.end_date,
             location=self.location,
             website=self.website
         )
+        instance = instance_repo.upsert(
+            conference_id=self.conference_id,
+            name=self.conference,
+            year=self.year,
+            **{key: value for key, value in details.items() if value is not None}
+        )
         self.instance_id = instance.instance_id
         session.close()
 
@@ -69,7 +75,10 @@ class ConferenceAssistant:
         paper_repo = PaperRepository(session)
         keyword_repo = KeywordRepository(session)
 
-        metadata = pd.read_csv(self.csv_file_path)
+        # CSV or Parquet; list columns come back as Python lists either way
+        metadata = load_metadata(self.input_file)
+        # Resolve every keyword of the file to its canonical keyword row in one batch, creating new ones
+        keyword_ids = keyword_repo.resolve_many(kw for keywords in metadata["keywords"] for kw in keywords)
         
         # Iterate through each row in the DataFrame
         for index, row in metadata.iterrows():
@@ -78,12 +87,9 @@ class ConferenceAssistant:
                 break
             
             # Extract data from the row
-            authorids = row["author_ids"]
-            author_ids = ast.literal_eval(authorids)
-            authornames = row["author_names"]
-            author_names = ast.literal_eval(authornames)
-            kws = row["keywords"]
-            keywords = ast.literal_eval(kws)
+            author_ids = row["author_ids"]
+            author_names = row["author_names"]
+            keywords = row["keywords"]
             
             # Upsert each author
             for i in range(len(author_ids)):
@@ -93,13 +99,6 @@ class ConferenceAssistant:
                     name=author_names[i]
                 )
             
-            # Upsert each keyword
-            for keyword in keywords:
-                print(f"Processing keyword {keyword}...")
-                keyword_repo.upsert(
-                    keyword=keyword
-                )
-            
             # Extract paper data
             paper_title = row['paper_title']
             venue = row['venue']
@@ -117,7 +116,7 @@ class ConferenceAssistant:
                 year=self.year,
                 instance_id=self.instance_id,
                 author_ids=author_ids,
-                keywords=keywords,
+                keyword_ids=[keyword_ids[kw] for kw in keywords if kw in keyword_ids],
                 abstract=abstract,
                 content=content,
                 venue=venue,
@@ -131,8 +130,17 @@ class ConferenceAssistant:
         session.close()
         print("Data loaded successfully.")
 
+    def refresh_statistics(self):
+        # Only the statistics rows of the instance just loaded are recomputed
+        session = self.db_manager.get_session()
+        StatisticsRepository(session).refresh_instance(self.instance_id)
+        session.close()
+
     def run(self):
         self.upsert_conference()
         self.upsert_instance()
         self.upsert_paper()
+        self.refresh_statistics()
+        # New data is committed; invalidate cached query results
+        ingest_generation.bump()
 
@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import lxml.html
+
+from http_cache import get_shared_session
+from config import CONFERENCE_WEBSITES, CONFERENCE_DATES_CACHE
+from models import Conference
+from repositories import ConferenceInstanceRepository
+
+logger = logging.getLogger(__name__)
+
+_MONTH = r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+_ORD = r"(?:st|nd|rd|th)?"
+_SEP = r"\s*(?:-|–|—|to|through|until)\s*"
+
+# "December 10 - 15, 2024", "Dec 9th through Dec 15th 2024"
+_MONTH_FIRST_RE = re.compile(
+    rf"(?P<m1>{_MONTH})\.?\s+(?P<d1>\d{{1,2}}){_ORD}{_SEP}(?:(?P<m2>{_MONTH})\.?\s+)?(?P<d2>\d{{1,2}}){_ORD},?\s+(?P<y>\d{{4}})",
+    re.IGNORECASE,
+)
+# "10-15 December 2024", "28 July - 2 August 2025"
+_DAY_FIRST_RE = re.compile(
+    rf"(?P<d1>\d{{1,2}}){_ORD}\s*(?:(?P<m1>{_MONTH})\.?\s*)?{_SEP}(?P<d2>\d{{1,2}}){_ORD}\s+(?P<m2>{_MONTH})\.?,?\s+(?P<y>\d{{4}})",
+    re.IGNORECASE,
+)
+# "held in Vancouver, Canada", "Location: Vienna, Austria"
+_LOCATION_RE = re.compile(
+    r"(?:\bheld\s+(?:in|at)|\btake\s+place\s+(?:in|at)|\bLocation\s*:)\s+(?:the\s+)?(?P<loc>[A-Z][\w'-]*(?:(?:,\s*|\s+)[A-Z][\w'-]*){0,5})"
+)
+
+
+@dataclass
+class InstanceDates:
+    conference: str
+    year: int
+    url: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    location: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _month(name: str) -> int:
+    return datetime.strptime(name[:3].title(), "%b").month
+
+
+def parse_conference_page(html: str, year: int) -> tuple:
+    """
+    Extract (start_date, end_date, location) from a conference website.
+    The first date range that falls in `year` wins; any part that cannot be found is None.
+    """
+    doc = lxml.html.fromstring(html)
+    for node in doc.xpath("//script|//style|//noscript"):
+        node.drop_tree()
+    text = re.sub(r"\s+", " ", doc.text_content())
+
+    start_date = end_date = None
+    for pattern in (_MONTH_FIRST_RE, _DAY_FIRST_RE):
+        for match in pattern.finditer(text):
+            if int(match["y"]) != year:
+                continue
+            m2 = _month(match["m2"] or match["m1"])
+            m1 = _month(match["m1"] or match["m2"])
+            try:
+                start_date = date(year, m1, int(match["d1"]))
+                end_date = date(year, m2, int(match["d2"]))
+            except ValueError:
+                continue
+            break
+        if start_date:
+            break
+
+    match = _LOCATION_RE.search(text)
+    location = match["loc"].strip(" ,.") if match else None
+    return start_date, end_date, location
+
+
+def conference_url(conference: str, year: int) -> Optional[str]:
+    """Website of a conference instance from CONFERENCE_WEBSITES, or None when the conference is unknown."""
+    template = CONFERENCE_WEBSITES.get(conference)
+    return template.format(year=year) if template else None
+
+
+class ConferenceDateScraper:
+    """
+    Resolves start/end dates and locations for many conference instances concurrently.
+    Successful results are cached in a JSON file keyed by URL, so re-runs only fetch new pages.
+    """
+
+    def __init__(self, max_workers: int = 8, cache_path: str = CONFERENCE_DATES_CACHE):
+        self.max_workers = max_workers
+        self.cache_path = cache_path
+        self.session = get_shared_session()
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f, indent=2)
+
+    def cached(self, conference: str, year: int, url: Optional[str] = None) -> Optional[InstanceDates]:
+        """The cached result for a conference instance, without any network access; None on a cache miss."""
+        url = url or conference_url(conference, year)
+        with self._lock:
+            cached = self._cache.get(url)
+        if not cached:
+            return None
+        return InstanceDates(
+            conference, year, url,
+            date.fromisoformat(cached["start_date"]) if cached["start_date"] else None,
+            date.fromisoformat(cached["end_date"]) if cached["end_date"] else None,
+            cached["location"],
+        )
+
+    def _resolve(self, conference: str, year: int, url: str) -> InstanceDates:
+        cached = self.cached(conference, year, url)
+        if cached:
+            return cached
+
+        result = InstanceDates(conference, year, url)
+        try:
+            response = self.session.get(url, timeout=30)
+            response.raise_for_status()
+            result.start_date, result.end_date, result.location = parse_conference_page(response.text, year)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            return result
+
+        if result.start_date:
+            with self._lock:
+                self._cache[url] = {
+                    "start_date": result.start_date.isoformat(),
+                    "end_date": result.end_date.isoformat(),
+                    "location": result.location,
+                }
+        else:
+            result.error = "no date range found on page"
+        return result
+
+    def resolve_many(self, targets: list[tuple]) -> list[InstanceDates]:
+        """
+        Resolve (conference, year) or (conference, year, url) targets concurrently.
+        Without an explicit url the site is looked up in CONFERENCE_WEBSITES.
+        """
+        jobs = []
+        for target in targets:
+            conference, year = target[0], int(target[1])
+            url = target[2] if len(target) > 2 else None
+            if url is None:
+                url = conference_url(conference, year)
+                if url is None:
+                    logger.warning("No website known for %s; skipping", conference)
+                    continue
+            jobs.append((conference, year, url))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda job: self._resolve(*job), jobs))
+
+        self._save_cache()
+        for result in results:
+            if result.error:
+                logger.warning("Could not resolve dates for %s %s (%s): %s",
+                               result.conference, result.year, result.url, result.error)
+        return results
+
+
+def upsert_instance_dates(session, results: list[InstanceDates]) -> list:
+    """
+    Write resolved dates to conference_instance in one transaction.
+    Results that failed to resolve, or whose conference is not in the database, are skipped.
+    """
+    names = {r.conference for r in results if not r.error}
+    conference_ids = dict(
+        session.query(Conference.name, Conference.conference_id)
+        .filter(Conference.name.in_(names))
+        .all()
+    )
+    instances = [
+        dict(
+            conference_id=conference_ids[r.conference],
+            name=r.conference,
+            year=r.year,
+            start_date=r.start_date,
+            end_date=r.end_date,
+            location=r.location,
+            website=r.url,
+        )
+        for r in results
+        if not r.error and r.conference in conference_ids
+    ]
+    return ConferenceInstanceRepository(session).upsert_many(instances)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--conferences', nargs='+', default=list(CONFERENCE_WEBSITES))
+    parser.add_argument('--years',       nargs='+', type=int, default=[datetime.now().year])
+    parser.add_argument('--store',       action='store_true', help='upsert resolved instances into the database')
+    args = parser.parse_args()
+
+    scraper = ConferenceDateScraper()
+    results = scraper.resolve_many([(c, y) for c in args.conferences for y in args.years])
+    for r in results:
+        print(json.dumps({**asdict(r), "start_date": str(r.start_date), "end_date": str(r.end_date)}))
+
+    if args.store:
+        from db_manager import DBManager
+        session = DBManager().get_session()
+        stored = upsert_instance_dates(session, results)
+        logger.info("Upserted %d conference instances", len(stored))
+        session.close()
@@ -1,6 +1,6 @@
+import os
 import yaml
 from pathlib import Path
-from datetime import datetime
 
 # 数据库配置
 DB_USER="postgres"
@@ -9,16 +9,57 @@ DB_HOST="localhost"
 DB_PORT="5432"
 DB_NAME="test_db"
 
-DATABASE_URL=f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# 可通过环境变量切换数据库，例如本地/嵌入式部署使用 DATABASE_URL=sqlite:///research.db
+DATABASE_URL=os.getenv("DATABASE_URL") or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# 只读副本（例如 Postgres standby）；设置后仓储的读查询走副本，写入及写入后的读取走主库
+DATABASE_READER_URL=os.getenv("DATABASE_READER_URL") or None
 
-# 会议信息 NeurIPS 2024
-START_DATE=datetime(2024, 12, 10)
-END_DATE=datetime(2024, 12, 15)
-LOCATION="Vancouver, Canada"
-WEBSITE="https://neurips.cc/virtual/2024/index.html"
+# 连接池配置（同一进程内按 URL 共享 engine）
+DB_POOL_SIZE=int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW=int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT=int(os.getenv("DB_POOL_TIMEOUT", 30))  # 秒
+DB_POOL_RECYCLE=int(os.getenv("DB_POOL_RECYCLE", 1800))  # 秒
+
+# SQL 日志与慢查询监控
+SQL_ECHO=os.getenv("SQL_ECHO", "0") == "1"  # 是否打印所有 SQL（仅调试用）
+SLOW_QUERY_MS=float(os.getenv("SLOW_QUERY_MS", 200))  # 超过该耗时的查询会连同参数记录到日志
+N_PLUS_ONE_THRESHOLD=int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))  # 单次请求内同一语句重复次数告警阈值
+QUERY_STATS=os.getenv("QUERY_STATS", "0") == "1"  # 是否按（语句, 调用位置）累计查询统计（每条语句都要遍历调用栈，调试用）
+QUERY_STATS_MAX_ENTRIES=int(os.getenv("QUERY_STATS_MAX_ENTRIES", 1000))  # 统计表最多保留的条目数，超出时淘汰最久未执行的
+
+# 仓储查询结果缓存：进程内 LRU + 可选磁盘缓存，按导入代数（ingest generation）失效
+QUERY_CACHE_SIZE=int(os.getenv("QUERY_CACHE_SIZE", 256))
+QUERY_CACHE_DIR=os.getenv("QUERY_CACHE_DIR")  # 为空则不启用磁盘缓存
+INGEST_GENERATION_FILE=os.getenv("INGEST_GENERATION_FILE", str(Path(__file__).parent/'.cache'/'ingest_generation'))
+
+# 机构名称规范化：可选的大型规范机构别名表（CSV，列为 alias,canonical），不存在则只使用 organizations.yaml 中的别名
+CANONICAL_INSTITUTIONS_FILE=os.getenv("CANONICAL_INSTITUTIONS_FILE", str(Path(__file__).parent/'data'/'canonical_institutions.csv'))
+
+# 关键字规范化：可选的关键字别名表（CSV，列为 alias,canonical），例如 LLM,large language model
+KEYWORD_ALIASES_FILE=os.getenv("KEYWORD_ALIASES_FILE", str(Path(__file__).parent/'data'/'keyword_aliases.csv'))
+
+# 论文向量化配置
+EMBEDDING_MODEL=os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")  # 768 维
+EMBEDDING_DIM=int(os.getenv("EMBEDDING_DIM", 768))
+EMBEDDING_BATCH_SIZE=int(os.getenv("EMBEDDING_BATCH_SIZE", 256))  # 每次调用向量模型的文本数
+EMBEDDING_STORE_DIR=os.getenv("EMBEDDING_STORE_DIR", str(Path(__file__).parent/'.cache'/'embeddings'))  # 内存映射向量文件目录，设为空则不启用
+
+# HTTP 缓存配置（OpenReview 与会议网站请求）
+HTTP_CACHE_DIR=os.getenv("HTTP_CACHE_DIR", str(Path(__file__).parent/'.http_cache'))
+HTTP_CACHE_TTL=int(os.getenv("HTTP_CACHE_TTL", 24*60*60))  # 秒
+
+# 会议默认分类与简介（取自 NeurIPS），日期与地点由 conference_dates.py 获取
 CATEGORY="machine learning, neuroscience, statistics, optimization, computer vision, natural language processing, life sciences, natural sciences, social sciences"
 DESCRIPTION="The Conference and Workshop on Neural Information Processing Systems is a machine learning and computational neuroscience conference held every December. Along with ICLR and ICML, it is one of the three primary conferences of high impact in machine learning and artificial intelligence research."
 
+# 会议官网模板，用于自动抓取会议日期和地点（见 conference_dates.py）
+CONFERENCE_WEBSITES={
+    "NeurIPS": "https://neurips.cc/Conferences/{year}",
+    "ICML": "https://icml.cc/Conferences/{year}",
+    "ICLR": "https://iclr.cc/Conferences/{year}",
+}
+CONFERENCE_DATES_CACHE=os.getenv("CONFERENCE_DATES_CACHE", str(Path(__file__).parent/'.http_cache'/'conference_dates.json'))
+
 
 # 追踪机构名单
 def load_organization_config() -> dict:
@@ -0,0 +1,49 @@
+"""
+Merge spelling variants of keywords and remap paper_keyword (migration 010 backfill).
+
+Keys every keyword (keyword_normalizer.canonical_key), merges rows sharing a key together
+with acronyms of unambiguous multi-word keywords, and rewrites paper_keyword in set-based
+statements; statistics tables are rebuilt afterwards. Safe to re-run, e.g. after editing
+KEYWORD_ALIASES_FILE.
+
+    python database_helper/canonicalize_keywords.py --dry-run
+    python database_helper/canonicalize_keywords.py
+    python database_helper/canonicalize_keywords.py --embedder sentence-transformers --threshold 0.95
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+# Add the parent directory to sys.path to access db_manager.py
+sys.path.append(str(Path(__file__).parents[1]))
+
+from db_manager import DBManager
+from repositories import KeywordRepository, StatisticsRepository
+from repositories.query_cache import ingest_generation
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dry-run', action='store_true', help='print the planned merges without writing')
+    parser.add_argument('--embedder', choices=['none', 'sentence-transformers'], default='none',
+                        help='also merge keywords with near-identical embeddings')
+    parser.add_argument('--threshold', type=float, default=0.95, help='cosine similarity for embedding merges')
+    args = parser.parse_args()
+
+    embedder = None
+    if args.embedder == 'sentence-transformers':
+        from embedding_pipeline import SentenceTransformerEmbedder
+        embedder = SentenceTransformerEmbedder()
+
+    session = DBManager(reader_url=None).get_session()
+    try:
+        stats = KeywordRepository(session).canonicalize_all(
+            embedder=embedder, threshold=args.threshold, dry_run=args.dry_run
+        )
+        if not args.dry_run:
+            StatisticsRepository(session).refresh_all()
+    finally:
+        session.close()
+    if not args.dry_run:
+        ingest_generation.bump()
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
@@ -0,0 +1,130 @@
+"""
+Check that every hot repository query can be served by an index (PostgreSQL).
+
+The repository methods are run against real rows of the database; every SELECT they emit
+is captured and re-run under EXPLAIN (FORMAT JSON). Sequential scans are disabled for the
+check session so that a query reported as "seq scan" really has no usable index, rather
+than the planner preferring a scan on a small table.
+
+    python database_helper/explain_check.py
+"""
+import sys
+import json
+from pathlib import Path
+# Add the parent directory to sys.path to access db_manager.py
+sys.path.append(str(Path(__file__).parents[1]))
+
+from sqlalchemy import event
+from db_manager import DBManager
+from models import Paper, Reference, Affiliation, Keyword, ConferenceInstance, Conference, Author
+from repositories import (
+    PaperRepository, ConferenceInstanceRepository, KeywordRepository, AffiliationRepository
+)
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def _scan_nodes(plan: dict):
+    """Yield (node type, relation, index) for every table or index scan of a JSON plan."""
+    node = plan.get("Node Type", "")
+    if node in INDEX_NODES or node == "Seq Scan":
+        yield node, plan.get("Relation Name"), plan.get("Index Name")
+    for child in plan.get("Plans", []):
+        yield from _scan_nodes(child)
+
+
+def _sample(session) -> dict:
+    paper = session.query(Paper).first()
+    instance = session.query(ConferenceInstance).first()
+    return {
+        "paper": paper,
+        "instance": instance,
+        "conference": session.query(Conference.name).scalar(),
+        "reference": session.query(Reference.title).scalar(),
+        "affiliation": session.query(Affiliation.name).scalar(),
+        "keyword": session.query(Keyword.keyword).scalar(),
+        "author": session.query(Author.author_id).scalar(),
+    }
+
+
+def _checks(session, s: dict) -> list:
+    """(label, callable) pairs mirroring the repository query paths."""
+    papers = PaperRepository(session)
+    instances = ConferenceInstanceRepository(session)
+    keywords = KeywordRepository(session)
+    affiliations = AffiliationRepository(session)
+    year = s["instance"].year if s["instance"] else None
+    return [
+        ("PaperRepository.upsert conflict target",
+         lambda: session.query(Paper).filter_by(instance_id=s["paper"].instance_id, title=s["paper"].title).first()),
+        ("PaperRepository._get_reference",
+         lambda: session.query(Reference).filter_by(title=s["reference"]).first()),
+        ("PaperRepository.get_papers_by_conference",
+         lambda: papers.get_papers_by_conference(s["conference"], year, profile="summary")),
+        ("PaperRepository.get_papers_by_organization",
+         lambda: papers.get_papers_by_organization(s["affiliation"], profile="summary")),
+        ("PaperRepository.get_papers_by_keyword",
+         lambda: papers.get_papers_by_keyword(s["keyword"], profile="keyword")),
+        ("ConferenceInstanceRepository.upsert lookup",
+         lambda: session.query(ConferenceInstance).filter_by(conference_id=s["instance"].conference_id, year=year).first()),
+        ("ConferenceInstanceRepository.get_conference_stats",
+         lambda: instances.get_conference_stats(s["conference"], year)),
+        ("ConferenceInstanceRepository.get_yearly_conference_stats",
+         lambda: instances.get_yearly_conference_stats(year)),
+        ("KeywordRepository.get_top_keywords_for_instance",
+         lambda: keywords.get_top_keywords_for_instance(s["instance"].instance_id)),
+        ("AffiliationRepository alias lookup",
+         lambda: session.query(Affiliation).filter(Affiliation.aliases.contains([s["affiliation"]])).first()),
+        ("AffiliationRepository.get_tracked_organizations",
+         lambda: affiliations.get_tracked_organizations()),
+        ("Author papers (reverse paper_author)",
+         lambda: session.query(Paper).join(Paper.author_to_paper).filter(Author.author_id == s["author"]).all()),
+    ]
+
+
+def main() -> int:
+    db_manager = DBManager(reader_url=None)
+    if db_manager.engine.dialect.name != "postgresql":
+        print(f"explain_check reads PostgreSQL plans; the configured database is {db_manager.engine.dialect.name}.")
+        return 1
+    session = db_manager.get_session()
+    sample = _sample(session)
+    if sample["paper"] is None or sample["instance"] is None:
+        print("The database has no papers yet; ingest a conference first.")
+        return 1
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    failures = 0
+    connection = session.connection()
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    event.listen(db_manager.engine, "before_cursor_execute", capture)
+    try:
+        for label, run in _checks(session, sample):
+            captured.clear()
+            run()
+            statements = list(captured)
+            captured.clear()
+            for statement, parameters in statements:
+                plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                for node, relation, index in _scan_nodes(plan[0]["Plan"]):
+                    ok = node in INDEX_NODES
+                    failures += not ok
+                    print(f"{'OK  ' if ok else 'SEQ '} {label:<55} {relation or '':<20} {node}"
+                          + (f" using {index}" if index else ""))
+    finally:
+        event.remove(db_manager.engine, "before_cursor_execute", capture)
+        session.rollback()
+        session.close()
+
+    print(f"\n{failures} scan(s) without an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Apply the versioned SQL migrations in database_helper/migrations in order.
+
+    python database_helper/migrate.py            # apply pending migrations
+    python database_helper/migrate.py --status   # list applied / pending versions
+    python database_helper/migrate.py --baseline # mark all versions applied without running them
+                                                 # (schemas built by DBManager.create_tables())
+
+Applied versions are recorded in the schema_migrations table; each file runs in its own transaction.
+The migrations are written for PostgreSQL. A SQLite database gets its whole schema, indexes
+included, from DBManager.create_tables(); run --baseline once on it instead of migrating.
+"""
+import sys
+import argparse
+from pathlib import Path
+# Add the parent directory to sys.path to access db_manager.py
+sys.path.append(str(Path(__file__).parents[1]))
+
+from sqlalchemy import text
+from db_manager import DBManager
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def _split_statements(sql: str) -> list[str]:
+    """
+    Split a migration file into statements, dropping -- and /* */ comments.
+    Comment markers and semicolons inside '...' strings, "..." identifiers and $$ ... $$ bodies
+    (DO blocks, functions) are left alone.
+    """
+    statements, current = [], []
+    i, n = 0, len(sql)
+    while i < n:
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end < 0 else end
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif sql[i] in "'\"" or sql.startswith("$$", i):
+            quote = "$$" if sql.startswith("$$", i) else sql[i]
+            end = sql.find(quote, i + len(quote))
+            end = n if end < 0 else end + len(quote)
+            current.append(sql[i:end])
+            i = end
+        elif sql[i] == ";":
+            statements.append("".join(current))
+            current = []
+            i += 1
+        else:
+            current.append(sql[i])
+            i += 1
+    statements.append("".join(current))
+    return [stmt.strip() for stmt in statements if stmt.strip()]
+
+
+def pending_migrations(connection) -> list[Path]:
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version VARCHAR(255) PRIMARY KEY,"
+        " applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    applied = {row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+    return [p for p in sorted(MIGRATIONS_DIR.glob("*.sql")) if p.stem not in applied]
+
+
+def migrate(db_manager: DBManager, status_only: bool = False, baseline: bool = False):
+    with db_manager.engine.begin() as connection:
+        pending = pending_migrations(connection)
+
+    if status_only:
+        for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            print(f"{'pending' if path in pending else 'applied'}  {path.stem}")
+        return
+
+    dialect = db_manager.engine.dialect.name
+    if pending and dialect != "postgresql" and not baseline:
+        sys.exit(
+            f"The migrations in {MIGRATIONS_DIR} are PostgreSQL-only and cannot run on {dialect}. "
+            "Build the schema with DBManager.create_tables(), then run "
+            "`python database_helper/migrate.py --baseline` to record the versions as applied."
+        )
+
+    if baseline:
+        # create_tables() already built the current schema from models.py
+        with db_manager.engine.begin() as connection:
+            for path in pending:
+                connection.execute(text("INSERT INTO schema_migrations (version) VALUES (:v)"), {"v": path.stem})
+                print(f"baseline {path.stem}")
+        return
+
+    for path in pending:
+        with db_manager.engine.begin() as connection:
+            for statement in _split_statements(path.read_text(encoding="utf-8")):
+                connection.execute(text(statement))
+            connection.execute(text("INSERT INTO schema_migrations (version) VALUES (:v)"), {"v": path.stem})
+        print(f"applied  {path.stem}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--status', action='store_true')
+    parser.add_argument('--baseline', action='store_true',
+                        help='record every pending migration as applied without running it')
+    args = parser.parse_args()
+    migrate(DBManager(), status_only=args.status, baseline=args.baseline)
@@ -0,0 +1,23 @@
+/*
+  Migration 001: B-tree indexes for the repository lookup paths
+  ------------------------
+  - paper (instance_id, title): PaperRepository.upsert 的查找条件，也覆盖按会议实例过滤论文
+  - conference_instance (conference_id, year): ConferenceInstanceRepository.upsert / get_conference_stats
+  - reference (title): ReferenceRepository.upsert / PaperRepository._get_reference
+  - affiliation (name): AffiliationRepository.upsert / get_tracked_organizations
+  - 关联表的反向外键列：主键 (a, b) 只能支持按 a 查找，按 b 反查需要单独的索引
+*/
+
+CREATE INDEX IF NOT EXISTS idx_paper_instance_title ON paper (instance_id, title);
+CREATE INDEX IF NOT EXISTS idx_paper_year ON paper (year);
+CREATE INDEX IF NOT EXISTS idx_conference_instance_conf_year ON conference_instance (conference_id, year);
+CREATE INDEX IF NOT EXISTS idx_conference_instance_year ON conference_instance (year);
+CREATE INDEX IF NOT EXISTS idx_reference_title ON reference (title);
+CREATE INDEX IF NOT EXISTS idx_affiliation_name ON affiliation (name);
+
+-- 反向外键索引
+CREATE INDEX IF NOT EXISTS idx_paper_author_author ON paper_author (author_id);
+CREATE INDEX IF NOT EXISTS idx_paper_keyword_keyword ON paper_keyword (keyword_id);
+CREATE INDEX IF NOT EXISTS idx_paper_reference_reference ON paper_reference (reference_id);
+CREATE INDEX IF NOT EXISTS idx_author_affiliation_affiliation ON author_affiliation (affiliation_id);
+CREATE INDEX IF NOT EXISTS idx_paper_embedding_embedding ON paper_embedding (embedding_id);
@@ -0,0 +1,11 @@
+/*
+  Migration 002: GIN indexes
+  ------------------------
+  - affiliation.aliases: 支持 aliases @> ARRAY[...]（SQLAlchemy 的 Affiliation.aliases.contains）
+  - keyword.keyword: pg_trgm 三元组索引，支持仪表盘中的关键字模糊搜索 (ILIKE '%...%')
+*/
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_affiliation_aliases_gin ON affiliation USING gin (aliases);
+CREATE INDEX IF NOT EXISTS idx_keyword_keyword_trgm ON keyword USING gin (keyword gin_trgm_ops);
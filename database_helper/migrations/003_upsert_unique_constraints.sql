@@ -0,0 +1,68 @@
+/*
+  Migration 003: unique constraints for native upserts
+  ------------------------
+  这些约束让 INSERT ... ON CONFLICT 可以替代 "先查询再插入" 的 upsert。
+  - paper (instance_id, title): 同一会议实例中标题唯一（取代 001 中的普通索引）
+  - conference_instance (conference_id, year): 每个会议每年一个实例（取代 001 中的普通索引）
+  affiliation.name 暂不加唯一约束：AuthorRepository 在同一事务中可能先后创建同名机构。
+
+  已有重复数据时先合并：每组保留 id 最小的行（保留其字段值），关联行改指向保留行，其余行删除。
+  约束已存在时跳过（例如由 DBManager.create_tables() 建出的库），本迁移可重复执行。
+*/
+
+-- 合并重复的会议实例：论文改挂到保留的实例
+CREATE TEMP TABLE instance_duplicate ON COMMIT DROP AS
+SELECT instance_id, MIN(instance_id) OVER (PARTITION BY conference_id, year) AS survivor_id
+FROM conference_instance
+WHERE year IS NOT NULL;
+DELETE FROM instance_duplicate WHERE instance_id = survivor_id;
+
+UPDATE paper SET instance_id = d.survivor_id
+FROM instance_duplicate d
+WHERE paper.instance_id = d.instance_id;
+DELETE FROM conference_instance WHERE instance_id IN (SELECT instance_id FROM instance_duplicate);
+
+-- 合并重复论文：作者、关键字、参考文献、向量关联并入保留的论文
+CREATE TEMP TABLE paper_duplicate ON COMMIT DROP AS
+SELECT paper_id, MIN(paper_id) OVER (PARTITION BY instance_id, title) AS survivor_id
+FROM paper
+WHERE title IS NOT NULL;
+DELETE FROM paper_duplicate WHERE paper_id = survivor_id;
+
+INSERT INTO paper_author (paper_id, author_id)
+SELECT DISTINCT d.survivor_id, pa.author_id
+FROM paper_author pa JOIN paper_duplicate d ON d.paper_id = pa.paper_id
+ON CONFLICT DO NOTHING;
+INSERT INTO paper_keyword (paper_id, keyword_id)
+SELECT DISTINCT d.survivor_id, pk.keyword_id
+FROM paper_keyword pk JOIN paper_duplicate d ON d.paper_id = pk.paper_id
+ON CONFLICT DO NOTHING;
+INSERT INTO paper_reference (paper_id, reference_id)
+SELECT DISTINCT d.survivor_id, pr.reference_id
+FROM paper_reference pr JOIN paper_duplicate d ON d.paper_id = pr.paper_id
+ON CONFLICT DO NOTHING;
+INSERT INTO paper_embedding (paper_id, embedding_id)
+SELECT DISTINCT d.survivor_id, pe.embedding_id
+FROM paper_embedding pe JOIN paper_duplicate d ON d.paper_id = pe.paper_id
+ON CONFLICT DO NOTHING;
+
+DELETE FROM paper_author WHERE paper_id IN (SELECT paper_id FROM paper_duplicate);
+DELETE FROM paper_keyword WHERE paper_id IN (SELECT paper_id FROM paper_duplicate);
+DELETE FROM paper_reference WHERE paper_id IN (SELECT paper_id FROM paper_duplicate);
+DELETE FROM paper_embedding WHERE paper_id IN (SELECT paper_id FROM paper_duplicate);
+DELETE FROM paper WHERE paper_id IN (SELECT paper_id FROM paper_duplicate);
+
+-- 约束不存在时才添加
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_paper_instance_title') THEN
+        ALTER TABLE paper ADD CONSTRAINT uq_paper_instance_title UNIQUE (instance_id, title);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_conference_instance_conf_year') THEN
+        ALTER TABLE conference_instance ADD CONSTRAINT uq_conference_instance_conf_year UNIQUE (conference_id, year);
+    END IF;
+END
+$$;
+
+DROP INDEX IF EXISTS idx_paper_instance_title;
+DROP INDEX IF EXISTS idx_conference_instance_conf_year;
@@ -0,0 +1,16 @@
+/*
+  Migration 004: keyset pagination support
+  ------------------------
+  - paper.citation_count 设为 NOT NULL DEFAULT 0：(citation_count, paper_id) 行值比较不能包含 NULL
+  - 覆盖分页排序键的索引，翻到任意深度的页都只需一次索引定位
+  - idx_paper_year (001) 被 (year, paper_id) 覆盖，删除
+*/
+
+UPDATE paper SET citation_count = 0 WHERE citation_count IS NULL;
+ALTER TABLE paper ALTER COLUMN citation_count SET DEFAULT 0;
+ALTER TABLE paper ALTER COLUMN citation_count SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_paper_citations_id ON paper (citation_count, paper_id);
+CREATE INDEX IF NOT EXISTS idx_paper_instance_citations_id ON paper (instance_id, citation_count, paper_id);
+CREATE INDEX IF NOT EXISTS idx_paper_year_id ON paper (year, paper_id);
+DROP INDEX IF EXISTS idx_paper_year;
@@ -0,0 +1,40 @@
+/*
+  Migration 005: materialized statistics tables
+  ------------------------
+  仪表盘统计改为读取预聚合表，由 ConferenceAssistant.run 结束时按会议实例增量刷新。
+  已有数据需要执行一次全量刷新：
+      python database_helper/refresh_statistics.py
+*/
+
+CREATE TABLE IF NOT EXISTS instance_stats (
+    instance_id INT PRIMARY KEY REFERENCES conference_instance(instance_id) ON DELETE CASCADE,
+    paper_count INT NOT NULL DEFAULT 0,
+    avg_citations DOUBLE PRECISION,
+    max_citations INT
+);
+
+CREATE TABLE IF NOT EXISTS instance_keyword_stats (
+    instance_id INT NOT NULL REFERENCES conference_instance(instance_id) ON DELETE CASCADE,
+    keyword_id INT NOT NULL REFERENCES keyword(keyword_id) ON DELETE CASCADE,
+    paper_count INT NOT NULL,
+    PRIMARY KEY (instance_id, keyword_id)
+);
+CREATE INDEX IF NOT EXISTS idx_instance_keyword_stats_count ON instance_keyword_stats (instance_id, paper_count);
+
+CREATE TABLE IF NOT EXISTS organization_instance_stats (
+    affiliation_id INT NOT NULL REFERENCES affiliation(affiliation_id) ON DELETE CASCADE,
+    instance_id INT NOT NULL REFERENCES conference_instance(instance_id) ON DELETE CASCADE,
+    paper_count INT NOT NULL,
+    avg_citations DOUBLE PRECISION,
+    max_citations INT,
+    PRIMARY KEY (affiliation_id, instance_id)
+);
+CREATE INDEX IF NOT EXISTS idx_organization_instance_stats_instance ON organization_instance_stats (instance_id);
+
+CREATE TABLE IF NOT EXISTS keyword_cooccurrence (
+    keyword_id INT NOT NULL REFERENCES keyword(keyword_id) ON DELETE CASCADE,
+    other_keyword_id INT NOT NULL REFERENCES keyword(keyword_id) ON DELETE CASCADE,
+    paper_count INT NOT NULL,
+    PRIMARY KEY (keyword_id, other_keyword_id)
+);
+CREATE INDEX IF NOT EXISTS idx_keyword_cooccurrence_count ON keyword_cooccurrence (keyword_id, paper_count);
@@ -0,0 +1,9 @@
+/*
+  Migration 006: embedding provenance
+  ------------------------
+  embedding_pipeline.py 按 (论文, 模型) 保存一条向量，并记录输入文本的哈希；
+  文本未变化的论文在重新运行时会被跳过。
+*/
+
+ALTER TABLE content_embedding ADD COLUMN IF NOT EXISTS model VARCHAR(255);
+ALTER TABLE content_embedding ADD COLUMN IF NOT EXISTS text_hash VARCHAR(64);
@@ -0,0 +1,19 @@
+/*
+  Migration 007: pgvector HNSW index for similar-paper search
+  ------------------------
+  content_embedding.embedding 仍是 FLOAT[]，且同一张表保存多个模型的向量（006），维度各不相同。
+  因此 HNSW 索引按模型建部分索引：表达式 embedding::vector(<维度>)，条件 WHERE model = '<模型>'，
+  只覆盖该模型的行，其他模型的写入不受影响。这里为默认模型（all-mpnet-base-v2，768 维）建索引。
+  PaperRepository.find_similar_papers 按模型查找这样的索引，找到时用 <=>（余弦距离）在数据库内检索，
+  否则使用进程内的 IVF 索引（similarity_search.py）。
+  其他模型可以按同样的格式另建索引，例如：
+    CREATE INDEX idx_content_embedding_hnsw_minilm ON content_embedding
+        USING hnsw ((embedding::vector(384)) vector_cosine_ops)
+        WHERE model = 'sentence-transformers/all-MiniLM-L6-v2';
+  需要服务器已安装 pgvector 扩展；未安装时本迁移会失败，可跳过（不影响进程内检索）。
+*/
+
+CREATE EXTENSION IF NOT EXISTS vector;
+CREATE INDEX IF NOT EXISTS idx_content_embedding_hnsw
+    ON content_embedding USING hnsw ((embedding::vector(768)) vector_cosine_ops)
+    WHERE model = 'sentence-transformers/all-mpnet-base-v2';
@@ -0,0 +1,15 @@
+/*
+  Migration 008: precomputed related papers
+  ------------------------
+  每篇论文的 k 个最相似论文（余弦相似度），由以下脚本整体重算：
+      python database_helper/precompute_related_papers.py
+  PaperRepository.get_related_papers 直接读取该表。
+*/
+
+CREATE TABLE IF NOT EXISTS related_paper (
+    paper_id INT NOT NULL REFERENCES paper(paper_id) ON DELETE CASCADE,
+    related_paper_id INT NOT NULL REFERENCES paper(paper_id) ON DELETE CASCADE,
+    rank INT NOT NULL,
+    score DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (paper_id, related_paper_id)
+);
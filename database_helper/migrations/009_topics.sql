@@ -0,0 +1,32 @@
+/*
+  Migration 009: embedding-based research topics
+  ------------------------
+  topic_clustering.py 对论文向量做 mini-batch k-means，写入主题中心与论文的主题归属；
+  新会议导入并向量化后，用 --update 把新论文分配到已有主题并增量更新中心，
+  topic_instance_stats 随之按会议实例刷新，仪表盘的主题趋势直接读取该表。
+      python topic_clustering.py fit --topics 50
+      python topic_clustering.py update
+*/
+
+CREATE TABLE IF NOT EXISTS topic (
+    topic_id INT PRIMARY KEY,
+    model VARCHAR(255) NOT NULL,
+    label VARCHAR(255),
+    centroid FLOAT[] NOT NULL,
+    paper_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS paper_topic (
+    paper_id INT PRIMARY KEY REFERENCES paper(paper_id) ON DELETE CASCADE,
+    topic_id INT NOT NULL REFERENCES topic(topic_id) ON DELETE CASCADE,
+    similarity DOUBLE PRECISION
+);
+CREATE INDEX IF NOT EXISTS idx_paper_topic_topic ON paper_topic (topic_id);
+
+CREATE TABLE IF NOT EXISTS topic_instance_stats (
+    topic_id INT NOT NULL REFERENCES topic(topic_id) ON DELETE CASCADE,
+    instance_id INT NOT NULL REFERENCES conference_instance(instance_id) ON DELETE CASCADE,
+    paper_count INT NOT NULL,
+    PRIMARY KEY (topic_id, instance_id)
+);
+CREATE INDEX IF NOT EXISTS idx_topic_instance_stats_instance ON topic_instance_stats (instance_id);
@@ -0,0 +1,16 @@
+/*
+  Migration 010: keyword canonicalization
+  ------------------------
+  keyword.canonical_key 保存规范化键（小写、去标点、中心名词单数化、别名映射），
+  导入时同键的写法归并到同一关键字；keyword_alias 记录回填时发现的合并（如缩写 llm -> large language model）。
+  已有数据需要执行一次回填，合并重复关键字并重映射 paper_keyword：
+      python database_helper/canonicalize_keywords.py
+*/
+
+ALTER TABLE keyword ADD COLUMN IF NOT EXISTS canonical_key VARCHAR(255);
+CREATE INDEX IF NOT EXISTS idx_keyword_canonical_key ON keyword (canonical_key);
+
+CREATE TABLE IF NOT EXISTS keyword_alias (
+    alias_key VARCHAR(255) PRIMARY KEY,
+    canonical_key VARCHAR(255) NOT NULL
+);
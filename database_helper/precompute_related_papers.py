@@ -0,0 +1,40 @@
+"""
+Precompute the related papers shown next to each paper.
+
+Computes the exact k nearest neighbours of every embedded paper in one blocked pass
+(PaperVectorIndex.related_papers_all) and rewrites the related_paper table (migration 008).
+Run after embedding_pipeline.py.
+
+    python database_helper/precompute_related_papers.py
+    python database_helper/precompute_related_papers.py --k 20 --same-conference
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+# Add the parent directory to sys.path to access db_manager.py
+sys.path.append(str(Path(__file__).parents[1]))
+
+from config import EMBEDDING_MODEL
+from db_manager import DBManager
+from repositories import PaperRepository
+from similarity_search import get_paper_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--k', type=int, default=10, help='related papers per paper')
+    parser.add_argument('--model', default=EMBEDDING_MODEL, help='embedding model name')
+    parser.add_argument('--same-conference', action='store_true', help='only relate papers of the same conference instance')
+    args = parser.parse_args()
+
+    db_manager = DBManager(reader_url=None)
+    session = db_manager.get_session()
+    try:
+        start = time.time()
+        index = get_paper_index(session, args.model)
+        paper_ids, neighbour_ids, scores = index.related_papers_all(k=args.k, same_instance=args.same_conference)
+        PaperRepository(session).replace_related_papers(paper_ids, neighbour_ids, scores)
+    finally:
+        session.close()
+    print(f"Related papers computed for {len(paper_ids)} papers in {time.time() - start:.1f}s.")
@@ -0,0 +1,27 @@
+"""
+Rebuild the materialized statistics tables from the current data.
+
+Ingests refresh their own conference instance; run this once after applying
+migration 005 to an existing database, or whenever the tables look out of date.
+
+    python database_helper/refresh_statistics.py
+"""
+import sys
+from pathlib import Path
+# Add the parent directory to sys.path to access db_manager.py
+sys.path.append(str(Path(__file__).parents[1]))
+
+from db_manager import DBManager
+from repositories import StatisticsRepository
+from repositories.query_cache import ingest_generation
+
+
+if __name__ == "__main__":
+    db_manager = DBManager(reader_url=None)
+    session = db_manager.get_session()
+    try:
+        StatisticsRepository(session).refresh_all()
+    finally:
+        session.close()
+    ingest_generation.bump()
+    print("Statistics tables refreshed.")
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+import sqlalchemy
+from config import SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD, QUERY_STATS, QUERY_STATS_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+_SKIPPED_PATHS = (os.path.dirname(sqlalchemy.__file__), os.path.abspath(__file__))
+_current_tracker = ContextVar("query_tracker", default=None)
+
+
+def _call_site() -> str:
+    """Return 'file:line in function' of the first frame outside SQLAlchemy and this module."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_SKIPPED_PATHS) and "importlib" not in filename:
+            return f"{os.path.basename(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+class QueryTracker:
+    """Query counts for one unit of work (a dashboard rerun, an ingest chunk, ...)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        """Statements executed at least `threshold` times: likely N+1 patterns."""
+        return [(stmt, n) for stmt, n in self.statements.most_common() if n >= threshold]
+
+
+class QueryInstrumentation:
+    """
+    Per-statement latency, row count and call-site statistics built on engine events.
+
+    Statements slower than `slow_query_ms` are logged with their parameters and call site.
+    Wrap a unit of work in `track()` to get its query count and repeated statements.
+    With `collect_stats`, every statement is also aggregated per (statement, call site), keeping
+    the `max_entries` most recently executed pairs; finding call sites walks the stack, so it
+    is off by default.
+    """
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD,
+                 collect_stats: bool = QUERY_STATS, max_entries: int = QUERY_STATS_MAX_ENTRIES):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.collect_stats = collect_stats
+        self.max_entries = max_entries
+        self.stats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append((id(context), time.perf_counter()))
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        conn = exception_context.connection
+        starts = conn.info.get("query_start") if conn is not None else None
+        if starts and starts[-1][0] == id(exception_context.execution_context):
+            starts.pop()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()[1]) * 1000
+        rowcount = cursor.rowcount if cursor.rowcount is not None else -1
+        slow = elapsed_ms >= self.slow_query_ms
+        call_site = _call_site() if slow or self.collect_stats else None
+
+        if self.collect_stats:
+            with self._lock:
+                stat = self.stats.get((statement, call_site))
+                if stat is None:
+                    stat = self.stats[(statement, call_site)] = {
+                        "count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    }
+                    if len(self.stats) > self.max_entries:
+                        self.stats.popitem(last=False)
+                else:
+                    self.stats.move_to_end((statement, call_site))
+                stat["count"] += 1
+                stat["total_ms"] += elapsed_ms
+                stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+                if rowcount > 0:
+                    stat["rows"] += rowcount
+
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            tracker.count += 1
+            tracker.total_ms += elapsed_ms
+            tracker.statements[statement] += 1
+
+        if slow:
+            logger.warning("Slow query (%.1f ms, %d rows) at %s: %s | params=%r",
+                           elapsed_ms, rowcount, call_site, statement, parameters)
+
+    @contextmanager
+    def track(self, name: str = "request"):
+        """
+        Count the queries issued inside the block and warn about statements repeated
+        at least `n_plus_one_threshold` times.
+        """
+        tracker = QueryTracker(name)
+        token = _current_tracker.set(tracker)
+        try:
+            yield tracker
+        finally:
+            _current_tracker.reset(token)
+            for statement, n in tracker.repeated(self.n_plus_one_threshold):
+                logger.warning("Possible N+1 in %s: statement ran %d times: %s", name, n, statement)
+
+    def top(self, n: int = 10, key: str = "total_ms") -> list[dict]:
+        """Return the `n` heaviest (statement, call site) pairs by `key` (empty unless `collect_stats`)."""
+        with self._lock:
+            rows = [
+                {"statement": statement, "call_site": call_site, **stat}
+                for (statement, call_site), stat in self.stats.items()
+            ]
+        return sorted(rows, key=lambda r: r[key], reverse=True)[:n]
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
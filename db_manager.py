@@ -1,16 +1,288 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, scoped_session
+import threading
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, scoped_session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.selectable import Select, CompoundSelect
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from models import Base
-from config import DATABASE_URL
+from db_instrumentation import QueryInstrumentation
+from config import (
+    DATABASE_URL, DATABASE_READER_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, SQL_ECHO
+)
+
+
+class PoolMetrics:
+    """Counts connection pool events for one engine."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self._lock = threading.Lock()
+
+    def attach(self, engine):
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine.pool, "checkout", self._on_checkout)
+        event.listen(engine.pool, "checkin", self._on_checkin)
+        event.listen(engine.pool, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out -= 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            # Checkouts served by an already-open connection
+            "reuse_ratio": 1 - self.connects / self.checkouts if self.checkouts else 0.0,
+        }
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica and everything else to the primary.
+
+    Flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE and raw SQL go to `writer`. Once the
+    session has written, it stays pinned to the writer until it is closed, so reads after a
+    commit see that commit even if the replica is still behind.
+    """
+
+    def __init__(self, writer=None, reader=None, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+        self.reader = reader
+        self.pinned = False
+
+    def pin_to_writer(self):
+        """Serve all further queries of this session from the primary."""
+        self.pinned = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.pinned:
+            return self.writer
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.pinned = True
+            return self.writer
+        if clause is None or (
+            isinstance(clause, (Select, CompoundSelect)) and clause._for_update_arg is None
+        ):
+            return self.reader
+        return self.writer
+
+    def close(self):
+        super().close()
+        self.pinned = False
+
+
+# Applied to every new SQLite connection: WAL lets the dashboard read while an ingest writes
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _attach_sqlite_pragmas(engine):
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+# Process-wide registry: one engine, session factory, metrics and instrumentation per database URL
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _pool_kwargs(database_url: str) -> dict:
+    # SQLite uses its own default pools, which do not take QueuePool sizing
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+
+def _get_engine_entry(database_url: str) -> dict:
+    entry = _engines.get(database_url)
+    if entry is None:
+        with _engines_lock:
+            entry = _engines.get(database_url)
+            if entry is None:
+                engine = create_engine(database_url, echo=SQL_ECHO, pool_pre_ping=True, **_pool_kwargs(database_url))
+                _attach_sqlite_pragmas(engine)
+                metrics = PoolMetrics()
+                metrics.attach(engine)
+                instrumentation = QueryInstrumentation()
+                instrumentation.attach(engine)
+                entry = {
+                    "engine": engine,
+                    "session_factory": sessionmaker(autocommit=False, autoflush=False, bind=engine),
+                    "metrics": metrics,
+                    "instrumentation": instrumentation,
+                }
+                _engines[database_url] = entry
+    return entry
+
+
+# Async drivers used for the event-loop variant of each backend
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+_async_engines = {}
+
+
+def to_async_url(database_url: str) -> str:
+    """Map a sync database URL to its async driver, e.g. postgresql:// -> postgresql+asyncpg://."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _get_async_engine_entry(database_url: str) -> dict:
+    entry = _async_engines.get(database_url)
+    if entry is None:
+        with _engines_lock:
+            entry = _async_engines.get(database_url)
+            if entry is None:
+                engine = create_async_engine(
+                    to_async_url(database_url), echo=SQL_ECHO, pool_pre_ping=True, **_pool_kwargs(database_url)
+                )
+                # Events are registered on the sync facade the async engine drives
+                _attach_sqlite_pragmas(engine.sync_engine)
+                metrics = PoolMetrics()
+                metrics.attach(engine.sync_engine)
+                instrumentation = QueryInstrumentation()
+                instrumentation.attach(engine.sync_engine)
+                entry = {
+                    "engine": engine,
+                    # Objects stay readable after commit without an implicit (sync) refresh
+                    "session_factory": async_sessionmaker(engine, autoflush=False, expire_on_commit=False),
+                    "metrics": metrics,
+                    "instrumentation": instrumentation,
+                }
+                _async_engines[database_url] = entry
+    return entry
+
+
+_routing_factories = {}
+
+
+def _get_routing_session_factory(database_url: str, reader_url: str):
+    key = (database_url, reader_url)
+    factory = _routing_factories.get(key)
+    if factory is None:
+        writer = _get_engine_entry(database_url)["engine"]
+        reader = _get_engine_entry(reader_url)["engine"]
+        with _engines_lock:
+            factory = _routing_factories.setdefault(key, sessionmaker(
+                class_=RoutingSession, writer=writer, reader=reader, autocommit=False, autoflush=False
+            ))
+    return factory
+
+
+def _get_async_routing_session_factory(database_url: str, reader_url: str):
+    key = ("async", database_url, reader_url)
+    factory = _routing_factories.get(key)
+    if factory is None:
+        writer = _get_async_engine_entry(database_url)["engine"]
+        reader = _get_async_engine_entry(reader_url)["engine"]
+        with _engines_lock:
+            factory = _routing_factories.setdefault(key, async_sessionmaker(
+                class_=AsyncSession,
+                sync_session_class=RoutingSession,
+                writer=writer.sync_engine,
+                reader=reader.sync_engine,
+                autoflush=False,
+                expire_on_commit=False,
+            ))
+    return factory
+
+
+def get_engine(database_url: str = DATABASE_URL):
+    """Return the shared engine for `database_url`, creating it on first use."""
+    return _get_engine_entry(database_url)["engine"]
+
+
+def dispose_engines():
+    """Close every pooled connection of every shared engine (e.g. at shutdown or after fork)."""
+    with _engines_lock:
+        for entry in _engines.values():
+            entry["engine"].dispose()
+        _engines.clear()
+        _routing_factories.clear()
+
+
+async def dispose_async_engines():
+    """Async counterpart of dispose_engines for the engines behind get_async_session."""
+    entries = list(_async_engines.values())
+    _async_engines.clear()
+    for entry in entries:
+        await entry["engine"].dispose()
+
 
 class DBManager:
-    def __init__(self, database_url=DATABASE_URL):
+    def __init__(self, database_url=DATABASE_URL, reader_url=DATABASE_READER_URL):
         """
-        Initialize the DataManager by creating a SQLAlchemy engine,
-        session factory, and a scoped session.
+        Initialize the DataManager with the process-wide engine and session factory
+        for `database_url`, and a scoped session of its own.
+        Constructing many DBManagers is cheap: they all reuse the same connection pool.
+
+        With a `reader_url` (a read replica), sessions are RoutingSessions: reads use the
+        reader pool, writes and any reads after them in the same session use `database_url`.
+        Pass reader_url=None to keep every query on the primary.
         """
-        self.engine = create_engine(database_url, echo=True)
-        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        entry = _get_engine_entry(database_url)
+        self.engine = entry["engine"]
+        self.metrics = entry["metrics"]
+        self.instrumentation = entry["instrumentation"]
+        self.database_url = database_url
+        self.reader_url = reader_url if reader_url != database_url else None
+
+        if self.reader_url:
+            reader_entry = _get_engine_entry(self.reader_url)
+            self.reader_engine = reader_entry["engine"]
+            self.reader_metrics = reader_entry["metrics"]
+            self.session_factory = _get_routing_session_factory(database_url, self.reader_url)
+        else:
+            self.reader_engine = self.engine
+            self.reader_metrics = self.metrics
+            self.session_factory = entry["session_factory"]
         self.Session = scoped_session(self.session_factory)
 
     def get_session(self):
@@ -27,6 +299,41 @@ class DBManager:
         """
         self.Session.remove()
 
+    @property
+    def async_engine(self):
+        """The shared AsyncEngine for this URL (asyncpg for Postgres, aiosqlite for SQLite)."""
+        return _get_async_engine_entry(self.database_url)["engine"]
+
+    def get_async_session(self):
+        """
+        Return a new AsyncSession, for use as `async with db_manager.get_async_session() as session:`.
+        Pair it with the Async*Repository classes in `repositories`.
+        """
+        if self.reader_url:
+            return _get_async_routing_session_factory(self.database_url, self.reader_url)()
+        return _get_async_engine_entry(self.database_url)["session_factory"]()
+
+    def pool_stats(self) -> dict:
+        """
+        Return pool checkout metrics together with the pool's current state.
+        """
+        stats = self.metrics.as_dict()
+        stats["status"] = self.engine.pool.status()
+        if self.reader_url:
+            stats["reader"] = self.reader_metrics.as_dict()
+            stats["reader"]["status"] = self.reader_engine.pool.status()
+        return stats
+
+    def track_queries(self, name: str = "request"):
+        """
+        Context manager counting the queries issued inside it, e.g.
+
+            with db_manager.track_queries("keyword page") as tracker:
+                ...
+            print(tracker.count, tracker.repeated())
+        """
+        return self.instrumentation.track(name)
+
     def create_tables(self):
         """
         Create all tables defined in the SQLAlchemy declarative Base.
@@ -47,4 +354,4 @@ class DBManager:
         This is useful for testing or development purposes.
         """
         self.drop_all_tables()
-        self.create_tables()
\ No newline at end of file
+        self.create_tables()
@@ -0,0 +1,124 @@
+"""
+Portable column types for the models.
+
+PostgreSQL keeps its native ARRAY columns (and the GIN index on affiliation.aliases);
+other backends such as SQLite store the same Python values in portable encodings:
+
+- StringList: list[str] as ARRAY(VARCHAR) on PostgreSQL, JSON text elsewhere
+- Float32Vector: list[float] as ARRAY(FLOAT) on PostgreSQL, packed little-endian float32 BLOB elsewhere
+"""
+import sys
+from array import array
+
+from sqlalchemy import JSON, Float, String, LargeBinary, Boolean
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+class array_contains(FunctionElement):
+    """
+    `column` contains every one of `values`.
+    PostgreSQL: column @> ARRAY[...] (served by a GIN index); elsewhere: one json_each() probe per value.
+    """
+
+    type = Boolean()
+    name = "array_contains"
+    inherit_cache = True
+
+
+@compiles(array_contains, "postgresql")
+def _array_contains_postgresql(element, compiler, **kw):
+    column, *values = [compiler.process(clause, **kw) for clause in element.clauses]
+    return f"{column} @> CAST(ARRAY[{', '.join(values)}] AS VARCHAR[])"
+
+
+@compiles(array_contains)
+def _array_contains_json(element, compiler, **kw):
+    column, *values = [compiler.process(clause, **kw) for clause in element.clauses]
+    if not values:
+        return "1 = 1"
+    return " AND ".join(
+        f"EXISTS (SELECT 1 FROM json_each({column}) WHERE json_each.value = {value})" for value in values
+    )
+
+
+class array_overlap(FunctionElement):
+    """
+    `column` shares at least one element with `values`.
+    PostgreSQL: column && ARRAY[...] (served by a GIN index); elsewhere: a single json_each() probe.
+    """
+
+    type = Boolean()
+    name = "array_overlap"
+    inherit_cache = True
+
+
+@compiles(array_overlap, "postgresql")
+def _array_overlap_postgresql(element, compiler, **kw):
+    column, *values = [compiler.process(clause, **kw) for clause in element.clauses]
+    return f"{column} && CAST(ARRAY[{', '.join(values)}] AS VARCHAR[])"
+
+
+@compiles(array_overlap)
+def _array_overlap_json(element, compiler, **kw):
+    column, *values = [compiler.process(clause, **kw) for clause in element.clauses]
+    if not values:
+        return "1 = 0"
+    return f"EXISTS (SELECT 1 FROM json_each({column}) WHERE json_each.value IN ({', '.join(values)}))"
+
+
+class StringList(TypeDecorator):
+    """A list of strings that supports `.contains([...])` and `.overlap([...])` on every backend."""
+
+    impl = JSON
+    cache_ok = True
+
+    class comparator_factory(TypeDecorator.Comparator):
+        def contains(self, other, **kwargs):
+            return array_contains(self.expr, *other)
+
+        def overlap(self, other):
+            return array_overlap(self.expr, *other)
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(ARRAY(String))
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        return list(value) if value is not None else None
+
+
+class Float32Vector(TypeDecorator):
+    """A float vector; stored as 4 bytes per component outside PostgreSQL."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(ARRAY(Float))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return None if value is None else [float(v) for v in value]
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)
+        if hasattr(value, "astype"):  # numpy array
+            return value.astype("<f4").tobytes()
+        packed = array("f", (float(v) for v in value))
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return packed.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        unpacked = array("f")
+        unpacked.frombytes(value)
+        if sys.byteorder == "big":
+            unpacked.byteswap()
+        return unpacked.tolist()
@@ -0,0 +1,214 @@
+"""
+Fill content_embedding / paper_embedding for papers in batches.
+
+Papers are read in keyset-ordered chunks; the text of each paper (title, TL;DR, abstract,
+optionally the full content) is hashed, and only papers whose hash differs from the one
+stored with their embedding for the same model are sent to the embedder. Vectors are
+written with bulk INSERT/UPDATE statements, one transaction per chunk.
+
+    python embedding_pipeline.py                         # all papers, sentence-transformers model
+    python embedding_pipeline.py --instance-id 3 --embedder simulator
+"""
+import hashlib
+import logging
+import argparse
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select, insert, update
+
+from config import EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_STORE_DIR
+from models import Paper, ContentEmbedding, PaperEmbeddingIndex
+from repositories.query_cache import ingest_generation
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELDS = ("title", "tldr", "abstract")
+
+
+class SimulatorEmbedder:
+    """Random 768-d vectors from llm_simulator; for tests and benchmarks without a model."""
+
+    model_name = "simulator"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        from llm_simulator import get_text_embeddings
+        return get_text_embeddings(texts)
+
+
+class SentenceTransformerEmbedder:
+    """A local sentence-transformers model, encoding `batch_size` texts per forward pass."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE, device: str = None):
+        if SentenceTransformer is None:
+            raise ImportError("sentence-transformers is required for SentenceTransformerEmbedder")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+
+def paper_text(row, text_fields=TEXT_FIELDS) -> str:
+    """Join the non-empty text fields of a paper row."""
+    return "\n\n".join(str(v).strip() for v in (getattr(row, f) for f in text_fields) if v and str(v).strip())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingPipeline:
+    """
+    Incremental batch embedding of papers.
+
+    `embedder` is any object with a `model_name` attribute and an `embed(texts) -> (n, dim) array`
+    method. Each paper keeps one embedding per model name. New vectors are also appended to
+    `store` (an EmbeddingStore) when one is given.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        embedder,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        chunk_size: int = 2000,
+        text_fields=TEXT_FIELDS,
+        store=None,
+    ):
+        self.db_manager = db_manager
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.text_fields = tuple(text_fields)
+        self.store = store
+
+    def _chunk_query(self, instance_id: Optional[int], after_id: int):
+        existing = (
+            select(
+                PaperEmbeddingIndex.paper_id,
+                ContentEmbedding.embedding_id,
+                ContentEmbedding.text_hash,
+            )
+            .join(ContentEmbedding, ContentEmbedding.embedding_id == PaperEmbeddingIndex.embedding_id)
+            .where(ContentEmbedding.model == self.embedder.model_name)
+            .subquery()
+        )
+        query = (
+            select(
+                Paper.paper_id,
+                *(getattr(Paper, f) for f in self.text_fields),
+                existing.c.embedding_id,
+                existing.c.text_hash,
+            )
+            .outerjoin(existing, existing.c.paper_id == Paper.paper_id)
+            .where(Paper.paper_id > after_id)
+            .order_by(Paper.paper_id)
+            .limit(self.chunk_size)
+        )
+        if instance_id is not None:
+            query = query.where(Paper.instance_id == instance_id)
+        return query
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        batches = [
+            np.asarray(self.embedder.embed(texts[start:start + self.batch_size]), dtype=np.float32)
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+    def _write(self, session, pending: list[tuple], vectors: np.ndarray):
+        model = self.embedder.model_name
+        updates = [
+            {"embedding_id": embedding_id, "embedding": vector, "text_hash": digest, "model": model}
+            for (paper_id, embedding_id, digest), vector in zip(pending, vectors)
+            if embedding_id is not None
+        ]
+        if updates:
+            session.execute(update(ContentEmbedding), updates)
+
+        new = [(paper_id, digest, vector) for (paper_id, embedding_id, digest), vector in zip(pending, vectors)
+               if embedding_id is None]
+        if new:
+            embedding_ids = session.scalars(
+                insert(ContentEmbedding).returning(ContentEmbedding.embedding_id, sort_by_parameter_order=True),
+                [{"embedding": vector, "text_hash": digest, "model": model} for _, digest, vector in new],
+            ).all()
+            session.execute(
+                insert(PaperEmbeddingIndex),
+                [{"paper_id": paper_id, "embedding_id": embedding_id}
+                 for (paper_id, _, _), embedding_id in zip(new, embedding_ids)],
+            )
+
+    def run(self, instance_id: Optional[int] = None) -> dict:
+        """Embed new or changed papers (of one conference instance, or all). Returns counters."""
+        stats = {"scanned": 0, "embedded": 0, "unchanged": 0, "empty": 0}
+        session = self.db_manager.get_session()
+        try:
+            after_id = 0
+            while True:
+                rows = session.execute(self._chunk_query(instance_id, after_id)).all()
+                if not rows:
+                    break
+                after_id = rows[-1].paper_id
+                stats["scanned"] += len(rows)
+
+                pending, texts = [], []
+                for row in rows:
+                    text = paper_text(row, self.text_fields)
+                    if not text:
+                        stats["empty"] += 1
+                        continue
+                    digest = text_hash(text)
+                    if digest == row.text_hash:
+                        stats["unchanged"] += 1
+                        continue
+                    pending.append((row.paper_id, row.embedding_id, digest))
+                    texts.append(text)
+
+                if pending:
+                    vectors = self._embed(texts)
+                    self._write(session, pending, vectors)
+                    session.commit()
+                    if self.store is not None:
+                        self.store.append([p[0] for p in pending], vectors, [p[2] for p in pending])
+                    stats["embedded"] += len(pending)
+                logger.info("Embedding progress: %s", stats)
+        finally:
+            session.close()
+        if stats["embedded"]:
+            # Similar-paper indexes are rebuilt for the new vectors
+            ingest_generation.bump()
+        return stats
+
+
+if __name__ == "__main__":
+    from db_manager import DBManager
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--instance-id', type=int, default=None, help='only embed papers of this conference instance')
+    parser.add_argument('--embedder', choices=['sentence-transformers', 'simulator'], default='sentence-transformers')
+    parser.add_argument('--model', default=EMBEDDING_MODEL)
+    parser.add_argument('--batch-size', type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument('--with-content', action='store_true', help='also embed the full paper content')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.embedder == 'simulator':
+        embedder = SimulatorEmbedder()
+    else:
+        embedder = SentenceTransformerEmbedder(args.model, batch_size=args.batch_size)
+    fields = TEXT_FIELDS + ("content",) if args.with_content else TEXT_FIELDS
+    db_manager = DBManager(reader_url=None)
+    store = None
+    if EMBEDDING_STORE_DIR:
+        from embedding_store import EmbeddingStore
+        store = EmbeddingStore.for_model(db_manager.engine.url, embedder.model_name)
+    pipeline = EmbeddingPipeline(db_manager, embedder, batch_size=args.batch_size, text_fields=fields, store=store)
+    print(pipeline.run(instance_id=args.instance_id))
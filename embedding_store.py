@@ -0,0 +1,227 @@
+"""
+Append-only, memory-mapped store of paper embeddings for one model.
+
+Layout of a store directory:
+
+    meta.json      {"dim", "count", "quantized"}; `count` is written last, so rows past it are ignored
+    ids.i64        paper_id per row
+    hashes.bin     16-byte text-hash prefix per row (detects re-embedded papers)
+    vectors.f32    L2-normalized float32 vectors, count x dim
+    vectors.i8     optional int8 quantization (x / scale, rounded), count x dim
+    scales.f32     optional per-row int8 scale
+
+Re-embedding a paper appends a new row; the latest row of a paper wins and compact()
+drops superseded ones. Readers get np.memmap views, so loading 100k x 768 vectors maps
+the file instead of reading or converting it.
+"""
+import os
+import json
+import hashlib
+import logging
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from config import EMBEDDING_DIM, EMBEDDING_STORE_DIR
+from models import ContentEmbedding, PaperEmbeddingIndex
+
+logger = logging.getLogger(__name__)
+
+_HASH_BYTES = 16
+
+
+def _hash_bytes(text_hash: Optional[str]) -> bytes:
+    return bytes.fromhex(text_hash[:_HASH_BYTES * 2]) if text_hash else b"\0" * _HASH_BYTES
+
+
+class EmbeddingStore:
+    def __init__(self, path: str, dim: int = EMBEDDING_DIM, quantize: bool = False):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta = self._read_meta()
+        self.dim = meta.get("dim", dim)
+        self.count = meta.get("count", 0)
+        self.quantized = meta.get("quantized", quantize)
+        self._row_of = None
+
+    @classmethod
+    def for_model(cls, database_url: str, model: str, root: Optional[str] = None, **kwargs) -> "EmbeddingStore":
+        """
+        The store of `model` for one database under `root` (EMBEDDING_STORE_DIR by default),
+        e.g. .cache/embeddings/3f2a9c0d1b7e/sentence-transformers--all-mpnet-base-v2.
+        """
+        database = hashlib.sha256(str(database_url).encode("utf-8")).hexdigest()[:12]
+        return cls(os.path.join(root or EMBEDDING_STORE_DIR, database, model.replace("/", "--")), **kwargs)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_meta(self):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "count": self.count, "quantized": self.quantized}, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def __len__(self) -> int:
+        return self.count
+
+    # -- reading ---------------------------------------------------------------
+
+    def _memmap(self, name: str, dtype, shape):
+        if not self.count:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._memmap("ids.i64", np.int64, (self.count,))
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return self._memmap("hashes.bin", f"S{_HASH_BYTES}", (self.count,))
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All rows (including superseded ones) as a read-only float32 memmap."""
+        return self._memmap("vectors.f32", np.float32, (self.count, self.dim))
+
+    @property
+    def quantized_vectors(self) -> tuple[np.ndarray, np.ndarray]:
+        """(int8 rows, per-row scales); x ≈ int8 * scale."""
+        if not self.quantized:
+            raise ValueError("Store was created without int8 quantization.")
+        return (
+            self._memmap("vectors.i8", np.int8, (self.count, self.dim)),
+            self._memmap("scales.f32", np.float32, (self.count,)),
+        )
+
+    def row_index(self) -> dict[int, int]:
+        """paper_id -> latest row."""
+        if self._row_of is None:
+            ids = np.asarray(self.ids)
+            self._row_of = dict(zip(ids.tolist(), range(len(ids))))
+        return self._row_of
+
+    def live_rows(self) -> np.ndarray:
+        """Rows that are the latest for their paper, in row order."""
+        rows = np.fromiter(self.row_index().values(), dtype=np.int64, count=len(self.row_index()))
+        rows.sort()
+        return rows
+
+    def get(self, paper_id: int) -> Optional[np.ndarray]:
+        row = self.row_index().get(int(paper_id))
+        return None if row is None else self.vectors[row]
+
+    # -- writing ---------------------------------------------------------------
+
+    def append(self, paper_ids, vectors, text_hashes=None):
+        """Append rows; vectors are L2-normalized before writing."""
+        paper_ids = np.asarray(paper_ids, dtype=np.int64)
+        if not len(paper_ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(paper_ids), -1)
+        if not self.count:
+            # An empty store takes the width of the first vectors written to it
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        hashes = np.array([_hash_bytes(h) for h in (text_hashes or [None] * len(paper_ids))], dtype=f"S{_HASH_BYTES}")
+
+        files = {"ids.i64": paper_ids, "hashes.bin": hashes, "vectors.f32": vectors}
+        if self.quantized:
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            files["vectors.i8"] = np.round(vectors / scales[:, None]).astype(np.int8)
+            files["scales.f32"] = scales.astype(np.float32)
+
+        for name, array in files.items():
+            row_bytes = array.itemsize * (array.shape[1] if array.ndim > 1 else 1)
+            with open(self._file(name), "ab") as f:
+                # Drop bytes of an earlier append that never reached meta.json
+                f.truncate(self.count * row_bytes)
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(array).tobytes())
+
+        if self._row_of is not None:
+            for offset, paper_id in enumerate(paper_ids.tolist()):
+                self._row_of[paper_id] = self.count + offset
+        self.count += len(paper_ids)
+        self._write_meta()
+
+    def compact(self):
+        """Rewrite the files keeping only the latest row of each paper."""
+        rows = self.live_rows()
+        if len(rows) == self.count:
+            return
+        names = ["ids.i64", "hashes.bin", "vectors.f32"] + (["vectors.i8", "scales.f32"] if self.quantized else [])
+        arrays = {
+            "ids.i64": self.ids, "hashes.bin": self.hashes, "vectors.f32": self.vectors,
+        }
+        if self.quantized:
+            arrays["vectors.i8"], arrays["scales.f32"] = self.quantized_vectors
+        for name in names:
+            with open(self._file(name + ".tmp"), "wb") as f:
+                f.write(np.ascontiguousarray(arrays[name][rows]).tobytes())
+        del arrays
+        for name in names:
+            os.replace(self._file(name + ".tmp"), self._file(name))
+        self.count = len(rows)
+        self._row_of = None
+        self._write_meta()
+
+    def clear(self):
+        """Drop every row; the next append sets the width again."""
+        self.count = 0
+        self._row_of = None
+        self._write_meta()
+        for name in ("ids.i64", "hashes.bin", "vectors.f32", "vectors.i8", "scales.f32"):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+
+    def sync_from_database(self, session, model: str, chunk_size: int = 5000) -> int:
+        """
+        Append embeddings of `model` that are new or whose text hash changed since the last sync.
+        Returns the number of rows appended.
+        """
+        row_of = self.row_index()
+        stored = self.hashes
+        current = session.execute(
+            select(PaperEmbeddingIndex.paper_id, ContentEmbedding.embedding_id, ContentEmbedding.text_hash)
+            .join(ContentEmbedding, ContentEmbedding.embedding_id == PaperEmbeddingIndex.embedding_id)
+            .where(ContentEmbedding.model == model)
+        ).all()
+        if not current:
+            return 0
+        rows = np.array([row_of.get(paper_id, -1) for paper_id, _, _ in current], dtype=np.int64)
+        digests = np.array([_hash_bytes(digest) for _, _, digest in current], dtype=f"S{_HASH_BYTES}")
+        # Compared as S16 arrays: numpy drops trailing NUL bytes of every element alike
+        unchanged = np.zeros(len(current), dtype=bool)
+        if len(stored):
+            unchanged = (rows >= 0) & (stored[np.maximum(rows, 0)] == digests)
+        changed = [current[i] for i in np.flatnonzero(~unchanged)]
+
+        for start in range(0, len(changed), chunk_size):
+            chunk = changed[start:start + chunk_size]
+            embeddings = dict(session.execute(
+                select(ContentEmbedding.embedding_id, ContentEmbedding.embedding)
+                .where(ContentEmbedding.embedding_id.in_([embedding_id for _, embedding_id, _ in chunk]))
+            ).all())
+            self.append(
+                [paper_id for paper_id, _, _ in chunk],
+                np.array([embeddings[embedding_id] for _, embedding_id, _ in chunk], dtype=np.float32),
+                [digest for _, _, digest in chunk],
+            )
+        if changed:
+            logger.info("Appended %d embeddings to %s", len(changed), self.path)
+        return len(changed)
@@ -19,6 +19,9 @@ class DataManagerContext:
         self.session = None
 
     def __enter__(self):
+        # Count queries per block so repeated statements (N+1) get logged
+        self.tracking = self.db_manager.track_queries("dashboard")
+        self.tracking.__enter__()
         self.session = self.db_manager.get_session()
         return {
             "conference": ConferenceInstanceRepository(self.session),
@@ -29,6 +32,7 @@ class DataManagerContext:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             self.session.close()
+        self.tracking.__exit__(exc_type, exc_val, exc_tb)
 
 
 def create_statistics_df(
@@ -36,20 +40,21 @@ def create_statistics_df(
 ) -> pd.DataFrame:
     """Create a DataFrame from conference statistics."""
     df_data = []
-    for item in data:
-        row = {
-            "Conference": (
-                item[0] if isinstance(item[0], str) else item[0].conference_name
-            ),
-            "Total Papers": item[1],
-            "Avg Citations": float(item[2]) if item[2] else 0,
-            "Top Citations": int(item[3]) if item[3] else 0,
-        }
-        if include_keywords and isinstance(item[0], ConferenceInstance):
-            with DataManagerContext() as managers:
+    # One session for all rows instead of one per conference instance
+    with DataManagerContext() as managers:
+        for item in data:
+            row = {
+                "Conference": (
+                    item[0] if isinstance(item[0], str) else item[0].conference_name
+                ),
+                "Total Papers": item[1],
+                "Avg Citations": float(item[2]) if item[2] else 0,
+                "Top Citations": int(item[3]) if item[3] else 0,
+            }
+            if include_keywords and isinstance(item[0], ConferenceInstance):
                 keywords = managers["keyword"].get_top_keywords_for_instance(
                     item[0].instance_id
                 )
                 row["Keywords"] = ", ".join(keywords)
-        df_data.append(row)
+            df_data.append(row)
     return pd.DataFrame(df_data)
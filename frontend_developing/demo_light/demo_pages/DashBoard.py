@@ -7,6 +7,8 @@ from utility.visualization_utli import *
 from utility.db_util import DataManagerContext, create_conference_statistics_df
 from config import ORGANIZATION_GROUPS
 
+ALL_CONFERENCES = "All Conferences"
+
 
 class DashboardState:
     """Manages dashboard state and selections."""
@@ -19,6 +21,7 @@ class DashboardState:
             "selected_conference",
             "selected_organization",
             "selected_keyword",
+            "selected_topic_conference",
         ]:
             if key in st.session_state:
                 del st.session_state[key]
@@ -31,6 +34,7 @@ class DashboardState:
             "conference": st.session_state.get("selected_conference"),
             "organization": st.session_state.get("selected_organization"),
             "keyword": st.session_state.get("selected_keyword"),
+            "topic_conference": st.session_state.get("selected_topic_conference"),
         }
 
 
@@ -127,6 +131,17 @@ class FilterHandlers:
                     if st.button(kw, key=f"button_{kw.replace(' ', '_')}_kw"):
                         st.session_state.selected_keyword = kw
 
+    @staticmethod
+    def handle_topic_filter():
+        """Handle topic trend filtering."""
+        DashboardState.clear_all_selections()
+
+        with DataManagerContext() as managers:
+            conferences = managers["conference"].get_all_conferences()
+            st.session_state.selected_topic_conference = FilterDisplay.show_conference_filter(
+                [ALL_CONFERENCES] + conferences
+            )
+
 
 class ContentRenderers:
     """Handles rendering of different types of content."""
@@ -147,35 +162,22 @@ class ContentRenderers:
     def render_organization(organization: str):
         """Render organization-specific data."""
         with DataManagerContext() as managers:
-            papers = managers["paper"].get_papers_by_organization(organization)
-            if not papers:
+            stats = managers["org"].get_organization_stats(organization)
+            if not stats:
                 st.info(f"No papers found for {organization}")
                 return
 
-            papers_df = pd.DataFrame(
-                [
-                    {
-                        "Title": p.title,
-                        "Conference": p.instance_to_paper.conference_name,
-                        "Year": p.year,
-                        "Citations": p.citation_count,
-                    }
-                    for p in papers
-                ]
-            )
-
-            DashboardLayout.show_conference_layout(
-                papers_df.groupby(["Conference", "Year"])
-                .agg({"Title": "count", "Citations": ["mean", "max"]})
-                .reset_index(),
-                organization,
+            stats_df = pd.DataFrame(
+                stats,
+                columns=["Conference", "Year", "Total Papers", "Avg Citations", "Top Citations"],
             )
+            DashboardLayout.show_conference_layout(stats_df, organization)
 
     @staticmethod
     def render_keyword(keyword: str):
         """Render keyword-specific data."""
         with DataManagerContext() as managers:
-            papers = managers["paper"].get_papers_by_keyword(keyword)
+            papers = managers["paper"].get_papers_by_keyword(keyword, profile="keyword")
             related_keywords = managers["keyword"].get_related_keywords(keyword)
 
             if not papers:
@@ -196,6 +198,21 @@ class ContentRenderers:
             df = create_conference_statistics_df(stats, include_keywords=False)
             DashboardLayout.show_conference_layout(df, f"All Conferences - {year}")
 
+    @staticmethod
+    def render_topic_trends(conference: str):
+        """Render year-over-year research topic trends."""
+        with DataManagerContext() as managers:
+            trends = managers["topic"].get_topic_trends(
+                None if conference == ALL_CONFERENCES else conference
+            )
+            if not trends:
+                st.info("No research topics yet; run topic_clustering.py fit first.")
+                return
+
+            df = pd.DataFrame(trends, columns=["Topic ID", "Topic", "Year", "Papers"])
+            df["Topic"] = df["Topic ID"].astype(str) + ": " + df["Topic"]
+            DashboardLayout.show_topic_layout(df, conference)
+
 
 class DashboardUI:
     """Main dashboard UI handler."""
@@ -208,10 +225,10 @@ class DashboardUI:
 
             filter_mode = option_menu(
                 menu_title=None,  # Explicitly set no title for the menu
-                options=["Year", "Conference", "Organization", "Keyword"],
-                icons=["calendar", "journal-text", "building", "tag"],  # Optional icons
+                options=["Year", "Conference", "Organization", "Keyword", "Topic"],
+                icons=["calendar", "journal-text", "building", "tag", "diagram-3"],  # Optional icons
                 menu_icon="cast",
-                default_index=-4,
+                default_index=-5,
                 styles={
                     "container": {
                         "padding": "0.2rem 0",
@@ -229,6 +246,8 @@ class DashboardUI:
                 FilterHandlers.handle_organization_filter()
             elif filter_mode == "Keyword":
                 FilterHandlers.handle_keyword_filter()
+            elif filter_mode == "Topic":
+                FilterHandlers.handle_topic_filter()
 
     @staticmethod
     def render_main_content():
@@ -246,6 +265,8 @@ class DashboardUI:
             ContentRenderers.render_organization(selections["organization"])
         elif selections["keyword"]:
             ContentRenderers.render_keyword(selections["keyword"])
+        elif selections["topic_conference"]:
+            ContentRenderers.render_topic_trends(selections["topic_conference"])
         else:
             st.title("Dashboard")
             st.info("👈 Select a filter from the sidebar to view papers")
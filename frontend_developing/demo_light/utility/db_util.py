@@ -6,7 +6,7 @@ sys.path.append(str(Path(__file__).parents[3]))
 import pandas as pd
 from db_manager import DBManager  # This will now find the root db_manager.py
 from models import ConferenceInstance
-from repositories import ConferenceInstanceRepository, PaperRepository, KeywordRepository, AffiliationRepository
+from repositories import ConferenceInstanceRepository, PaperRepository, KeywordRepository, AffiliationRepository, TopicRepository
 
 
 class DataManagerContext:
@@ -17,17 +17,22 @@ class DataManagerContext:
         self.session = None
 
     def __enter__(self):
+        # Count queries per block so repeated statements (N+1) get logged
+        self.tracking = self.data_manager.track_queries("dashboard")
+        self.tracking.__enter__()
         self.session = self.data_manager.get_session()
         return {
             "conference": ConferenceInstanceRepository(self.session),
             "paper": PaperRepository(self.session),
             "keyword": KeywordRepository(self.session),
             "org": AffiliationRepository(self.session),
+            "topic": TopicRepository(self.session),
         }
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             self.session.close()
+        self.tracking.__exit__(exc_type, exc_val, exc_tb)
 
 
 def create_conference_statistics_df(
@@ -35,18 +40,19 @@ def create_conference_statistics_df(
 ) -> pd.DataFrame:
     """Create a DataFrame from conference statistics."""
     df_data = []
-    for item in data:
-        row = {
-            "Conference": (
-                item[0] if isinstance(item[0], str) else item[0].conference_name
-            ),
-            "Total Papers": item[1],
-        }
-        if include_keywords and isinstance(item[0], ConferenceInstance):
-            with DataManagerContext() as managers:
+    # One session for all rows instead of one per conference instance
+    with DataManagerContext() as managers:
+        for item in data:
+            row = {
+                "Conference": (
+                    item[0] if isinstance(item[0], str) else item[0].conference_name
+                ),
+                "Total Papers": item[1],
+            }
+            if include_keywords and isinstance(item[0], ConferenceInstance):
                 keywords = managers["keyword"].get_top_keywords_for_instance(
                     item[0].instance_id
                 )
                 row["Keywords"] = ", ".join(keywords)
-        df_data.append(row)
+            df_data.append(row)
     return pd.DataFrame(df_data)
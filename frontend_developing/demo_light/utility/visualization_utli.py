@@ -100,6 +100,23 @@ class ChartDisplay:
         fig = px.bar(df, x="Conference", y="Total Papers", title="Papers by Conference")
         st.plotly_chart(fig, use_container_width=True)
 
+    @staticmethod
+    def show_topic_trends(df: pd.DataFrame, top_n: int = 10):
+        """Display papers per year for the largest topics, in absolute numbers and as a share of each year."""
+        totals = df.groupby("Topic")["Papers"].sum().nlargest(top_n).index
+        top = df[df["Topic"].isin(totals)].copy()
+        top["Share (%)"] = 100 * top["Papers"] / top["Year"].map(df.groupby("Year")["Papers"].sum())
+
+        tab1, tab2 = st.tabs(["Papers per Year", "Share of Year's Papers"])
+        with tab1:
+            fig = px.line(top, x="Year", y="Papers", color="Topic", markers=True,
+                          title=f"Top {len(totals)} Topics Over Time")
+            st.plotly_chart(fig, use_container_width=True)
+        with tab2:
+            fig = px.line(top, x="Year", y="Share (%)", color="Topic", markers=True,
+                          title="Topic Share of Papers per Year")
+            st.plotly_chart(fig, use_container_width=True)
+
     @staticmethod
     def show_keyword_network(keywords: List[Tuple[str, int]], central_keyword: str):
         """Display keyword relationship network."""
@@ -124,6 +141,26 @@ class DashboardLayout:
         ChartDisplay.show_trend_analysis(df)
         DataFrameDisplay.show_conference_stats(df)
 
+    @staticmethod
+    def show_topic_layout(df: pd.DataFrame, conference: str):
+        """Display research topic trends with the year-over-year change of each topic."""
+        st.subheader(f"Research Topics - {conference}")
+        ChartDisplay.show_topic_trends(df)
+
+        st.subheader("Year-over-Year Change")
+        papers = df.pivot_table(index="Topic", columns="Year", values="Papers", aggfunc="sum", fill_value=0)
+        if papers.shape[1] < 2:
+            st.info("Topic trends need papers from at least two years.")
+            return
+        latest, previous = papers.columns[-1], papers.columns[-2]
+        change_df = pd.DataFrame({
+            f"Papers {previous}": papers[previous],
+            f"Papers {latest}": papers[latest],
+            "Change": papers[latest] - papers[previous],
+            "Change (%)": 100 * (papers[latest] - papers[previous]) / papers[previous].where(papers[previous] > 0),
+        }).sort_values("Change", ascending=False).reset_index()
+        st.dataframe(change_df.style.format({"Change (%)": "{:+.1f}"}, na_rep="new"), use_container_width=True)
+
     @staticmethod
     def show_keyword_layout(
         papers: List[Any], keyword: str, related_keywords: List[Tuple[str, int]]
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from config import HTTP_CACHE_DIR, HTTP_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# The stored body is already decoded, so these headers no longer describe it
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class CachedSession(requests.Session):
+    """
+    A pooled requests.Session with a transparent on-disk cache for GET requests.
+
+    - Responses younger than `ttl` seconds are served from disk without touching the network.
+    - Stale responses are revalidated with If-None-Match / If-Modified-Since; a 304 refreshes
+      the cached entry and returns the stored body.
+    - Only 200 responses to GET requests are cached. Entries are keyed by URL, Authorization header
+      and the request headers named in the response's Vary header, so responses never leak across
+      credentials or content negotiation; "Vary: *" responses are not cached.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = HTTP_CACHE_DIR,
+        ttl: int = HTTP_CACHE_TTL,
+        pool_size: int = 16,
+        max_retries: int = 3,
+    ):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        retry = Retry(total=max_retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def _cache_key(self, prepared: requests.PreparedRequest, vary: list = ()) -> str:
+        parts = [prepared.method, prepared.url, prepared.headers.get("Authorization", "")]
+        parts += [f"{name.lower()}: {prepared.headers.get(name, '')}" for name in sorted(vary, key=str.lower)]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.json", f"{base}.body"
+
+    def _vary_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.vary")
+
+    def _load_vary(self, key: str) -> list:
+        """Header names the URL's last cached response varied on."""
+        try:
+            with open(self._vary_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _store_vary(self, key: str, vary: list):
+        if vary == self._load_vary(key):
+            return
+        path = self._vary_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path + suffix, "w", encoding="utf-8") as f:
+            json.dump(vary, f)
+        os.replace(path + suffix, path)
+
+    def _load(self, key: str):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def _store(self, key: str, response: requests.Response, body: bytes = None):
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            "url": response.url,
+            "status_code": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "stored_at": time.time(),
+        }
+        # Write the body first so a reader never sees metadata without its body
+        # Per-thread temp names keep concurrent writers of the same URL from clobbering each other
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if body is not None:
+            with open(body_path + suffix, "wb") as f:
+                f.write(body)
+            os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+
+    def _build_response(self, meta: dict, body: bytes, method: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = meta["status_code"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.url = meta["url"]
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = requests.Request(method, meta["url"]).prepare()
+        response.from_cache = True
+        return response
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        if method.upper() != "GET" or kwargs.get("stream"):
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        prepared = self.prepare_request(
+            requests.Request("GET", url, params=params, headers=headers, auth=kwargs.get("auth"))
+        )
+        url_key = self._cache_key(prepared)
+        vary = self._load_vary(url_key)
+        key = self._cache_key(prepared, vary) if vary else url_key
+        meta, body = self._load(key)
+
+        if meta is not None and time.time() - meta["stored_at"] < self.ttl:
+            self.hits += 1
+            return self._build_response(meta, body, "GET")
+
+        headers = dict(headers or {})
+        if meta is not None:
+            cached_headers = CaseInsensitiveDict(meta["headers"])
+            if "ETag" in cached_headers:
+                headers["If-None-Match"] = cached_headers["ETag"]
+            if "Last-Modified" in cached_headers:
+                headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        response = super().request(method, url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            self.revalidated += 1
+            # Merge fresh validators into the stored headers and restart the TTL
+            meta["headers"].update(
+                {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+            )
+            meta["stored_at"] = time.time()
+            cached = self._build_response(meta, body, "GET")
+            self._store(key, cached)
+            return cached
+
+        self.misses += 1
+        response.from_cache = False
+        vary = [name.strip() for name in response.headers.get("Vary", "").split(",") if name.strip()]
+        if response.status_code == 200 and "*" not in vary:
+            try:
+                self._store_vary(url_key, vary)
+                self._store(self._cache_key(prepared, vary) if vary else url_key, response, response.content)
+            except OSError as e:
+                logger.warning("Could not write HTTP cache entry for %s: %s", url, e)
+        return response
+
+    def clear(self):
+        """Remove every cached entry."""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith((".json", ".body", ".vary")):
+                    os.remove(os.path.join(root, name))
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> CachedSession:
+    """Return the process-wide cached, pooled session."""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = CachedSession()
+    return _shared_session
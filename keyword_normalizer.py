@@ -0,0 +1,174 @@
+"""
+Keyword canonicalization shared by keyword ingest and the keyword backfill.
+
+canonical_key("Large Language Models (LLMs)") -> "large language model"
+canonical_key("Graph-Neural Networks") -> "graph neural network"
+
+A keyword is Unicode-folded, lower-cased, stripped of punctuation (hyphens become spaces),
+its head noun (the last word) singularized, then mapped through the alias dictionary
+loaded from KEYWORD_ALIASES_FILE. Keyword rows sharing a key are one keyword.
+
+Merges that need the whole vocabulary are found by plan_merges() and persisted by the
+backfill (database_helper/canonicalize_keywords.py) in the keyword_alias table:
+- an acronym ("LLM", "GNNs") joins the only multi-word keyword with those initials;
+- "Phrase (ACRONYM)" spellings declare the short form explicitly;
+- optionally, keywords whose embeddings are nearly identical.
+"""
+import os
+import re
+import csv
+import logging
+from functools import lru_cache
+from collections import defaultdict
+
+from config import KEYWORD_ALIASES_FILE
+from name_normalizer import fold
+
+logger = logging.getLogger(__name__)
+
+_PARENTHETICAL_RE = re.compile(r"^(.*?)\s*\(\s*([^()]+?)\s*\)\s*$")
+_SEPARATOR_RE = re.compile(r"[-_/]")
+_NON_WORD_RE = re.compile(r"[^\w\s+#]")
+_SPACE_RE = re.compile(r"\s+")
+_ACRONYM_RE = re.compile(r"^[A-Z][A-Z0-9]{1,5}s?$")
+_SHORT_FORM_RE = re.compile(r"^[A-Za-z][A-Za-z0-9]{1,6}$")
+# Singular words ending in "s" that the plural rules must leave alone
+_KEEP_S = ("ss", "us", "is", "ics", "sis", "ous", "ness")
+
+
+def singularize(word: str) -> str:
+    """Rule-based English plural -> singular for a lower-case word: "networks" -> "network"."""
+    if len(word) <= 3 or not word.endswith("s") or word.endswith(_KEEP_S):
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zes")):
+        return word[:-2]
+    return word[:-1]
+
+
+def clean_keyword(keyword: str) -> str:
+    """Fold, lower-case and drop punctuation, keeping "+" and "#" ("C++", "C#")."""
+    text = _SEPARATOR_RE.sub(" ", fold(keyword).lower())
+    return _SPACE_RE.sub(" ", _NON_WORD_RE.sub("", text)).strip()
+
+
+def _base_key(keyword: str) -> str:
+    """Cleaned keyword with its head noun singularized, before alias mapping."""
+    match = _PARENTHETICAL_RE.match(keyword)
+    if match and match.group(1):
+        keyword = match.group(1)
+    words = clean_keyword(keyword).split()
+    if not words:
+        return ""
+    words[-1] = singularize(words[-1])
+    return " ".join(words)
+
+
+def load_aliases(path: str = KEYWORD_ALIASES_FILE) -> dict[str, str]:
+    """{alias key: canonical key} from the keyword alias CSV (columns alias,canonical), if present."""
+    aliases = {}
+    if path and os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                alias, canonical = row.get("alias"), row.get("canonical")
+                if alias and canonical:
+                    aliases[_base_key(alias)] = _base_key(canonical)
+        logger.info("Loaded %d keyword aliases from %s", len(aliases), path)
+    for canonical in set(aliases.values()):
+        aliases.pop(canonical, None)
+    return aliases
+
+
+ALIASES = load_aliases()
+
+
+@lru_cache(maxsize=100_000)
+def canonical_key(keyword: str) -> str:
+    """Canonical key of a keyword; empty input is returned as is."""
+    if not keyword:
+        return keyword
+    key = _base_key(keyword)
+    return ALIASES.get(key, key)
+
+
+def acronym_of(keyword: str) -> str:
+    """Key of an acronym spelled in capitals ("LLMs" -> "llm"), or "" when the keyword is not one."""
+    keyword = keyword.strip()
+    return _base_key(keyword) if _ACRONYM_RE.match(keyword) else ""
+
+
+def initials(key: str) -> str:
+    words = key.split()
+    return "".join(w[0] for w in words) if len(words) > 1 else ""
+
+
+def plan_merges(keywords: list[str], embedder=None, threshold: float = 0.95) -> dict[str, str]:
+    """
+    Vocabulary-wide merges between canonical keys, as {key: key it merges into}.
+
+    Explicit "Phrase (ACRONYM)" spellings come first; then capitalized acronyms join the only
+    multi-word key with matching initials. With an `embedder` (see embedding_pipeline), keys whose
+    embeddings have cosine similarity >= `threshold` are merged too, into the more frequent one.
+    """
+    counts = defaultdict(int)
+    for keyword in keywords:
+        key = canonical_key(keyword)
+        if key:
+            counts[key] += 1
+    parent = {key: key for key in counts}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(key: str, into: str):
+        root, target = find(key), find(into)
+        if root != target:
+            parent[root] = target
+
+    declared = {}
+    for keyword in keywords:
+        match = _PARENTHETICAL_RE.match(keyword)
+        # A short word with at least two capitals in parentheses is a declared short form ("ViT", "LLMs")
+        if match and match.group(1) and _SHORT_FORM_RE.match(match.group(2)) \
+                and sum(ch.isupper() for ch in match.group(2)) >= 2:
+            declared.setdefault(_base_key(match.group(2)), canonical_key(keyword))
+    for acronym, key in declared.items():
+        if acronym in parent and acronym != key:
+            union(acronym, key)
+
+    by_initials = defaultdict(set)
+    for key in counts:
+        if initials(key):
+            by_initials[initials(key)].add(key)
+    for keyword in keywords:
+        acronym = acronym_of(keyword)
+        if acronym in parent and acronym not in declared and len(by_initials.get(acronym, ())) == 1:
+            union(acronym, next(iter(by_initials[acronym])))
+
+    if embedder is not None:
+        from similarity_search import top_k_similar, normalize_rows
+
+        keys = sorted({find(key) for key in counts})
+        vectors = normalize_rows(embedder.embed(keys))
+        rows, scores = top_k_similar(vectors, vectors, min(6, len(keys)))
+        for i, (neighbours, similarities) in enumerate(zip(rows, scores)):
+            for j, similarity in zip(neighbours, similarities):
+                if j != i and j >= 0 and similarity >= threshold:
+                    a, b = keys[i], keys[j]
+                    # The more frequent spelling survives
+                    union(*((a, b) if (counts[a], b) <= (counts[b], a) else (b, a)))
+
+    merges = {key: find(key) for key in counts if find(key) != key}
+    logger.info("Planned %d keyword merges over %d keys", len(merges), len(counts))
+    return merges
+
+
+def reload_aliases():
+    """Re-read KEYWORD_ALIASES_FILE and drop memoized keys."""
+    global ALIASES
+    ALIASES = load_aliases()
+    canonical_key.cache_clear()
@@ -8,4 +8,8 @@ def get_llm_response(message):
 
 def get_text_embedding(text):
     embedding = np.random.rand(768)  # 生成 768 维随机浮点数向量（范围 [0,1]）
-    return embedding
\ No newline at end of file
+    return embedding
+
+def get_text_embeddings(texts):
+    embeddings = np.random.rand(len(texts), 768)  # 批量版本，每行对应一个文本
+    return embeddings
@@ -1,6 +1,6 @@
-from sqlalchemy import TIMESTAMP, Table, Column, Date, Float, Integer, String, Text, ForeignKey, UniqueConstraint, Index
+from sqlalchemy import TIMESTAMP, Table, Column, Date, Float, Integer, String, Text, ForeignKey, UniqueConstraint, Index, DDL, event
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy.dialects.postgresql import ARRAY
+from db_types import StringList, Float32Vector
 
 Base = declarative_base()
 
@@ -41,6 +41,13 @@ class ConferenceInstance(Base):
     # 定义与 `Paper` 表的关系
     paper_to_instance = relationship("Paper", back_populates="instance_to_paper")
 
+    # 索引与约束需与 database_helper/migrations 保持一致
+    __table_args__ = (
+        # 每个会议每年一个实例，upsert 按 (conference_id, year) 查找
+        UniqueConstraint('conference_id', 'year', name='uq_conference_instance_conf_year'),
+        Index('idx_conference_instance_year', 'year'),
+    )
+
     def __repr__(self):
         return f"<ConferenceInstance(id={self.instance_id}, name={self.name}， year={self.year})>"
 
@@ -56,6 +63,10 @@ class Reference(Base):
     web_url = Column(String(255))  # 参考文献的网页 URL 或指向原始论文的 URL
     # 定义与 Paper 表的多对多关系，通过 paper_reference 中间表
     paper_to_reference = relationship("Paper", secondary="paper_reference", back_populates="reference_to_paper")
+
+    __table_args__ = (
+        Index('idx_reference_title', 'title'),
+    )
     def __repr__(self):
         return f"<Reference(id={self.reference_id}, title={self.title}, author={self.author}, year={self.year})>"
 
@@ -65,6 +76,11 @@ class PaperReference(Base):
     paper_id = Column(Integer, ForeignKey('paper.paper_id', ondelete='CASCADE'), primary_key=True)  # 关联论文
     reference_id = Column(Integer, ForeignKey('reference.reference_id', ondelete='CASCADE'), primary_key=True)  # 关联参考文献
 
+    # 主键只支持按 paper_id 查找，反查需要单独索引
+    __table_args__ = (
+        Index('idx_paper_reference_reference', 'reference_id'),
+    )
+
 # 文章信息表
 class Paper(Base):
     __tablename__ = "paper"
@@ -80,7 +96,7 @@ class Paper(Base):
     abstract = Column(Text)  # 论文摘要
     content = Column(Text)  # 论文完整内容
     pdf_path = Column(String(255))  # 论文 PDF 路径或 URL
-    citation_count = Column(Integer, default=0)  # 论文引用次数，默认为 0
+    citation_count = Column(Integer, nullable=False, default=0, server_default='0')  # 论文引用次数，默认为 0（非空，供分页排序）
     award = Column(String(255))  # 获奖情况（例如 best paper, best paper runner）
     doi = Column(String(255))  # Digital Object Identifier
     url = Column(String(255))  # 论文链接
@@ -102,6 +118,12 @@ class Paper(Base):
     # 创建索引，方便通过标题进行快速查找
     __table_args__ = (
         Index('idx_paper_title', 'title'),
+        # 同一会议实例中标题唯一，upsert 按 (instance_id, title) 查找
+        UniqueConstraint('instance_id', 'title', name='uq_paper_instance_title'),
+        # 键集分页: (citation_count, paper_id) / (year, paper_id) 倒序翻页
+        Index('idx_paper_citations_id', 'citation_count', 'paper_id'),
+        Index('idx_paper_instance_citations_id', 'instance_id', 'citation_count', 'paper_id'),
+        Index('idx_paper_year_id', 'year', 'paper_id'),
     )
     def __repr__(self):
         return f"<Paper(id={self.paper_id},title={self.title}, year={self.year}, tldr={self.tldr})>"
@@ -110,7 +132,9 @@ class Paper(Base):
 class ContentEmbedding(Base):
     __tablename__ = "content_embedding"
     embedding_id = Column(Integer, primary_key=True, autoincrement=True)  # 自增主键
-    embedding = Column(ARRAY(Float), nullable=False)  # 存储 768 维的论文内容向量
+    embedding = Column(Float32Vector, nullable=False)  # 存储 768 维的论文内容向量（PostgreSQL 为 ARRAY，其他数据库为 float32 BLOB）
+    model = Column(String(255))  # 生成向量的模型名称
+    text_hash = Column(String(64))  # 输入文本的 SHA-256，文本未变化时跳过重新计算
     
     # 定义与 `Paper` 表的关系
     paper_to_embedding = relationship("Paper", secondary="paper_embedding", back_populates="embedding_to_paper")
@@ -129,6 +153,10 @@ class PaperEmbeddingIndex(Base):
     paper_id = Column(Integer, ForeignKey('paper.paper_id', ondelete='CASCADE'), primary_key=True)  
     embedding_id = Column(Integer, ForeignKey('content_embedding.embedding_id', ondelete='CASCADE'), primary_key=True)  
 
+    __table_args__ = (
+        Index('idx_paper_embedding_embedding', 'embedding_id'),
+    )
+
 # 作者信息表
 class Author(Base):
     __tablename__ = "author"
@@ -162,7 +190,8 @@ paper_author = Table(
     'paper_author',
     Base.metadata,
     Column('paper_id', Integer, ForeignKey('paper.paper_id', ondelete='CASCADE'), primary_key=True),
-    Column('author_id', String(255), ForeignKey('author.author_id', ondelete='CASCADE'), primary_key=True)
+    Column('author_id', String(255), ForeignKey('author.author_id', ondelete='CASCADE'), primary_key=True),
+    Index('idx_paper_author_author', 'author_id'),
 )
 
 # 机构信息表
@@ -171,7 +200,7 @@ class Affiliation(Base):
     
     affiliation_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)      # 组织名称
-    aliases = Column(ARRAY(String), nullable=True)  # 组织别名
+    aliases = Column(StringList, nullable=True)  # 组织别名（PostgreSQL 为 ARRAY，其他数据库为 JSON）
     type = Column(String(100), nullable=True)      # 类型（如 university, industry 等）
     location = Column(String(255), nullable=True)                 # 地点
     website = Column(String(255), nullable=True)                   # 网站
@@ -181,6 +210,12 @@ class Affiliation(Base):
         secondary="author_affiliation",  # 通过 author_affiliation 连接表
         back_populates="affiliation_to_author"  # 在 Author 中定义反向关系
     )
+
+    __table_args__ = (
+        Index('idx_affiliation_name', 'name'),
+        # GIN 索引支持 aliases @> ARRAY[...] 查询，仅 PostgreSQL
+        Index('idx_affiliation_aliases_gin', 'aliases', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     def __repr__(self):
         return f"<Affiliation(id={self.affiliation_id}, name={self.name}, type={self.type})>"
     
@@ -190,23 +225,143 @@ class AuthorAffiliation(Base):
     author_id = Column(String(255), ForeignKey('author.author_id', ondelete='CASCADE'), primary_key=True)  # 关联作者
     affiliation_id = Column(Integer, ForeignKey('affiliation.affiliation_id', ondelete='CASCADE'), primary_key=True)  # 关联组织
 
+    __table_args__ = (
+        Index('idx_author_affiliation_affiliation', 'affiliation_id'),
+    )
+
 # 关键字信息表
 class Keyword(Base):
     __tablename__ = 'keyword'
     
     keyword_id = Column(Integer, primary_key=True)  # 自增主键
     keyword = Column(String(255), unique=True, nullable=False)  # 关键字，不能为空，唯一
+    canonical_key = Column(String(255))  # 规范化键（keyword_normalizer.canonical_key），同键的写法视为同一关键字
     description = Column(Text)  # 关键字的描述
     # 定义与 Paper 表的多对多关系，通过 paper_keyword 中间表
     paper_to_keyword = relationship("Paper", secondary="paper_keyword", back_populates="keyword_to_paper")
+
+    __table_args__ = (
+        # 三元组 GIN 索引支持关键字模糊搜索，仅 PostgreSQL（需要 pg_trgm 扩展）
+        Index('idx_keyword_keyword_trgm', 'keyword', postgresql_using='gin',
+              postgresql_ops={'keyword': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('idx_keyword_canonical_key', 'canonical_key'),
+    )
     def __repr__(self):
         return f"<Keyword(id={self.keyword_id}, keyword={self.keyword}, description={self.description})>"
 
+# 关键字别名表：被合并的规范化键（如缩写 llm）指向保留的规范化键（如 large language model）
+class KeywordAlias(Base):
+    __tablename__ = 'keyword_alias'
+    alias_key = Column(String(255), primary_key=True)
+    canonical_key = Column(String(255), nullable=False)
+
 # 文章-关键字关系表
 class PaperKeyword(Base):
     __tablename__ = 'paper_keyword'  # Ensure this matches the secondary table name used in the Paper class
     paper_id = Column(Integer, ForeignKey('paper.paper_id', ondelete='CASCADE'), primary_key=True)  # 关联论文
     keyword_id = Column(Integer, ForeignKey('keyword.keyword_id', ondelete='CASCADE'), primary_key=True)  # 关联关键字
 
+    __table_args__ = (
+        Index('idx_paper_keyword_keyword', 'keyword_id'),
+    )
+
+# 主题表：topic_clustering.py 对论文向量做 mini-batch k-means 聚类得到的研究主题
+class Topic(Base):
+    __tablename__ = 'topic'
+    topic_id = Column(Integer, primary_key=True, autoincrement=False)  # 聚类编号，从 0 开始
+    model = Column(String(255), nullable=False)  # 聚类所用的向量模型
+    label = Column(String(255))  # 由主题内最有区分度的关键字生成
+    centroid = Column(Float32Vector, nullable=False)  # L2 归一化的聚类中心
+    paper_count = Column(Integer, nullable=False, default=0)  # 已分配到该主题的论文数
+
+# 论文-主题表：每篇论文属于一个主题
+class PaperTopic(Base):
+    __tablename__ = 'paper_topic'
+    paper_id = Column(Integer, ForeignKey('paper.paper_id', ondelete='CASCADE'), primary_key=True)
+    topic_id = Column(Integer, ForeignKey('topic.topic_id', ondelete='CASCADE'), nullable=False)
+    similarity = Column(Float)  # 与主题中心的余弦相似度
+
+    __table_args__ = (
+        Index('idx_paper_topic_topic', 'topic_id'),
+    )
+
+# ---------------------------------------------------------------------------
+# 统计汇总表：由 StatisticsRepository 在每次导入结束后增量刷新，仪表盘直接读取
+# ---------------------------------------------------------------------------
+
+# 会议实例统计表
+class InstanceStats(Base):
+    __tablename__ = 'instance_stats'
+    instance_id = Column(Integer, ForeignKey('conference_instance.instance_id', ondelete='CASCADE'), primary_key=True)
+    paper_count = Column(Integer, nullable=False, default=0)  # 论文数
+    avg_citations = Column(Float)  # 平均引用数，无论文时为空
+    max_citations = Column(Integer)  # 最高引用数，无论文时为空
+
+    def __repr__(self):
+        return f"<InstanceStats(instance_id={self.instance_id}, paper_count={self.paper_count})>"
+
+# 会议实例-关键字统计表
+class InstanceKeywordStats(Base):
+    __tablename__ = 'instance_keyword_stats'
+    instance_id = Column(Integer, ForeignKey('conference_instance.instance_id', ondelete='CASCADE'), primary_key=True)
+    keyword_id = Column(Integer, ForeignKey('keyword.keyword_id', ondelete='CASCADE'), primary_key=True)
+    paper_count = Column(Integer, nullable=False)  # 该实例中含此关键字的论文数
+
+    __table_args__ = (
+        # 实例内按论文数取前 N 个关键字
+        Index('idx_instance_keyword_stats_count', 'instance_id', 'paper_count'),
+    )
+
+# 机构-会议实例统计表
+class OrganizationInstanceStats(Base):
+    __tablename__ = 'organization_instance_stats'
+    affiliation_id = Column(Integer, ForeignKey('affiliation.affiliation_id', ondelete='CASCADE'), primary_key=True)
+    instance_id = Column(Integer, ForeignKey('conference_instance.instance_id', ondelete='CASCADE'), primary_key=True)
+    paper_count = Column(Integer, nullable=False)  # 该机构在此实例中的论文数（去重）
+    avg_citations = Column(Float)
+    max_citations = Column(Integer)
+
+    __table_args__ = (
+        # 刷新时按实例删除重算
+        Index('idx_organization_instance_stats_instance', 'instance_id'),
+    )
+
+# 关键字共现统计表（双向存储，按 keyword_id 查找）
+class KeywordCooccurrence(Base):
+    __tablename__ = 'keyword_cooccurrence'
+    keyword_id = Column(Integer, ForeignKey('keyword.keyword_id', ondelete='CASCADE'), primary_key=True)
+    other_keyword_id = Column(Integer, ForeignKey('keyword.keyword_id', ondelete='CASCADE'), primary_key=True)
+    paper_count = Column(Integer, nullable=False)  # 同时含两个关键字的论文数
+
+    __table_args__ = (
+        Index('idx_keyword_cooccurrence_count', 'keyword_id', 'paper_count'),
+    )
+
+# 主题-会议实例统计表：每个主题在每个会议实例中的论文数，用于按年份的主题趋势图
+class TopicInstanceStats(Base):
+    __tablename__ = 'topic_instance_stats'
+    topic_id = Column(Integer, ForeignKey('topic.topic_id', ondelete='CASCADE'), primary_key=True)
+    instance_id = Column(Integer, ForeignKey('conference_instance.instance_id', ondelete='CASCADE'), primary_key=True)
+    paper_count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('idx_topic_instance_stats_instance', 'instance_id'),
+    )
+
+# 相关论文表：database_helper/precompute_related_papers.py 按向量相似度预先计算每篇论文的 k 个最近邻
+class RelatedPaper(Base):
+    __tablename__ = 'related_paper'
+    paper_id = Column(Integer, ForeignKey('paper.paper_id', ondelete='CASCADE'), primary_key=True)
+    related_paper_id = Column(Integer, ForeignKey('paper.paper_id', ondelete='CASCADE'), primary_key=True)
+    rank = Column(Integer, nullable=False)  # 1 为最相似
+    score = Column(Float, nullable=False)  # 余弦相似度
+
+# pg_trgm 需要在创建 keyword 表的三元组索引之前启用
+event.listen(
+    Keyword.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 
 
@@ -0,0 +1,95 @@
+"""
+Name normalization shared by the author and affiliation repositories.
+
+normalize("Université de Montréal.") -> "UNIVERSITE DE MONTREAL"
+normalize("Massachusetts Institute of Technology") -> "MIT"
+
+A name is Unicode-folded (accents removed), upper-cased, stripped of punctuation and
+whitespace-collapsed, then mapped through the alias dictionary. Aliases come from the
+`aliases` lists in organizations.yaml and, when present, CANONICAL_INSTITUTIONS_FILE.
+"""
+import os
+import re
+import csv
+import logging
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from config import ORG_CONFIG, CANONICAL_INSTITUTIONS_FILE, load_organization_config
+
+logger = logging.getLogger(__name__)
+
+# Compiled once; normalize() runs in the innermost ingest loop
+_COMBINING_RE = re.compile(r"[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fold(text: str) -> str:
+    """Decompose and drop combining marks: "Zürich" -> "Zurich"."""
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text))
+
+
+def clean(text: str) -> str:
+    """Fold, upper-case, drop punctuation and collapse whitespace, without alias mapping."""
+    text = _NON_WORD_RE.sub("", fold(text).upper())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def load_aliases(org_config: dict = ORG_CONFIG, path: str = CANONICAL_INSTITUTIONS_FILE) -> dict[str, str]:
+    """
+    Build the {cleaned alias: cleaned canonical name} dictionary.
+    Entries of the canonical-institutions CSV (columns alias,canonical) are overridden by organizations.yaml.
+    """
+    aliases = {}
+    if path and os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                alias, canonical = row.get("alias"), row.get("canonical")
+                if alias and canonical:
+                    aliases[clean(alias)] = clean(canonical)
+        logger.info("Loaded %d institution aliases from %s", len(aliases), path)
+
+    for organizations in (org_config or {}).get("tracked_organizations", {}).values():
+        for org in organizations:
+            canonical = clean(org["name"])
+            for alias in org.get("aliases") or ():
+                aliases[clean(alias)] = canonical
+    # A canonical name never maps elsewhere
+    for canonical in set(aliases.values()):
+        aliases.pop(canonical, None)
+    return aliases
+
+
+ALIASES = load_aliases()
+
+
+@lru_cache(maxsize=100_000)
+def normalize(name: str) -> str:
+    """Normalized, alias-resolved form of an author or affiliation name. Empty input is returned as is."""
+    if not name:
+        return name
+    cleaned = clean(name)
+    return ALIASES.get(cleaned, cleaned)
+
+
+def normalize_series(names: pd.Series) -> pd.Series:
+    """
+    normalize() a whole column at once; missing values stay missing.
+    Author and affiliation columns repeat the same names many times, so each distinct
+    value is normalized once and the results are broadcast back with a single take.
+    """
+    codes, uniques = pd.factorize(names, use_na_sentinel=True)
+    normalized = np.array([normalize(u) for u in uniques] + [None], dtype=object)
+    # -1 (missing) picks the trailing None
+    return pd.Series(normalized[codes], index=names.index, name=names.name)
+
+
+def reload_aliases():
+    """Re-read the alias sources (e.g. after editing organizations.yaml) and drop memoized results."""
+    global ALIASES
+    ALIASES = load_aliases(load_organization_config())
+    normalize.cache_clear()
@@ -0,0 +1,81 @@
+import os
+import re
+
+# Compiled once; applied to every note of every page
+_BIBTEX_URL_RE = re.compile(r"\burl\s*=\s*\{\s*([^}\s]+)\s*\}", re.IGNORECASE)
+_FORUM_ID_RE = re.compile(r"[?&]id=([^&#\s]+)")
+
+
+def _value(content: dict, key: str, default):
+    """Return content[key]['value'] for OpenReview API v2 fields, or default."""
+    field = content.get(key)
+    if isinstance(field, dict):
+        return field.get('value', default)
+    return default
+
+
+def extract_forum_url(bibtex: str) -> str:
+    """Return the url={...} field of a bibtex entry, or None if it is missing."""
+    if not bibtex:
+        return None
+    match = _BIBTEX_URL_RE.search(bibtex)
+    return match.group(1) if match else None
+
+
+def extract_paper_id(url: str) -> str:
+    """Return the id=... query parameter of an OpenReview forum URL, or None."""
+    if not url:
+        return None
+    match = _FORUM_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def normalize_notes(notes: list, base_url: str, pdf_dir: str) -> tuple[list, list]:
+    """
+    Normalize one page of OpenReview notes into metadata rows.
+
+    Rows follow openreview_client.METADATA_COLUMNS. A note that cannot be normalized is
+    reported in the returned failures list as {"note_id", "error"} instead of aborting the page.
+    When the bibtex carries no usable forum URL, the note's forum/id is used to build it.
+
+    :return: (rows, failures)
+    """
+    rows = []
+    failures = []
+    for note in notes:
+        note_id = getattr(note, 'id', None)
+        try:
+            content = note.content or {}
+
+            keywords = _value(content, 'keywords', [])
+            if not isinstance(keywords, list):
+                keywords = []
+
+            pdf = _value(content, 'pdf', '')
+            pdf_url = f"{base_url}{pdf}" if pdf else "N/A"
+
+            url = extract_forum_url(_value(content, '_bibtex', ''))
+            paper_id = extract_paper_id(url)
+            if paper_id is None:
+                paper_id = getattr(note, 'forum', None) or note_id
+                if not paper_id:
+                    raise ValueError("note has neither a bibtex URL nor an id")
+                url = f"{base_url}/forum?id={paper_id}"
+
+            rows.append([
+                _value(content, 'title', 'N/A'),
+                _value(content, 'authorids', []),
+                _value(content, 'authors', []),
+                _value(content, 'venue', 'N/A'),
+                _value(content, 'primary_area', 'N/A'),
+                keywords,
+                _value(content, 'TLDR', 'N/A'),
+                _value(content, 'abstract', 'N/A'),
+                url,
+                pdf_url,
+                f"{base_url}/attachment?id={paper_id}&name=supplementary_material",
+                os.path.join(pdf_dir, f"{paper_id}.pdf"),
+            ])
+        except Exception as e:
+            failures.append({"note_id": note_id, "error": f"{type(e).__name__}: {e}"})
+    return rows, failures
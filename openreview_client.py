@@ -3,6 +3,9 @@ import logging
 import openreview
 import csv
 from dotenv import load_dotenv
+from http_cache import get_shared_session
+from utility import LIST_COLUMNS
+from note_normalizer import normalize_notes
 
 load_dotenv()
 
@@ -10,60 +13,130 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+METADATA_COLUMNS = ['paper_title', 'author_ids', 'author_names', 'venue', 'research_area', 'keywords', 'tldr', 'abstract', 'url', 'pdf_url', 'attachment_url', 'pdf_path']
+
+if pa is not None:
+    PARQUET_SCHEMA = pa.schema([
+        pa.field(name, pa.list_(pa.string()) if name in LIST_COLUMNS
+                 else pa.dictionary(pa.int32(), pa.string()) if name in ('venue', 'research_area')
+                 else pa.string())
+        for name in METADATA_COLUMNS
+    ])
+
 class OpenReviewClient:
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, use_http_cache: bool = True, page_size: int = 1000, client=None):
         self.base_url = 'https://openreview.net'
-        self.client = openreview.api.OpenReviewClient(baseurl="https://api2.openreview.net")
+        # `client` lets callers inject a stand-in such as openreview_replay.ReplayClient
+        self.client = client or openreview.api.OpenReviewClient(baseurl="https://api2.openreview.net")
+        if use_http_cache and client is None:
+            # Route note pages through the shared on-disk cache and connection pool
+            self.client.session = get_shared_session()
         self.csv_path = os.getenv('CSV_FILE_PATH')
         self.pdf_path = pdf_path
+        self.page_size = page_size
+        self.failures = []
 
-    def load_metadata_to_csv(self, conference: str, year: str):
+    def _iter_note_pages(self, venue_id: str, mintcdate: int = None):
+        """
+        Yield the accepted submissions of a venue one page at a time.
+        With `mintcdate` (ms since epoch) only notes created since then are returned.
+        """
+        query = {'content': {'venueid': venue_id}}
+        if mintcdate is not None:
+            query['mintcdate'] = mintcdate
+        offset = 0
+        while True:
+            page = self.client.get_notes(**query, offset=offset, limit=self.page_size)
+            # The server may cap the page below `limit`, so only an empty page ends the scan
+            if not page:
+                return
+            yield page
+            offset += len(page)
+
+    def _fetch_metadata(self, conference: str, year: str, mintcdate: int = None) -> list:
         """
-        Instantiate the OpenReview client, fetch conference papers for NeurIPS 2024, 
-        and save their metadata to a CSV file.
+        Fetch all accepted submissions of a venue and flatten them into metadata rows
+        ordered as METADATA_COLUMNS. Returns None if the submissions could not be retrieved.
+        Notes that fail to normalize are collected in self.failures and skipped.
         """
         venue_id = f"{conference}.cc/{year}/Conference"
 
-        # Retrieve all submissions of NeurIPS 2024
+        metadata = []
+        self.failures = []
         try:
-            submissions = self.client.get_all_notes(content={'venueid': venue_id})
+            for page in self._iter_note_pages(venue_id, mintcdate=mintcdate):
+                rows, failures = normalize_notes(page, self.base_url, self.pdf_path)
+                metadata.extend(rows)
+                self.failures.extend(failures)
         except Exception as e:
             logger.error("Error retrieving submissions: %s", e)
-            return
-
-        # Process each submission to extract details
-        metadata = []
-        for submission in submissions:
-            content = submission.content
-            paper_title = content.get('title', {}).get('value', 'N/A')
-            authorids = content.get('authorids', {}).get('value', [])
-            authors = content.get('authors', {}).get('value', [])
-            venue = content.get('venue', {}).get('value', 'N/A')
-            research_area = content.get('primary_area', {}).get('value', 'N/A')
-            keywrods = submission.content.get('keywords', {}).get('value', '')
-            tldr = content.get('TLDR', {}).get('value', 'N/A')
-            abstract = content.get('abstract', {}).get('value', 'N/A')
+            return None
 
-            pdf = content.get('pdf', {}).get('value', '')
-            pdf_url = f"{self.base_url}{pdf}" if pdf else "N/A"
+        if self.failures:
+            logger.warning("Skipped %d of %d submissions that could not be normalized (e.g. %s)",
+                           len(self.failures), len(metadata) + len(self.failures), self.failures[0])
+        return metadata
 
-            bibtex_entry = submission.content.get('_bibtex', {}).get('value', '')
-            url = bibtex_entry.split('url={')[1].split('}')[0].strip()
-            paper_id = url.split('?id=')[1].split('&')[0]
-            attachment_url = f"{self.base_url}/attachment?id={paper_id}&name=supplementary_material"
-
-            data_path = os.path.join(self.pdf_path, f"{paper_id}.pdf")
-
-            metadata.append([paper_title, authorids, authors, venue, research_area, keywrods, tldr, abstract, url, pdf_url, attachment_url, data_path])
+    def load_metadata_to_csv(self, conference: str, year: str):
+        """
+        Fetch conference papers from OpenReview and save their metadata to a CSV file.
+        List-valued fields are written as Python literals.
+        """
+        metadata = self._fetch_metadata(conference, year)
+        if metadata is None:
+            return
 
         if metadata:
             try:
                 with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
                     writer = csv.writer(file)
-                    writer.writerow(['paper_title', 'author_ids', 'author_names', 'venue', 'research_area', 'keywords', 'tldr', 'abstract', 'url', 'pdf_url', 'attachment_url', 'pdf_path'])
+                    writer.writerow(METADATA_COLUMNS)
                     writer.writerows(metadata)
                 logger.info("Data has been successfully saved to %s", self.csv_path)
             except Exception as e:
                 logger.error("Error writing to CSV file: %s", e)
         else:
-            logger.info("No data found to write to CSV.")
\ No newline at end of file
+            logger.info("No data found to write to CSV.")
+
+    def load_metadata_to_parquet(self, conference: str, year: str, output_path: str = None):
+        """
+        Fetch conference papers from OpenReview and save their metadata to a Parquet file.
+        List-valued fields are stored as native list<string> columns and the low-cardinality
+        `venue` / `research_area` columns are dictionary-encoded.
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet output: pip install pyarrow")
+
+        output_path = output_path or os.path.splitext(self.csv_path)[0] + '.parquet'
+        metadata = self._fetch_metadata(conference, year)
+        if metadata is None:
+            return
+
+        if metadata:
+            columns = list(zip(*metadata))
+            arrays = []
+            for name, values in zip(METADATA_COLUMNS, columns):
+                field_type = PARQUET_SCHEMA.field(name).type
+                if name in LIST_COLUMNS:
+                    # A missing field comes back as '' from OpenReview
+                    values = [v if isinstance(v, list) else [] for v in values]
+                    arrays.append(pa.array(values, type=field_type))
+                elif pa.types.is_dictionary(field_type):
+                    arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+                else:
+                    arrays.append(pa.array(values, type=field_type))
+            table = pa.Table.from_arrays(arrays, schema=PARQUET_SCHEMA)
+            try:
+                pq.write_table(table, output_path, compression='zstd')
+                logger.info("Data has been successfully saved to %s", output_path)
+            except Exception as e:
+                logger.error("Error writing to Parquet file: %s", e)
+        else:
+            logger.info("No data found to write to Parquet.")
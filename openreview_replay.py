@@ -0,0 +1,138 @@
+"""
+Record/replay stand-in for the OpenReview API.
+
+Record note pages once against api2.openreview.net:
+
+    python openreview_replay.py record --conference NeurIPS --year 2024 --dir test/openreview_replay
+
+then benchmark the harvester offline and deterministically:
+
+    python openreview_replay.py bench --conference NeurIPS --year 2024 --dir test/openreview_replay \
+        --latency 0.2 --page_size 1000
+"""
+import os
+import re
+import json
+import time
+import logging
+import argparse
+import openreview
+
+logger = logging.getLogger(__name__)
+
+
+def _venue_file(record_dir: str, venue_id: str) -> str:
+    return os.path.join(record_dir, re.sub(r"[^\w.-]+", "_", venue_id) + ".jsonl")
+
+
+class RecordingClient:
+    """
+    Wraps a live openreview.api.OpenReviewClient and appends every note page it
+    returns to `<record_dir>/<venue>.jsonl`.
+    """
+
+    def __init__(self, client, record_dir: str):
+        self.client = client
+        self.record_dir = record_dir
+        os.makedirs(record_dir, exist_ok=True)
+
+    def get_notes(self, content: dict = None, **kwargs) -> list:
+        notes = self.client.get_notes(content=content, **kwargs)
+        venue_id = (content or {}).get('venueid', 'all')
+        with open(_venue_file(self.record_dir, venue_id), 'a', encoding='utf-8') as f:
+            for note in notes:
+                f.write(json.dumps(note.to_json()) + "\n")
+        return notes
+
+    def get_all_notes(self, content: dict = None, **kwargs) -> list:
+        notes, offset = [], 0
+        while True:
+            page = self.get_notes(content=content, offset=offset, limit=1000, **kwargs)
+            if not page:
+                return notes
+            notes.extend(page)
+            offset += len(page)
+
+
+class ReplayClient:
+    """
+    Serves recorded note pages from disk with the get_notes / get_all_notes interface
+    used by OpenReviewClient.
+
+    :param latency: artificial delay in seconds added to every page request
+    :param page_size: server-side page size cap; a larger `limit` is truncated to it
+    """
+
+    def __init__(self, record_dir: str, latency: float = 0.0, page_size: int = 1000):
+        self.record_dir = record_dir
+        self.latency = latency
+        self.page_size = page_size
+        self.requests = 0
+        self.notes_served = 0
+        self._venues = {}
+
+    def _load_venue(self, venue_id: str) -> list:
+        if venue_id not in self._venues:
+            path = _venue_file(self.record_dir, venue_id)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No recording for venue {venue_id} at {path}")
+            # A note recorded twice (overlapping runs) is kept once, in first-seen order
+            notes = {}
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        data = json.loads(line)
+                        notes.setdefault(data['id'], data)
+            self._venues[venue_id] = [openreview.api.Note.from_json(n) for n in notes.values()]
+        return self._venues[venue_id]
+
+    def get_notes(self, content: dict = None, offset: int = 0, limit: int = 1000, mintcdate: int = None, **kwargs) -> list:
+        notes = self._load_venue((content or {}).get('venueid', 'all'))
+        if mintcdate is not None:
+            notes = [n for n in notes if (n.tcdate or 0) >= mintcdate]
+        page = notes[offset:offset + min(limit, self.page_size)]
+
+        if self.latency:
+            time.sleep(self.latency)
+        self.requests += 1
+        self.notes_served += len(page)
+        return page
+
+    def get_all_notes(self, content: dict = None, **kwargs) -> list:
+        notes, offset = [], 0
+        while True:
+            page = self.get_notes(content=content, offset=offset, limit=self.page_size, **kwargs)
+            if not page:
+                return notes
+            notes.extend(page)
+            offset += len(page)
+
+
+if __name__ == "__main__":
+    from openreview_client import OpenReviewClient
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('mode', choices=['record', 'bench'])
+    parser.add_argument('--conference', type=str, default="NeurIPS")
+    parser.add_argument('--year',       type=int, default=2024)
+    parser.add_argument('--dir',        type=str, default='test/openreview_replay')
+    parser.add_argument('--latency',    type=float, default=0.0)
+    parser.add_argument('--page_size',  type=int, default=1000)
+    parser.add_argument('--mintcdate',  type=int, default=None)
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        live = openreview.api.OpenReviewClient(baseurl="https://api2.openreview.net")
+        harvester = OpenReviewClient(pdf_path='', client=RecordingClient(live, args.dir), page_size=args.page_size)
+        rows = harvester._fetch_metadata(args.conference, args.year)
+        logger.info("Recorded %d notes to %s", len(rows or []), args.dir)
+    else:
+        replay = ReplayClient(args.dir, latency=args.latency, page_size=args.page_size)
+        harvester = OpenReviewClient(pdf_path='', client=replay, page_size=args.page_size)
+        start = time.perf_counter()
+        rows = harvester._fetch_metadata(args.conference, args.year, mintcdate=args.mintcdate)
+        elapsed = time.perf_counter() - start
+        logger.info("Harvested %d rows in %.3fs over %d page requests (%.0f rows/s, %d failures)",
+                    len(rows or []), elapsed, replay.requests, len(rows or []) / max(elapsed, 1e-9),
+                    len(harvester.failures))
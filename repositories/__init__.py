@@ -5,6 +5,18 @@ from .conference_instance_repository import ConferenceInstanceRepository
 from .reference_repository import ReferenceRepository
 from .affiliation_repository import AffiliationRepository
 from .keyword_repository import KeywordRepository
+from .statistics_repository import StatisticsRepository
+from .topic_repository import TopicRepository
+from .affiliation_matcher import AffiliationMatcher
+from .async_repository import (
+    AsyncPaperRepository,
+    AsyncAuthorRepository,
+    AsyncConferenceRepository,
+    AsyncConferenceInstanceRepository,
+    AsyncReferenceRepository,
+    AsyncAffiliationRepository,
+    AsyncKeywordRepository,
+)
 
 
 __all__ = [
@@ -15,4 +27,14 @@ __all__ = [
     "ReferenceRepository",
     "AffiliationRepository",
     "KeywordRepository",
+    "StatisticsRepository",
+    "TopicRepository",
+    "AffiliationMatcher",
+    "AsyncPaperRepository",
+    "AsyncAuthorRepository",
+    "AsyncConferenceRepository",
+    "AsyncConferenceInstanceRepository",
+    "AsyncReferenceRepository",
+    "AsyncAffiliationRepository",
+    "AsyncKeywordRepository",
 ]
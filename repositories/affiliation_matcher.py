@@ -0,0 +1,107 @@
+from collections import Counter, defaultdict
+from typing import Callable, Iterable, Optional
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # pragma: no cover - pure-python fallback
+    from fuzzywuzzy import fuzz
+
+from models import Affiliation
+from name_normalizer import normalize
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AffiliationMatcher:
+    """
+    In-memory fuzzy matcher over affiliation names and aliases.
+
+    Every cleaned name/alias is indexed by its character trigrams. A lookup first
+    checks for an exact cleaned match, then collects the `max_candidates` entries
+    sharing the most (rarest-first) trigrams with the query and scores only those
+    with fuzz.ratio (rapidfuzz when installed), instead of scoring every name and alias.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 85,
+        max_candidates: int = 20,
+        posting_budget: int = 5000,
+        clean: Optional[Callable[[str], str]] = None,
+    ):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.posting_budget = posting_budget
+        self.clean = clean or normalize
+        self._entries = []  # (cleaned string, affiliation_id)
+        self._exact = {}  # cleaned string -> affiliation_id
+        self._postings = defaultdict(list)  # trigram -> entry indexes
+
+    @classmethod
+    def from_session(cls, session, **kwargs) -> "AffiliationMatcher":
+        """Index every affiliation in the database."""
+        matcher = cls(**kwargs)
+        rows = session.query(Affiliation.affiliation_id, Affiliation.name, Affiliation.aliases).all()
+        for affiliation_id, name, aliases in rows:
+            matcher.add(affiliation_id, name, aliases or ())
+        return matcher
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, affiliation_id: int, name: str, aliases: Iterable[str] = ()):
+        for text in (name, *aliases):
+            if not text:
+                continue
+            cleaned = self.clean(text)
+            if not cleaned or cleaned in self._exact:
+                continue
+            self._exact[cleaned] = affiliation_id
+            index = len(self._entries)
+            self._entries.append((cleaned, affiliation_id))
+            for gram in _trigrams(cleaned):
+                self._postings[gram].append(index)
+
+    def _candidates(self, cleaned: str) -> list[int]:
+        # Rarest trigrams first; common ones ("UNI", "NIV", ...) add cost but little selectivity,
+        # so stop once `posting_budget` postings have been counted
+        postings = sorted(
+            (self._postings[g] for g in _trigrams(cleaned) if g in self._postings), key=len
+        )
+        overlap = Counter()
+        scanned = 0
+        for i, posting in enumerate(postings):
+            if i >= 3 and scanned + len(posting) > self.posting_budget:
+                break
+            overlap.update(posting)
+            scanned += len(posting)
+        return [index for index, _ in overlap.most_common(self.max_candidates)]
+
+    def match_with_score(self, name: str) -> tuple[Optional[int], float]:
+        """Return (affiliation_id, score) of the best match, or (None, best score) below the threshold."""
+        if not name:
+            return None, 0.0
+        cleaned = self.clean(name)
+        if cleaned in self._exact:
+            return self._exact[cleaned], 100.0
+
+        best_id, best_score = None, 0.0
+        for index in self._candidates(cleaned):
+            candidate, affiliation_id = self._entries[index]
+            score = fuzz.ratio(cleaned, candidate)
+            if score > best_score:
+                best_id, best_score = affiliation_id, score
+        if best_score >= self.threshold:
+            return best_id, best_score
+        return None, best_score
+
+    def match(self, name: str) -> Optional[int]:
+        """Return the affiliation_id best matching `name`, or None."""
+        return self.match_with_score(name)[0]
+
+    def match_many(self, names: Iterable[str]) -> dict[str, Optional[int]]:
+        """Match many names at once; each distinct name is scored only once."""
+        return {name: self.match(name) for name in dict.fromkeys(names)}
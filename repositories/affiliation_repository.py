@@ -1,64 +1,36 @@
-import re
-from fuzzywuzzy import fuzz
-from models import Affiliation
-from sqlalchemy import or_
+from name_normalizer import normalize
+from models import Affiliation, ConferenceInstance, OrganizationInstanceStats
+from typing import Iterable, Optional
+from sqlalchemy import or_, func, insert
 from config import TRACKED_ORGANIZATIONS
+from .query_cache import cached_query
+from .affiliation_matcher import AffiliationMatcher
 
 
 class AffiliationRepository:
     def __init__(self, session):
         self.session = session
 
-    def _clean_name(self, name: str) -> str:
-        """Clean name by removing special characters and standardizing format"""
-        if not name:
-            return name
-
-        # Convert to uppercase for standardization
-        name = name.upper()
-
-        # Remove special characters and extra whitespace
-        name = re.sub(r"[^\w\s]", "", name)
-        name = re.sub(r"\s+", " ", name).strip()
-
-        # Common abbreviation standardization
-        replacements = {
-            "MASSACHUSETTS INSTITUTE OF TECHNOLOGY": "MIT",
-            "MASS INST OF TECH": "MIT",
-            "MASS INSTITUTE OF TECHNOLOGY": "MIT",
-            # Add more common variations as needed
-        }
-        return replacements.get(name, name)
+    def get_matcher(self, threshold: int = 85) -> AffiliationMatcher:
+        """Build an in-memory matcher over all affiliation names and aliases; reuse it for batches of lookups."""
+        return AffiliationMatcher.from_session(self.session, threshold=threshold, clean=normalize)
 
     def _find_best_matching_affiliation(
         self, name: str, affiliations: list, threshold: int
-    ) -> str:
+    ) -> Affiliation:
         """Find the best matching affiliation using fuzzy string matching"""
-        best_score = 0
-        best_match = None
-
+        matcher = AffiliationMatcher(threshold=threshold, clean=normalize)
+        by_id = {}
         for affiliation in affiliations:
-            # Check primary name
-            score = fuzz.ratio(name, affiliation.name)
-            if score > best_score:
-                best_score = score
-                best_match = affiliation
-
-            # Check aliases
-            if affiliation.aliases:
-                for alias in affiliation.aliases:
-                    score = fuzz.ratio(name, self._clean_institution_name(alias))
-                    if score > best_score:
-                        best_score = score
-                        best_match = affiliation
-
-        return best_match if best_score >= threshold else None
+            matcher.add(affiliation.affiliation_id, affiliation.name, affiliation.aliases or ())
+            by_id[affiliation.affiliation_id] = affiliation
+        return by_id.get(matcher.match(name))
 
     def upsert(self, name: str, **kwargs) -> Affiliation:
 
         affiliation = self.session.query(Affiliation).filter_by(name=name).first()
         if not affiliation:
-            cleaned_name = self._clean_name(name)
+            cleaned_name = normalize(name)
             affiliation = (
                 self.session.query(Affiliation)
                 .filter(
@@ -82,6 +54,70 @@ class AffiliationRepository:
         self.session.commit()
         return affiliation
     
+    def resolve_many(
+        self,
+        names: Iterable[str],
+        matcher: Optional[AffiliationMatcher] = None,
+        create_missing: bool = True,
+    ) -> dict[str, int]:
+        """
+        Resolve many affiliation strings to affiliation ids with a constant number of queries.
+
+        One query fetches every affiliation whose name equals a raw or cleaned input, or whose
+        aliases contain a cleaned input. Names left unresolved are fuzzy-matched against `matcher`
+        (see get_matcher) when given, and the rest are created in one INSERT under their cleaned name.
+        Does not commit. Returns {input name: affiliation_id}; uncreated misses are left out.
+        """
+        names = [n for n in dict.fromkeys(names) if n]
+        if not names:
+            return {}
+        cleaned = {name: normalize(name) for name in names}
+        cleaned_values = list(set(cleaned.values()))
+
+        rows = (
+            self.session.query(Affiliation.affiliation_id, Affiliation.name, Affiliation.aliases)
+            .filter(
+                or_(
+                    Affiliation.name.in_(set(names) | set(cleaned_values)),
+                    Affiliation.aliases.overlap(cleaned_values),
+                )
+            )
+            .all()
+        )
+        by_name = {}
+        by_cleaned = {}
+        for affiliation_id, name, aliases in rows:
+            by_name.setdefault(name, affiliation_id)
+            for alias in (name, *(aliases or ())):
+                by_cleaned.setdefault(alias, affiliation_id)
+
+        resolved = {}
+        for name in names:
+            # Same precedence as a single lookup: exact name, then cleaned name or alias
+            affiliation_id = by_name.get(name) or by_cleaned.get(cleaned[name])
+            if affiliation_id is None and matcher is not None:
+                affiliation_id = matcher.match(name)
+            if affiliation_id is not None:
+                resolved[name] = affiliation_id
+
+        missing = list(dict.fromkeys(cleaned[n] for n in names if n not in resolved))
+        if missing and create_missing:
+            created = dict(
+                (name, affiliation_id)
+                for affiliation_id, name in self.session.execute(
+                    insert(Affiliation).returning(Affiliation.affiliation_id, Affiliation.name),
+                    [{"name": name} for name in missing],
+                )
+            )
+            for name in names:
+                if name not in resolved:
+                    resolved[name] = created[cleaned[name]]
+            if matcher is not None:
+                for name, affiliation_id in created.items():
+                    matcher.add(affiliation_id, name)
+        return resolved
+
+    @cached_query
     def get_tracked_organizations(self) -> list[str]:
         """Get all organizations from database that are in our tracked list."""
         orgs = (self.session.query(Affiliation.name)
@@ -89,3 +125,27 @@ class AffiliationRepository:
                 .distinct()
                 .all())
         return [org[0] for org in orgs]
+
+    @cached_query
+    def get_organization_stats(self, organization: str) -> list[tuple]:
+        """
+        Get (conference, year, paper count, avg citations, max citations) per conference instance
+        for an organization, read from organization_instance_stats.
+        """
+        paper_count = func.sum(OrganizationInstanceStats.paper_count)
+        return (
+            self.session.query(
+                ConferenceInstance.conference_name,
+                ConferenceInstance.year,
+                paper_count,
+                # Several affiliation rows may share a name; weight their averages by paper count
+                func.sum(OrganizationInstanceStats.avg_citations * OrganizationInstanceStats.paper_count) / paper_count,
+                func.max(OrganizationInstanceStats.max_citations),
+            )
+            .join(OrganizationInstanceStats, OrganizationInstanceStats.instance_id == ConferenceInstance.instance_id)
+            .join(Affiliation, Affiliation.affiliation_id == OrganizationInstanceStats.affiliation_id)
+            .filter(Affiliation.name == organization)
+            .group_by(ConferenceInstance.conference_name, ConferenceInstance.year)
+            .order_by(ConferenceInstance.year, ConferenceInstance.conference_name)
+            .all()
+        )
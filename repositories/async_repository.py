@@ -0,0 +1,65 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .paper_repository import PaperRepository
+from .author_repository import AuthorRepository
+from .conference_repository import ConferenceRepository
+from .conference_instance_repository import ConferenceInstanceRepository
+from .reference_repository import ReferenceRepository
+from .affiliation_repository import AffiliationRepository
+from .keyword_repository import KeywordRepository
+
+
+class AsyncRepository:
+    """
+    Async variant of a synchronous repository.
+
+    Each public method of `repository_cls` becomes a coroutine that runs the same query code
+    through AsyncSession.run_sync, so the driver I/O (asyncpg / aiosqlite) yields to the event
+    loop instead of blocking a thread. Returned ORM objects only have their loaded attributes
+    available; unloaded relationships cannot be lazy-loaded outside the call.
+    """
+
+    repository_cls = None
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or not callable(getattr(self.repository_cls, name, None)):
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+
+        async def method(*args, **kwargs):
+            return await self.session.run_sync(
+                lambda sync_session: getattr(self.repository_cls(sync_session), name)(*args, **kwargs)
+            )
+
+        method.__name__ = name
+        return method
+
+
+class AsyncPaperRepository(AsyncRepository):
+    repository_cls = PaperRepository
+
+
+class AsyncAuthorRepository(AsyncRepository):
+    repository_cls = AuthorRepository
+
+
+class AsyncConferenceRepository(AsyncRepository):
+    repository_cls = ConferenceRepository
+
+
+class AsyncConferenceInstanceRepository(AsyncRepository):
+    repository_cls = ConferenceInstanceRepository
+
+
+class AsyncReferenceRepository(AsyncRepository):
+    repository_cls = ReferenceRepository
+
+
+class AsyncAffiliationRepository(AsyncRepository):
+    repository_cls = AffiliationRepository
+
+
+class AsyncKeywordRepository(AsyncRepository):
+    repository_cls = KeywordRepository
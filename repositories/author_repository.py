@@ -1,53 +1,14 @@
-import re
-from models import Author, Affiliation
-from sqlalchemy import or_
+from typing import Optional
+from models import Author, Affiliation, AuthorAffiliation
+from sqlalchemy import delete, insert
+from .affiliation_repository import AffiliationRepository
+from .affiliation_matcher import AffiliationMatcher
 
 
 class AuthorRepository:
     def __init__(self, session):
         self.session = session
 
-    def _clean_name(self, name: str) -> str:
-        """Clean name by removing special characters and standardizing format"""
-        if not name:
-            return name
-
-        # Convert to uppercase for standardization
-        name = name.upper()
-
-        # Remove special characters and extra whitespace
-        name = re.sub(r"[^\w\s]", "", name)
-        name = re.sub(r"\s+", " ", name).strip()
-
-        # Common abbreviation standardization
-        replacements = {
-            "MASSACHUSETTS INSTITUTE OF TECHNOLOGY": "MIT",
-            "MASS INST OF TECH": "MIT",
-            "MASS INSTITUTE OF TECHNOLOGY": "MIT",
-            # Add more common variations as needed
-        }
-        return replacements.get(name, name)
-
-    def _get_affiliation(self, name: str) -> Affiliation:
-        affiliation = self.session.query(Affiliation).filter_by(name=name).first()
-        if not affiliation:
-            cleaned_name = self._clean_name(name)
-            affiliation = (
-                self.session.query(Affiliation)
-                .filter(
-                    or_(
-                        Affiliation.aliases.contains(
-                            [cleaned_name]
-                        ),  # Check if cleaned_name is in aliases
-                        Affiliation.name == cleaned_name,
-                    )
-                )
-                .first()
-            )
-        # if not affiliation:
-        #     raise ValueError(f"Affiliation {name} not found.")
-        return affiliation
-
     def upsert(self, author_id: str, affiliations: list = None, **kwargs) -> Author:
         author = self.session.query(Author).filter_by(author_id=author_id).first()
         if author:
@@ -57,17 +18,48 @@ class AuthorRepository:
             author = Author(author_id=author_id, **kwargs)
             self.session.add(author)
 
-        # Update affiliations
+        # Update affiliations: one lookup query and at most one insert for the whole list
         if affiliations is not None:
-            author.affiliation_to_author = []
-            for affil_name in affiliations:
-                cleaned_name = self._clean_name(affil_name)
-                affiliation = self._get_affiliation(cleaned_name)
-                if not affiliation:
-                    affiliation = Affiliation(name=cleaned_name)
-                    self.session.add(affiliation)
-                if affiliation not in author.affiliation_to_author:
-                    author.affiliation_to_author.append(affiliation)
+            affiliation_ids = set(AffiliationRepository(self.session).resolve_many(affiliations).values())
+            author.affiliation_to_author = (
+                self.session.query(Affiliation)
+                .filter(Affiliation.affiliation_id.in_(affiliation_ids))
+                .all()
+                if affiliation_ids else []
+            )
 
         self.session.commit()
         return author
+
+    def link_affiliations_many(
+        self, author_affiliations: dict[str, list], matcher: Optional[AffiliationMatcher] = None
+    ) -> dict[str, int]:
+        """
+        Replace the affiliations of many existing authors at once, e.g. for a chunk of papers.
+
+        All affiliation strings are resolved together (AffiliationRepository.resolve_many), then the
+        author_affiliation rows are rewritten with one DELETE and one INSERT. Pass a matcher from
+        AffiliationRepository.get_matcher to fuzzy-match names and reuse it across chunks.
+        Returns the {affiliation name: affiliation_id} map.
+        """
+        if not author_affiliations:
+            return {}
+        names = [name for names in author_affiliations.values() for name in names or ()]
+        resolved = AffiliationRepository(self.session).resolve_many(names, matcher=matcher)
+
+        links = {
+            (author_id, resolved[name])
+            for author_id, names in author_affiliations.items()
+            for name in names or ()
+            if name in resolved
+        }
+        self.session.execute(
+            delete(AuthorAffiliation).where(AuthorAffiliation.author_id.in_(list(author_affiliations)))
+        )
+        if links:
+            self.session.execute(
+                insert(AuthorAffiliation),
+                [{"author_id": author_id, "affiliation_id": affiliation_id} for author_id, affiliation_id in links],
+            )
+        self.session.commit()
+        return resolved
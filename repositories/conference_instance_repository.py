@@ -1,6 +1,8 @@
-from models import Conference, ConferenceInstance, Paper
+from models import Conference, ConferenceInstance, InstanceStats
 from typing import Optional
 from sqlalchemy import func
+from .query_cache import cached_query
+from .upsert import upsert_statement
 
 
 class ConferenceInstanceRepository:
@@ -36,11 +38,59 @@ class ConferenceInstanceRepository:
         self.session.commit()
         return instance
 
+    def upsert_many(self, instances: list[dict]) -> list[ConferenceInstance]:
+        """
+        Upsert many conference instances in one transaction with INSERT ... ON CONFLICT
+        on (conference_id, year). Each dict needs conference_id, name and year; other keys
+        are instance columns, and the name is only used for new instances.
+        """
+        if not instances:
+            return []
+
+        conference_ids = {i["conference_id"] for i in instances}
+        known = {
+            c[0]
+            for c in self.session.query(Conference.conference_id)
+            .filter(Conference.conference_id.in_(conference_ids))
+            .all()
+        }
+        missing = conference_ids - known
+        if missing:
+            raise ValueError(f"Conference not found: {sorted(missing)}")
+
+        # One row per (conference_id, year), later entries winning; rows are grouped by the
+        # columns they set so that omitted columns keep their stored values
+        rows = {}
+        for data in instances:
+            fields = dict(data)
+            fields["conference_name"] = fields.pop("name")
+            key = (fields["conference_id"], fields["year"])
+            rows[key] = {**rows.get(key, {}), **fields}
+        groups = {}
+        for row in rows.values():
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        upserted = {}
+        for columns, group in groups.items():
+            statement = upsert_statement(
+                self.session, ConferenceInstance, group, ["conference_id", "year"],
+                [c for c in columns if c not in ("conference_id", "year", "conference_name")] or ["year"],
+            )
+            for instance in self.session.scalars(
+                statement.returning(ConferenceInstance), execution_options={"populate_existing": True}
+            ):
+                upserted[(instance.conference_id, instance.year)] = instance
+
+        self.session.commit()
+        return [upserted[(data["conference_id"], data["year"])] for data in instances]
+
+    @cached_query
     def get_all_conferences(self) -> list[str]:
         """Get list of all conference names."""
         conferences = self.session.query(Conference.name).distinct().all()
         return sorted([conf[0] for conf in conferences])
     
+    @cached_query
     def get_all_years(self) -> list[int]:
         """Get all available years from the database, sorted in descending order."""
         years = (self.session.query(ConferenceInstance.year)
@@ -49,6 +99,7 @@ class ConferenceInstanceRepository:
                 .all())
         return [year[0] for year in years]
     
+    @cached_query
     def get_conferences_by_year(self, year: int) -> list[str]:
         """Get all conferences that have papers in a specific year."""
         conferences = (self.session.query(Conference.name)
@@ -59,6 +110,7 @@ class ConferenceInstanceRepository:
                      .all())
         return [conf[0] for conf in conferences]
 
+    @cached_query
     def get_conference_years(self, conference: str) -> list[int]:
         """Get available years for a specific conference."""
         years = (
@@ -71,39 +123,44 @@ class ConferenceInstanceRepository:
         )
         return [year[0] for year in years]
 
+    @cached_query
     def get_conference_stats(
         self, conference: str, year: Optional[int] = None
     ) -> list[tuple]:
-        """Get statistics for a specific conference."""
+        """
+        Get statistics for a specific conference: (instance, paper count, avg citations, max citations).
+        Read from instance_stats, refreshed by StatisticsRepository after each ingest; instances
+        without a stats row yet are listed with 0 papers and no citation figures.
+        """
         query = (
             self.session.query(
                 ConferenceInstance,
-                func.count(Paper.paper_id),
-                func.avg(Paper.citation_count),
-                func.max(Paper.citation_count),
+                func.coalesce(InstanceStats.paper_count, 0).label("paper_count"),
+                InstanceStats.avg_citations,
+                InstanceStats.max_citations,
             )
             .join(Conference)
-            .outerjoin(Paper)
+            .outerjoin(InstanceStats, InstanceStats.instance_id == ConferenceInstance.instance_id)
             .filter(Conference.name == conference)
         )
 
         if year is not None and year != "All Years":
             query = query.filter(ConferenceInstance.year == year)
 
-        return query.group_by(ConferenceInstance.instance_id).all()
+        return query.order_by(ConferenceInstance.year).all()
 
+    @cached_query
     def get_yearly_conference_stats(self, year: int) -> list[tuple]:
-        """Get statistics for all conferences in a specific year."""
+        """Get (conference name, paper count) for all conferences in a specific year; 0 until stats are refreshed."""
         return (
             self.session.query(
                 Conference.name,
-                func.count(Paper.paper_id),
+                func.coalesce(InstanceStats.paper_count, 0).label("paper_count"),
             )
             .select_from(Conference)
             .join(ConferenceInstance, Conference.conference_id == ConferenceInstance.conference_id)
-            .outerjoin(Paper, ConferenceInstance.instance_id == Paper.instance_id)
+            .outerjoin(InstanceStats, InstanceStats.instance_id == ConferenceInstance.instance_id)
             .filter(ConferenceInstance.year == year)
-            .group_by(Conference.name)
+            .order_by(Conference.name)
             .all()
         )
-
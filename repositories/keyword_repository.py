@@ -1,5 +1,12 @@
-from models import Keyword, Paper, PaperKeyword
-from sqlalchemy import func, text, and_
+from collections import Counter, defaultdict
+from typing import Iterable
+from keyword_normalizer import canonical_key, plan_merges
+from models import Keyword, KeywordAlias, PaperKeyword, InstanceKeywordStats, KeywordCooccurrence
+from sqlalchemy import select, func, insert, update, delete, exists
+from sqlalchemy.orm import aliased
+from .query_cache import cached_query
+
+_CHUNK_SIZE = 500
 
 
 class KeywordRepository:
@@ -7,60 +14,226 @@ class KeywordRepository:
         self.session = session
 
     def upsert(self, keyword: str, description: str = "") -> Keyword:
-        keyword_obj = self.session.query(Keyword).filter_by(keyword=keyword).first()
-        if keyword_obj:
-            setattr(keyword_obj, description, description)
-        else:
-            keyword_obj = Keyword(keyword=keyword, description=description)
-            self.session.add(keyword_obj)
+        """Get or create the canonical keyword row for `keyword` (see keyword_normalizer)."""
+        if not keyword or not keyword.strip():
+            raise ValueError("Keyword must not be empty.")
+        keyword_obj = self.session.get(Keyword, self.resolve_many([keyword])[keyword])
+        if description:
+            keyword_obj.description = description
 
         self.session.commit()
         return keyword_obj
 
+    def _keys(self, keywords: list[str]) -> dict[str, str]:
+        """{keyword: canonical key}, following merges recorded in keyword_alias."""
+        keys = {kw: canonical_key(kw) or kw.strip() for kw in keywords}
+        aliases = {}
+        values = list(set(keys.values()))
+        for start in range(0, len(values), _CHUNK_SIZE):
+            aliases.update(
+                self.session.query(KeywordAlias.alias_key, KeywordAlias.canonical_key)
+                .filter(KeywordAlias.alias_key.in_(values[start:start + _CHUNK_SIZE]))
+                .all()
+            )
+        return {kw: aliases.get(key, key) for kw, key in keys.items()}
+
+    def resolve_many(self, keywords: Iterable[str], create_missing: bool = True) -> dict[str, int]:
+        """
+        Resolve raw author keywords to keyword ids with a constant number of queries.
+
+        Keywords with the same canonical key ("LLMs", "large language model") resolve to the same
+        row; rows from before the canonical_key backfill are matched by their exact text. Missing
+        keys are created in one INSERT, spelled as first seen. Does not commit.
+        Returns {keyword: keyword_id}; empty and uncreated keywords are left out.
+        """
+        keywords = [kw for kw in dict.fromkeys(keywords) if kw and kw.strip()]
+        if not keywords:
+            return {}
+        keys = self._keys(keywords)
+
+        rows = (
+            self.session.query(Keyword.keyword_id, Keyword.keyword, Keyword.canonical_key)
+            .filter(Keyword.canonical_key.in_(set(keys.values())) | Keyword.keyword.in_(keywords))
+            .order_by(Keyword.keyword_id)
+            .all()
+        )
+        by_key, by_text = {}, {}
+        for keyword_id, text, key in rows:
+            if key:
+                by_key.setdefault(key, keyword_id)
+            by_text[text] = keyword_id
+
+        resolved = {}
+        for kw in keywords:
+            keyword_id = by_key.get(keys[kw]) or by_text.get(kw)
+            if keyword_id is not None:
+                resolved[kw] = keyword_id
+
+        missing = {}
+        for kw in keywords:
+            if kw not in resolved:
+                missing.setdefault(keys[kw], kw)
+        if missing and create_missing:
+            created = dict(
+                self.session.execute(
+                    insert(Keyword).returning(Keyword.canonical_key, Keyword.keyword_id),
+                    [{"keyword": kw.strip()[:255], "canonical_key": key} for key, kw in missing.items()],
+                ).all()
+            )
+            for kw in keywords:
+                if kw not in resolved:
+                    resolved[kw] = created[keys[kw]]
+        return resolved
+
+    def canonicalize_all(self, embedder=None, threshold: float = 0.95, dry_run: bool = False) -> dict:
+        """
+        Backfill: key every keyword, merge keywords sharing a key (plus the acronym and optional
+        embedding merges of keyword_normalizer.plan_merges) and remap paper_keyword.
+
+        The oldest row of each key survives and takes the most used spelling. paper_keyword is
+        remapped with one INSERT ... SELECT and one DELETE, and merged keys are recorded in
+        keyword_alias so later ingests resolve them too. Statistics tables must be refreshed afterwards.
+        """
+        rows = self.session.query(Keyword.keyword_id, Keyword.keyword, Keyword.canonical_key).all()
+        usage = dict(
+            self.session.query(PaperKeyword.keyword_id, func.count(PaperKeyword.paper_id))
+            .group_by(PaperKeyword.keyword_id)
+            .all()
+        )
+        aliases = dict(self.session.query(KeywordAlias.alias_key, KeywordAlias.canonical_key).all())
+        merges = plan_merges([text for _, text, _ in rows], embedder=embedder, threshold=threshold)
+
+        def final(key: str) -> str:
+            # Follow new merges and recorded aliases until a key maps nowhere (cycle-safe)
+            seen = set()
+            while key not in seen:
+                seen.add(key)
+                target = merges.get(key) or aliases.get(key)
+                if target is None:
+                    break
+                key = target
+            return key
+
+        own_keys = {keyword_id: canonical_key(text) or text.strip() for keyword_id, text, _ in rows}
+        keys = {keyword_id: final(key) for keyword_id, key in own_keys.items()}
+        groups = defaultdict(list)
+        for keyword_id, text, _ in rows:
+            groups[keys[keyword_id]].append((keyword_id, text))
+
+        displays = []
+        for key, members in groups.items():
+            survivor = min(keyword_id for keyword_id, _ in members)
+            # Prefer spellings of the key itself over acronyms merged into it
+            spellings = Counter()
+            for keyword_id, text in members:
+                spellings[text] += usage.get(keyword_id, 0) + (own_keys[keyword_id] == key) * 0.5
+            display = max(spellings, key=lambda text: (spellings[text], -len(text), text))
+            if len(members) > 1 and display != next(text for keyword_id, text in members if keyword_id == survivor):
+                displays.append({"keyword_id": survivor, "keyword": display})
+
+        new_aliases = {own_keys[k]: keys[k] for k in own_keys if own_keys[k] != keys[k]}
+        new_aliases.update({alias: final(key) for alias, key in aliases.items()})
+        stats = {
+            "keywords": len(rows),
+            "canonical_keywords": len(groups),
+            "merged_rows": len(rows) - len(groups),
+            "aliases": len(new_aliases),
+        }
+        if dry_run:
+            stats["examples"] = [
+                [text for _, text in members] for members in sorted(groups.values(), key=len, reverse=True)[:20]
+                if len(members) > 1
+            ]
+            return stats
+
+        changed = [
+            {"keyword_id": keyword_id, "canonical_key": keys[keyword_id]}
+            for keyword_id, _, stored in rows
+            if stored != keys[keyword_id]
+        ]
+        for start in range(0, len(changed), _CHUNK_SIZE * 10):
+            self.session.execute(update(Keyword), changed[start:start + _CHUNK_SIZE * 10])
+
+        survivors = (
+            select(Keyword.canonical_key, func.min(Keyword.keyword_id).label("survivor_id"))
+            .group_by(Keyword.canonical_key)
+            .subquery()
+        )
+        losers = (
+            select(Keyword.keyword_id)
+            .join(survivors, survivors.c.canonical_key == Keyword.canonical_key)
+            .where(Keyword.keyword_id != survivors.c.survivor_id)
+        )
+        existing = aliased(PaperKeyword)
+        self.session.execute(
+            insert(PaperKeyword).from_select(
+                ["paper_id", "keyword_id"],
+                select(PaperKeyword.paper_id, survivors.c.survivor_id)
+                .join(Keyword, Keyword.keyword_id == PaperKeyword.keyword_id)
+                .join(survivors, survivors.c.canonical_key == Keyword.canonical_key)
+                .where(Keyword.keyword_id != survivors.c.survivor_id)
+                .where(
+                    ~exists().where(
+                        existing.paper_id == PaperKeyword.paper_id,
+                        existing.keyword_id == survivors.c.survivor_id,
+                    )
+                )
+                .distinct(),
+            )
+        )
+        # Nothing merged is loaded in this session; skip fetching deleted rows for synchronization
+        self.session.execute(
+            delete(PaperKeyword).where(PaperKeyword.keyword_id.in_(losers)),
+            execution_options={"synchronize_session": False},
+        )
+        self.session.execute(
+            delete(Keyword).where(Keyword.keyword_id.in_(losers)),
+            execution_options={"synchronize_session": False},
+        )
+        if displays:
+            self.session.execute(update(Keyword), displays)
+
+        if new_aliases:
+            self.session.execute(delete(KeywordAlias))
+            self.session.execute(
+                insert(KeywordAlias),
+                [{"alias_key": alias, "canonical_key": key} for alias, key in new_aliases.items() if alias != key],
+            )
+        self.session.commit()
+        return stats
+
+    @cached_query
     def get_all_keywords(self) -> list[str]:
         """Get all available keywords."""
         keywords = self.session.query(Keyword.keyword).distinct().all()
         return sorted([kw[0] for kw in keywords])
 
+    @cached_query
     def get_top_keywords_for_instance(
         self, instance_id: int, limit: int = 5
     ) -> list[str]:
-        """Get top keywords for a conference instance."""
+        """Get top keywords for a conference instance (from instance_keyword_stats)."""
         keywords = (
-            self.session.query(
-                Keyword.keyword, func.count(PaperKeyword.c.paper_id).label("count")
-            )
-            .join(PaperKeyword)
-            .join(Paper)
-            .filter(Paper.instance_id == instance_id)
-            .group_by(Keyword.keyword)
-            .order_by(text("count DESC"))
+            self.session.query(Keyword.keyword)
+            .join(InstanceKeywordStats, InstanceKeywordStats.keyword_id == Keyword.keyword_id)
+            .filter(InstanceKeywordStats.instance_id == instance_id)
+            .order_by(InstanceKeywordStats.paper_count.desc(), Keyword.keyword)
             .limit(limit)
             .all()
         )
         return [k[0] for k in keywords]
 
+    @cached_query
     def get_related_keywords(
         self, keyword: str, limit: int = 5
     ) -> list[tuple[str, int]]:
-        """Get related keywords based on co-occurrence."""
+        """Get related keywords based on co-occurrence (from keyword_cooccurrence)."""
+        keyword_id = select(Keyword.keyword_id).where(Keyword.keyword == keyword).scalar_subquery()
         return (
-            self.session.query(
-                Keyword.keyword,
-                func.count(PaperKeyword.c.paper_id).label("co_occurrence"),
-            )
-            .join(PaperKeyword)
-            .join(Paper)
-            .join(PaperKeyword, Paper.paper_id == PaperKeyword.c.paper_id)
-            .join(
-                Keyword,
-                and_(
-                    PaperKeyword.c.keyword_id == Keyword.keyword_id,
-                    Keyword.keyword != keyword,
-                ),
-            )
-            .group_by(Keyword.keyword)
-            .order_by(text("co_occurrence DESC"))
+            self.session.query(Keyword.keyword, KeywordCooccurrence.paper_count)
+            .join(KeywordCooccurrence, KeywordCooccurrence.other_keyword_id == Keyword.keyword_id)
+            .filter(KeywordCooccurrence.keyword_id == keyword_id)
+            .order_by(KeywordCooccurrence.paper_count.desc(), Keyword.keyword)
             .limit(limit)
             .all()
         )
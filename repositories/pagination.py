@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import tuple_
+
+
+@dataclass(frozen=True)
+class PaperRow:
+    """Lightweight paper listing row: no ORM identity, no relationships, no large text columns."""
+
+    paper_id: int
+    title: str
+    year: int
+    citation_count: int
+    conference: str
+    venue: Optional[str]
+    research_area: Optional[str]
+    url: Optional[str]
+    pdf_url: Optional[str]
+
+
+@dataclass
+class Page:
+    """
+    One page of a keyset-paginated listing.
+    Pass `next_cursor` back as `cursor` to fetch the following page; it is None on the last page.
+    `total` is only filled in when requested.
+    """
+
+    rows: list = field(default_factory=list)
+    next_cursor: Optional[tuple] = None
+    total: Optional[int] = None
+
+
+def keyset_page(query, sort_column, id_column, limit: int, cursor: Optional[tuple] = None) -> tuple[list, Optional[tuple]]:
+    """
+    Apply seek pagination on (sort_column DESC, id_column DESC) to `query`.
+
+    Instead of OFFSET, the next page starts strictly after the last (sort value, id) seen, so
+    a deep page costs the same as the first one when an index covers the sort key.
+
+    :return: (rows, next_cursor)
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(*cursor))
+    # One extra row tells us whether another page exists
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]._mapping
+    return rows, (last[sort_column.key], last[id_column.key])
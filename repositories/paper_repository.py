@@ -1,3 +1,9 @@
+import re
+import time
+from typing import Optional
+import numpy as np
+from sqlalchemy import func, select, text, bindparam, delete, insert
+from sqlalchemy.orm import selectinload, joinedload, defer
 from models import (
     Paper,
     ConferenceInstance,
@@ -9,7 +15,67 @@ from models import (
     paper_author,
     AuthorAffiliation,
     PaperKeyword,
+    ContentEmbedding,
+    PaperEmbeddingIndex,
+    RelatedPaper,
 )
+from config import EMBEDDING_MODEL
+from similarity_search import get_paper_index
+from .pagination import PaperRow, Page, keyset_page
+from .query_cache import ingest_generation
+from .keyword_repository import KeywordRepository
+from .upsert import upsert_statement
+
+# Sort keys for keyset pagination; each is paired with paper_id as tie-breaker
+PAGE_ORDERS = {
+    "citations": Paper.citation_count,
+    "year": Paper.year,
+}
+
+# Named loading profiles: the relationships each view touches are loaded up front
+# (avoiding one lazy query per paper) and large text columns it never shows are deferred.
+LOAD_PROFILES = {
+    # Plain ORM objects, relationships lazy-loaded on access
+    "default": [],
+    # Organization / conference tables: title, conference name, year, citations
+    "summary": [
+        joinedload(Paper.instance_to_paper),
+        defer(Paper.content),
+        defer(Paper.abstract),
+    ],
+    # Keyword page: title, author names, year, citations
+    "keyword": [
+        selectinload(Paper.author_to_paper),
+        defer(Paper.content),
+        defer(Paper.abstract),
+    ],
+    # Single-paper view: everything except the full text
+    "details": [
+        joinedload(Paper.instance_to_paper),
+        selectinload(Paper.author_to_paper),
+        selectinload(Paper.keyword_to_paper),
+        defer(Paper.content),
+    ],
+}
+
+
+# pgvector HNSW indexes (database_helper/migrations/007_pgvector_hnsw.sql) are partial, one per model:
+# the query repeats the index expression and its model predicate so the planner can use it
+_PGVECTOR_SIMILAR_SQL = """
+    SELECT pe.paper_id, 1 - (ce.embedding::vector({dim}) <=> CAST(:query AS vector({dim}))) AS similarity
+    FROM content_embedding ce
+    JOIN paper_embedding pe ON pe.embedding_id = ce.embedding_id
+    JOIN paper p ON p.paper_id = pe.paper_id
+    WHERE ce.model = :model AND pe.paper_id <> :exclude {filters}
+    ORDER BY ce.embedding::vector({dim}) <=> CAST(:query AS vector({dim}))
+    LIMIT :k
+"""
+# e.g. "... USING hnsw (((embedding)::vector(768)) vector_cosine_ops) WHERE ((model)::text = 'm'::text)"
+_HNSW_INDEXDEF_RE = re.compile(r"USING hnsw .*vector\((\d+)\).* WHERE \(\(model\)::text = '(.*)'::text\)$")
+# Index lookups are redone after an ingest or this many seconds (indexes created by hand)
+_HNSW_LOOKUP_TTL = 300
+# database url -> (ingest generation, expiry, {model: index dimension})
+_hnsw_indexes = {}
 
 
 class PaperRepository:
@@ -28,12 +94,6 @@ class PaperRepository:
             raise ValueError(f"Reference {title} not found.")
         return reference
 
-    def _get_keyword(self, keyword: str) -> Keyword:
-        keyword = self.session.query(Keyword).filter_by(keyword=keyword).first()
-        if not keyword:
-            raise ValueError(f"Keyword {keyword} not found.")
-        return keyword
-
     def upsert(
         self,
         title: str,
@@ -42,20 +102,23 @@ class PaperRepository:
         author_ids: list = None,
         references: list = None,
         keywords: list = None,
+        keyword_ids: list = None,
         **kwargs,
     ) -> Paper:
+        """
+        Insert or update the paper identified by (instance_id, title) with INSERT ... ON CONFLICT,
+        then replace the given relationships and commit. Existing papers keep their year.
 
-        paper = (
-            self.session.query(Paper)
-            .filter_by(instance_id=instance_id, title=title)
-            .first()
+        `keywords` must already exist (see KeywordRepository.resolve_many); blank ones are skipped.
+        Callers that resolved them in bulk pass `keyword_ids` instead.
+        """
+        statement = upsert_statement(
+            self.session, Paper, [{"instance_id": instance_id, "title": title, "year": year, **kwargs}],
+            ["instance_id", "title"], list(kwargs) or ["title"],
         )
-        if paper:
-            for key, value in kwargs.items():
-                setattr(paper, key, value)
-        else:
-            paper = Paper(instance_id=instance_id, title=title, year=year, **kwargs)
-            self.session.add(paper)
+        paper = self.session.scalars(
+            statement.returning(Paper), execution_options={"populate_existing": True}
+        ).one()
 
         if author_ids:
             paper.author_to_paper = []
@@ -67,19 +130,31 @@ class PaperRepository:
             for reference in references:
                 reference_obj = self._get_reference(title=reference["title"])
                 paper.reference_to_paper.append(reference_obj)
-        if keywords:
-            paper.keyword_to_paper = []
+        if keywords and keyword_ids is None:
+            # Spelling variants of one keyword map to the same canonical row
+            keywords = [kw for kw in keywords if kw and kw.strip()]
+            resolved = KeywordRepository(self.session).resolve_many(keywords, create_missing=False)
             for kw in keywords:
-                keyword_obj = self._get_keyword(keyword=kw)
-                paper.keyword_to_paper.append(keyword_obj)
+                if kw not in resolved:
+                    raise ValueError(f"Keyword {kw} not found.")
+            keyword_ids = list(resolved.values())
+        if keyword_ids:
+            paper.keyword_to_paper = (
+                self.session.query(Keyword).filter(Keyword.keyword_id.in_(set(keyword_ids))).all()
+            )
 
         self.session.commit()
         return paper
 
-    def get_papers_by_conference(self, conference: str, year: int) -> list[Paper]:
-        """Get papers for a specific conference and year."""
+    def _query_papers(self, profile: str):
+        if profile not in LOAD_PROFILES:
+            raise ValueError(f"Unknown loading profile {profile}; expected one of {list(LOAD_PROFILES)}")
+        return self.session.query(Paper).options(*LOAD_PROFILES[profile])
+
+    def get_papers_by_conference(self, conference: str, year: int, profile: str = "default") -> list[Paper]:
+        """Get papers for a specific conference and year, loaded per LOAD_PROFILES[profile]."""
         return (
-            self.session.query(Paper)
+            self._query_papers(profile)
             .join(ConferenceInstance)
             .join(Conference)
             .filter(Conference.name == conference)
@@ -87,10 +162,10 @@ class PaperRepository:
             .all()
         )
 
-    def get_papers_by_organization(self, organization: str) -> list[Paper]:
-        """Get papers from a specific organization."""
+    def get_papers_by_organization(self, organization: str, profile: str = "default") -> list[Paper]:
+        """Get papers from a specific organization, loaded per LOAD_PROFILES[profile]."""
         return (
-            self.session.query(Paper)
+            self._query_papers(profile)
             .join(paper_author)
             .join(Author)
             .join(AuthorAffiliation)
@@ -99,19 +174,96 @@ class PaperRepository:
             .all()
         )
 
-    def get_papers_by_keyword(self, keyword: str) -> list[Paper]:
-        """Get papers with a specific keyword."""
+    def get_papers_by_keyword(self, keyword: str, profile: str = "default") -> list[Paper]:
+        """Get papers with a specific keyword, loaded per LOAD_PROFILES[profile]."""
         return (
-            self.session.query(Paper)
+            self._query_papers(profile)
             .join(PaperKeyword)
             .join(Keyword)
             .filter(Keyword.keyword == keyword)
             .all()
         )
 
+    def _paper_page(self, paper_filter, order: str, limit: int, cursor: Optional[tuple], with_total: bool) -> Page:
+        if order not in PAGE_ORDERS:
+            raise ValueError(f"Unknown order {order}; expected one of {list(PAGE_ORDERS)}")
+
+        query = (
+            self.session.query(
+                Paper.paper_id,
+                Paper.title,
+                Paper.year,
+                Paper.citation_count,
+                ConferenceInstance.conference_name.label("conference"),
+                Paper.venue,
+                Paper.research_area,
+                Paper.url,
+                Paper.pdf_url,
+            )
+            .join(ConferenceInstance, Paper.instance_id == ConferenceInstance.instance_id)
+            .filter(paper_filter)
+        )
+        rows, next_cursor = keyset_page(query, PAGE_ORDERS[order], Paper.paper_id, limit, cursor)
+
+        total = None
+        if with_total:
+            total = self.session.query(func.count(Paper.paper_id)).filter(paper_filter).scalar()
+        return Page([PaperRow(**row._mapping) for row in rows], next_cursor, total)
+
+    def get_papers_by_conference_page(
+        self,
+        conference: str,
+        year: int,
+        limit: int = 50,
+        cursor: Optional[tuple] = None,
+        order: str = "citations",
+        with_total: bool = False,
+    ) -> Page:
+        """Keyset-paginated get_papers_by_conference returning PaperRow DTOs."""
+        instance_ids = (
+            select(ConferenceInstance.instance_id)
+            .join(Conference)
+            .where(Conference.name == conference, ConferenceInstance.year == year)
+        )
+        return self._paper_page(Paper.instance_id.in_(instance_ids), order, limit, cursor, with_total)
+
+    def get_papers_by_organization_page(
+        self,
+        organization: str,
+        limit: int = 50,
+        cursor: Optional[tuple] = None,
+        order: str = "citations",
+        with_total: bool = False,
+    ) -> Page:
+        """Keyset-paginated get_papers_by_organization returning PaperRow DTOs, one row per paper."""
+        # A semi-join keeps papers with several authors from the organization from repeating
+        paper_ids = (
+            select(paper_author.c.paper_id)
+            .join(AuthorAffiliation, AuthorAffiliation.author_id == paper_author.c.author_id)
+            .join(Affiliation, Affiliation.affiliation_id == AuthorAffiliation.affiliation_id)
+            .where(Affiliation.name == organization)
+        )
+        return self._paper_page(Paper.paper_id.in_(paper_ids), order, limit, cursor, with_total)
+
+    def get_papers_by_keyword_page(
+        self,
+        keyword: str,
+        limit: int = 50,
+        cursor: Optional[tuple] = None,
+        order: str = "citations",
+        with_total: bool = False,
+    ) -> Page:
+        """Keyset-paginated get_papers_by_keyword returning PaperRow DTOs."""
+        paper_ids = (
+            select(PaperKeyword.paper_id)
+            .join(Keyword, Keyword.keyword_id == PaperKeyword.keyword_id)
+            .where(Keyword.keyword == keyword)
+        )
+        return self._paper_page(Paper.paper_id.in_(paper_ids), order, limit, cursor, with_total)
+
     def get_paper_details(self, paper_id: int) -> dict[str, any]:
         """Get detailed information about a paper."""
-        paper = self.session.query(Paper).get(paper_id)
+        paper = self.session.get(Paper, paper_id, options=LOAD_PROFILES["details"])
         if not paper:
             return None
 
@@ -125,3 +277,149 @@ class PaperRepository:
             "abstract": paper.abstract,
             "pdf_url": paper.pdf_url,
         }
+
+    def _hnsw_dim(self, model: str) -> Optional[int]:
+        """Vector dimension of the pgvector HNSW index covering `model`, or None when there is none."""
+        bind = self.session.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+        key = str(bind.url)
+        generation = ingest_generation.current()
+        cached = _hnsw_indexes.get(key)
+        if cached is None or cached[0] != generation or cached[1] < time.monotonic():
+            indexdefs = self.session.execute(
+                text("SELECT indexdef FROM pg_indexes WHERE tablename = 'content_embedding'")
+            ).scalars()
+            dims = {}
+            for indexdef in indexdefs:
+                match = _HNSW_INDEXDEF_RE.search(indexdef)
+                if match:
+                    dims[match.group(2).replace("''", "'")] = int(match.group(1))
+            cached = (generation, time.monotonic() + _HNSW_LOOKUP_TTL, dims)
+            _hnsw_indexes[key] = cached
+        return cached[2].get(model)
+
+    def _paper_embedding(self, paper_id: int, model: str) -> Optional[list]:
+        return self.session.execute(
+            select(ContentEmbedding.embedding)
+            .join(PaperEmbeddingIndex, PaperEmbeddingIndex.embedding_id == ContentEmbedding.embedding_id)
+            .where(PaperEmbeddingIndex.paper_id == paper_id, ContentEmbedding.model == model)
+        ).scalar()
+
+    def find_similar_papers(
+        self,
+        paper_id: Optional[int] = None,
+        text_query: Optional[str] = None,
+        k: int = 10,
+        conference: Optional[str] = None,
+        year: Optional[int] = None,
+        embedder=None,
+        model: Optional[str] = None,
+    ) -> list[tuple[Paper, float]]:
+        """
+        Papers most similar to a paper or to a free-text query, as (paper, cosine similarity), best first.
+
+        Give either `paper_id` (its stored embedding is the query) or `text_query` together with an
+        `embedder` (see embedding_pipeline). Results can be limited to a conference and/or year.
+        Uses the model's pgvector HNSW index when the database has one, otherwise an in-process
+        IVF index over the embeddings (similarity_search.PaperVectorIndex).
+        """
+        model = model or getattr(embedder, "model_name", None) or EMBEDDING_MODEL
+        if paper_id is not None:
+            query = self._paper_embedding(paper_id, model)
+            if query is None:
+                raise ValueError(f"Paper {paper_id} has no {model} embedding.")
+        elif text_query is not None:
+            if embedder is None:
+                raise ValueError("An embedder is required to search by text.")
+            query = embedder.embed([text_query])[0]
+        else:
+            raise ValueError("Either paper_id or text_query is required.")
+        query = np.asarray(query, dtype=np.float32)
+
+        instance_ids = None
+        if conference is not None:
+            instance_ids = [
+                row[0]
+                for row in self.session.query(ConferenceInstance.instance_id)
+                .join(Conference)
+                .filter(Conference.name == conference)
+            ]
+
+        dim = self._hnsw_dim(model)
+        if dim is not None:
+            filters, params = "", {}
+            if instance_ids is not None:
+                filters += " AND p.instance_id IN :instance_ids"
+                params["instance_ids"] = instance_ids or [-1]
+            if year is not None:
+                filters += " AND p.year = :year"
+                params["year"] = year
+            statement = text(_PGVECTOR_SIMILAR_SQL.format(dim=dim, filters=filters))
+            if instance_ids is not None:
+                statement = statement.bindparams(bindparam("instance_ids", expanding=True))
+            hits = self.session.execute(
+                statement,
+                {
+                    "query": "[" + ",".join(f"{v:.7g}" for v in query) + "]",
+                    "model": model,
+                    "exclude": paper_id if paper_id is not None else -1,
+                    "k": k,
+                    **params,
+                },
+            ).all()
+        else:
+            index = get_paper_index(self.session, model)
+            hits = index.search(query, k, mask=index.mask(instance_ids, year), exclude=paper_id)
+
+        papers = {
+            paper.paper_id: paper
+            for paper in self._query_papers("summary").filter(Paper.paper_id.in_([pid for pid, _ in hits]))
+        }
+        return [(papers[pid], float(score)) for pid, score in hits if pid in papers]
+
+    def get_related_papers(self, paper_id: int, k: int = 10) -> list[tuple[Paper, float]]:
+        """Precomputed related papers (see replace_related_papers) as (paper, cosine similarity), best first."""
+        rows = (
+            self._query_papers("summary")
+            .join(RelatedPaper, RelatedPaper.related_paper_id == Paper.paper_id)
+            .add_columns(RelatedPaper.score)
+            .filter(RelatedPaper.paper_id == paper_id)
+            .order_by(RelatedPaper.rank)
+            .limit(k)
+            .all()
+        )
+        return [(paper, float(score)) for paper, score in rows]
+
+    def replace_related_papers(self, paper_ids, neighbour_ids, scores, chunk_size: int = 50000):
+        """
+        Replace the related papers of `paper_ids` with the output of
+        PaperVectorIndex.related_papers_all(), in one transaction; -1 padding is skipped.
+        """
+        paper_ids = np.asarray(paper_ids)
+        neighbour_ids = np.asarray(neighbour_ids)
+        scores = np.asarray(scores)
+        ranks = np.broadcast_to(np.arange(1, neighbour_ids.shape[1] + 1), neighbour_ids.shape)
+        valid = neighbour_ids >= 0
+        records = np.column_stack([
+            np.broadcast_to(paper_ids[:, None], neighbour_ids.shape)[valid],
+            neighbour_ids[valid],
+            ranks[valid],
+        ]).tolist()
+        record_scores = scores[valid].tolist()
+
+        for start in range(0, len(paper_ids), chunk_size):
+            self.session.execute(
+                delete(RelatedPaper).where(RelatedPaper.paper_id.in_(paper_ids[start:start + chunk_size].tolist()))
+            )
+        for start in range(0, len(records), chunk_size):
+            self.session.execute(
+                insert(RelatedPaper),
+                [
+                    {"paper_id": paper_id, "related_paper_id": related_id, "rank": rank, "score": score}
+                    for (paper_id, related_id, rank), score in zip(
+                        records[start:start + chunk_size], record_scores[start:start + chunk_size]
+                    )
+                ],
+            )
+        self.session.commit()
@@ -0,0 +1,161 @@
+import os
+import pickle
+import hashlib
+import logging
+import threading
+import functools
+from collections import OrderedDict
+
+from config import QUERY_CACHE_SIZE, QUERY_CACHE_DIR, INGEST_GENERATION_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class IngestGeneration:
+    """
+    A counter stored in a small file, bumped by every ingest that commits data.
+    Cached query results carry the generation they were computed at and are ignored once it moves on.
+    The file is only re-read when its mtime changes.
+    """
+
+    def __init__(self, path: str = INGEST_GENERATION_FILE):
+        self.path = path
+        self._mtime = None
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+        if mtime != self._mtime:
+            with self._lock:
+                self._value = self._read()
+                self._mtime = mtime
+        return self._value
+
+    def _read(self) -> int:
+        """The generation stored in the file; callers hold no lock or already hold `_lock`."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        """Advance the generation, invalidating every cached query result in every process."""
+        with self._lock:
+            value = self._read() + 1
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(str(value))
+            os.replace(tmp, self.path)
+        return value
+
+
+class QueryCache:
+    """In-process LRU of query results, optionally backed by pickle files in `cache_dir`."""
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE, cache_dir: str = QUERY_CACHE_DIR):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def get(self, key: str, generation: int):
+        """Return (found, value) for `key` computed at `generation`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    stored_generation, value = pickle.load(f)
+                if stored_generation == generation:
+                    self._remember(key, generation, value)
+                    self.hits += 1
+                    return True, value
+            except (OSError, pickle.PickleError, EOFError, AttributeError):
+                pass
+
+        self.misses += 1
+        return False, None
+
+    def _remember(self, key: str, generation: int, value):
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def set(self, key: str, generation: int, value):
+        self._remember(key, generation, value)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(f"{path}.{os.getpid()}.tmp", "wb") as f:
+                    pickle.dump((generation, value), f)
+                os.replace(f"{path}.{os.getpid()}.tmp", path)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+                logger.debug("Query result for %s not written to disk: %s", key, e)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _detach(session, value):
+    """
+    Expunge ORM instances inside a result so a later commit on `session` cannot expire
+    the attributes of objects that other sessions now read from the cache.
+    """
+    if isinstance(value, (list, tuple)) or type(value).__name__ == "Row":
+        for item in value:
+            _detach(session, item)
+    elif hasattr(value, "_sa_instance_state") and value in session:
+        session.expunge(value)
+
+
+ingest_generation = IngestGeneration()
+query_cache = QueryCache()
+
+
+def cached_query(method):
+    """
+    Read-through cache for repository read methods, keyed by database, method and arguments.
+    Entries are valid until the ingest generation is bumped (see ConferenceAssistant.run).
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # With a RoutingSession this is the engine reads are served from
+        bind = self.session.get_bind()
+        key = repr((
+            str(bind.url),
+            method.__qualname__,
+            args,
+            sorted(kwargs.items()),
+        ))
+        generation = ingest_generation.current()
+        found, value = query_cache.get(key, generation)
+        if found:
+            return value
+        value = method(self, *args, **kwargs)
+        _detach(self.session, value)
+        query_cache.set(key, generation, value)
+        return value
+
+    return wrapper
@@ -0,0 +1,174 @@
+from sqlalchemy import func, select, delete, insert, distinct, literal
+from sqlalchemy.orm import aliased
+from models import (
+    ConferenceInstance,
+    Paper,
+    PaperKeyword,
+    paper_author,
+    AuthorAffiliation,
+    InstanceStats,
+    InstanceKeywordStats,
+    OrganizationInstanceStats,
+    KeywordCooccurrence,
+    PaperTopic,
+    TopicInstanceStats,
+)
+
+# Keeps IN (...) lists under the bound-parameter limits of SQLite and asyncpg
+_CHUNK_SIZE = 500
+
+
+def _chunks(values: list, size: int = _CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class StatisticsRepository:
+    """
+    Maintains the pre-aggregated statistics tables read by the dashboard
+    (instance_stats, instance_keyword_stats, organization_instance_stats, keyword_cooccurrence,
+    topic_instance_stats).
+
+    Everything except keyword co-occurrence is partitioned by conference instance, so an
+    ingest only recomputes the rows of the instance it loaded. Co-occurrence is global but
+    only the keywords that appear (or appeared) in that instance can have changed counts.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def refresh_instance(self, instance_id: int):
+        """Recompute all statistics touched by (re)loading one conference instance."""
+        if self.session.get(ConferenceInstance, instance_id) is None:
+            raise ValueError(f"Conference instance {instance_id} not found.")
+
+        previous_keywords = set(
+            self.session.scalars(
+                select(InstanceKeywordStats.keyword_id).where(InstanceKeywordStats.instance_id == instance_id)
+            )
+        )
+        self._refresh_instance_tables(instance_id)
+        current_keywords = set(
+            self.session.scalars(
+                select(InstanceKeywordStats.keyword_id).where(InstanceKeywordStats.instance_id == instance_id)
+            )
+        )
+        self._refresh_cooccurrence(sorted(previous_keywords | current_keywords))
+        self.session.commit()
+
+    def refresh_all(self):
+        """Rebuild every statistics table from scratch, e.g. after migrating an existing database."""
+        instance_ids = self.session.scalars(select(ConferenceInstance.instance_id)).all()
+        for instance_id in instance_ids:
+            self._refresh_instance_tables(instance_id)
+        self._refresh_cooccurrence(None)
+        self.session.commit()
+
+    def refresh_topic_stats(self, instance_ids=None):
+        """Recompute topic_instance_stats after papers were (re)assigned to topics; all instances when None."""
+        if instance_ids is None:
+            instance_ids = self.session.scalars(select(ConferenceInstance.instance_id)).all()
+        for instance_id in instance_ids:
+            self._refresh_topic_stats(instance_id)
+        self.session.commit()
+
+    def _refresh_topic_stats(self, instance_id: int):
+        self.session.execute(delete(TopicInstanceStats).where(TopicInstanceStats.instance_id == instance_id))
+        self.session.execute(
+            insert(TopicInstanceStats).from_select(
+                ["topic_id", "instance_id", "paper_count"],
+                select(PaperTopic.topic_id, Paper.instance_id, func.count(Paper.paper_id))
+                .join(PaperTopic, PaperTopic.paper_id == Paper.paper_id)
+                .where(Paper.instance_id == instance_id)
+                .group_by(PaperTopic.topic_id, Paper.instance_id),
+            )
+        )
+
+    def _refresh_instance_tables(self, instance_id: int):
+        # Paper count and citation aggregates; instances without papers get a zero row
+        self.session.execute(delete(InstanceStats).where(InstanceStats.instance_id == instance_id))
+        self.session.execute(
+            insert(InstanceStats).from_select(
+                ["instance_id", "paper_count", "avg_citations", "max_citations"],
+                select(
+                    ConferenceInstance.instance_id,
+                    func.count(Paper.paper_id),
+                    func.avg(Paper.citation_count),
+                    func.max(Paper.citation_count),
+                )
+                .outerjoin(Paper, Paper.instance_id == ConferenceInstance.instance_id)
+                .where(ConferenceInstance.instance_id == instance_id)
+                .group_by(ConferenceInstance.instance_id),
+            )
+        )
+
+        # Papers per keyword within the instance
+        self.session.execute(
+            delete(InstanceKeywordStats).where(InstanceKeywordStats.instance_id == instance_id)
+        )
+        self.session.execute(
+            insert(InstanceKeywordStats).from_select(
+                ["instance_id", "keyword_id", "paper_count"],
+                select(Paper.instance_id, PaperKeyword.keyword_id, func.count(Paper.paper_id))
+                .join(PaperKeyword, PaperKeyword.paper_id == Paper.paper_id)
+                .where(Paper.instance_id == instance_id)
+                .group_by(Paper.instance_id, PaperKeyword.keyword_id),
+            )
+        )
+
+        # Papers per organization; a paper with several authors from one organization counts once
+        org_papers = (
+            select(
+                AuthorAffiliation.affiliation_id.label("affiliation_id"),
+                Paper.paper_id.label("paper_id"),
+                Paper.citation_count.label("citation_count"),
+            )
+            .join(paper_author, paper_author.c.paper_id == Paper.paper_id)
+            .join(AuthorAffiliation, AuthorAffiliation.author_id == paper_author.c.author_id)
+            .where(Paper.instance_id == instance_id)
+            .distinct()
+            .subquery()
+        )
+        self.session.execute(
+            delete(OrganizationInstanceStats).where(OrganizationInstanceStats.instance_id == instance_id)
+        )
+        self.session.execute(
+            insert(OrganizationInstanceStats).from_select(
+                ["affiliation_id", "instance_id", "paper_count", "avg_citations", "max_citations"],
+                select(
+                    org_papers.c.affiliation_id,
+                    literal(instance_id),
+                    func.count(org_papers.c.paper_id),
+                    func.avg(org_papers.c.citation_count),
+                    func.max(org_papers.c.citation_count),
+                ).group_by(org_papers.c.affiliation_id),
+            )
+        )
+
+        self._refresh_topic_stats(instance_id)
+
+    def _refresh_cooccurrence(self, keyword_ids):
+        """
+        Recompute the co-occurrence rows keyed by `keyword_ids`, or every row when None.
+        A pair's count can only change through a paper that carries both keywords, so when both
+        are in the loaded instance the mirrored (other, keyword) row is refreshed as well.
+        """
+        first = aliased(PaperKeyword)
+        second = aliased(PaperKeyword)
+        pairs = (
+            select(first.keyword_id, second.keyword_id, func.count(distinct(first.paper_id)))
+            .join(second, (second.paper_id == first.paper_id) & (second.keyword_id != first.keyword_id))
+            .group_by(first.keyword_id, second.keyword_id)
+        )
+        columns = ["keyword_id", "other_keyword_id", "paper_count"]
+
+        if keyword_ids is None:
+            self.session.execute(delete(KeywordCooccurrence))
+            self.session.execute(insert(KeywordCooccurrence).from_select(columns, pairs))
+            return
+
+        for chunk in _chunks(list(keyword_ids)):
+            self.session.execute(delete(KeywordCooccurrence).where(KeywordCooccurrence.keyword_id.in_(chunk)))
+            self.session.execute(
+                insert(KeywordCooccurrence).from_select(columns, pairs.where(first.keyword_id.in_(chunk)))
+            )
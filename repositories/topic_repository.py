@@ -0,0 +1,109 @@
+from typing import Optional
+import numpy as np
+from sqlalchemy import func, select, delete, insert, update
+from models import Conference, ConferenceInstance, Paper, Topic, PaperTopic, TopicInstanceStats
+from .query_cache import cached_query
+
+_CHUNK_SIZE = 500
+
+
+class TopicRepository:
+    """
+    Research topics found by clustering paper embeddings (see topic_clustering.py).
+    Topic trends are read from topic_instance_stats, maintained by StatisticsRepository.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @cached_query
+    def get_topics(self) -> list[tuple[int, str, int]]:
+        """All topics as (topic_id, label, paper_count), largest first."""
+        return (
+            self.session.query(Topic.topic_id, Topic.label, Topic.paper_count)
+            .order_by(Topic.paper_count.desc(), Topic.topic_id)
+            .all()
+        )
+
+    @cached_query
+    def get_topic_trends(self, conference: Optional[str] = None) -> list[tuple[int, str, int, int]]:
+        """Papers per topic and year as (topic_id, label, year, paper_count), optionally for one conference."""
+        query = (
+            self.session.query(
+                Topic.topic_id,
+                Topic.label,
+                ConferenceInstance.year,
+                func.sum(TopicInstanceStats.paper_count),
+            )
+            .join(TopicInstanceStats, TopicInstanceStats.topic_id == Topic.topic_id)
+            .join(ConferenceInstance, ConferenceInstance.instance_id == TopicInstanceStats.instance_id)
+        )
+        if conference is not None:
+            query = query.join(Conference).filter(Conference.name == conference)
+        return (
+            query.group_by(Topic.topic_id, Topic.label, ConferenceInstance.year)
+            .order_by(Topic.topic_id, ConferenceInstance.year)
+            .all()
+        )
+
+    def get_papers_by_topic(self, topic_id: int, limit: int = 50) -> list[Paper]:
+        """Papers of a topic, closest to its centroid first."""
+        return (
+            self.session.query(Paper)
+            .join(PaperTopic, PaperTopic.paper_id == Paper.paper_id)
+            .filter(PaperTopic.topic_id == topic_id)
+            .order_by(PaperTopic.similarity.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def load_centroids(self, model: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(topic_ids, centroids, paper_counts) of the topics built from `model` embeddings."""
+        rows = self.session.execute(
+            select(Topic.topic_id, Topic.centroid, Topic.paper_count)
+            .where(Topic.model == model)
+            .order_by(Topic.topic_id)
+        ).all()
+        if not rows:
+            raise ValueError(f"No topics for model {model}; run topic_clustering.py fit first.")
+        topic_ids, centroids, counts = zip(*rows)
+        return np.array(topic_ids), np.array(centroids, dtype=np.float32), np.array(counts, dtype=np.int64)
+
+    def get_assigned_paper_ids(self) -> set[int]:
+        return set(self.session.scalars(select(PaperTopic.paper_id)))
+
+    def replace_topics(self, model: str, centroids: np.ndarray, paper_counts, labels: list[str]):
+        """Drop every topic and assignment, then store topics 0..len(centroids)-1. Does not commit."""
+        self.session.execute(delete(TopicInstanceStats))
+        self.session.execute(delete(PaperTopic))
+        self.session.execute(delete(Topic))
+        self.session.execute(
+            insert(Topic),
+            [
+                {"topic_id": topic_id, "model": model, "label": label, "centroid": centroid, "paper_count": int(count)}
+                for topic_id, (centroid, count, label) in enumerate(zip(centroids, paper_counts, labels))
+            ],
+        )
+
+    def update_centroids(self, topic_ids, centroids: np.ndarray, paper_counts):
+        """Store moved centroids and new paper counts. Does not commit."""
+        self.session.execute(
+            update(Topic),
+            [
+                {"topic_id": int(topic_id), "centroid": centroid, "paper_count": int(count)}
+                for topic_id, centroid, count in zip(topic_ids, centroids, paper_counts)
+            ],
+        )
+
+    def assign_papers(self, paper_ids, topic_ids, similarities):
+        """Set the topic of each paper, replacing earlier assignments. Does not commit."""
+        records = [
+            {"paper_id": int(paper_id), "topic_id": int(topic_id), "similarity": float(similarity)}
+            for paper_id, topic_id, similarity in zip(paper_ids, topic_ids, similarities)
+        ]
+        for start in range(0, len(records), _CHUNK_SIZE):
+            chunk = records[start:start + _CHUNK_SIZE]
+            self.session.execute(
+                delete(PaperTopic).where(PaperTopic.paper_id.in_([r["paper_id"] for r in chunk]))
+            )
+            self.session.execute(insert(PaperTopic), chunk)
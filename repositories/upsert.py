@@ -0,0 +1,24 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+# INSERT constructs that support ON CONFLICT, by dialect name
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_statement(session, model, rows: list[dict], conflict_columns: list[str], update_columns):
+    """
+    INSERT ... ON CONFLICT (conflict_columns) DO UPDATE SET update_columns = excluded values.
+
+    `conflict_columns` must match a unique constraint (see migration 003), and every row must
+    have the same keys. Add .returning(model) to get the inserted or updated rows back.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect not in _DIALECT_INSERTS:
+        raise ValueError(f"Native upsert is not supported on {dialect}")
+    statement = _DIALECT_INSERTS[dialect](model).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
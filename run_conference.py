@@ -1,30 +1,38 @@
 import argparse
 import utility
 from conference_assistant import ConferenceAssistant
-from config import (
-    START_DATE, END_DATE, LOCATION, CATEGORY, DESCRIPTION, WEBSITE
-)
+from conference_dates import ConferenceDateScraper, conference_url
+from config import CATEGORY, DESCRIPTION
 
 parser = argparse.ArgumentParser()
-parser.add_argument('--input_file', type=str, default='test/papers_metadata.csv')
+parser.add_argument('--input_file', type=str, default='test/papers_metadata.csv', help='harvested metadata (.csv or .parquet)')
 parser.add_argument('--conference', type=str, default="NeurIPS")
 parser.add_argument('--year',       type=int, default=2024)
+parser.add_argument('--resolve_dates', action='store_true', help='fetch the conference website when its dates are not cached')
 args = parser.parse_args()
 year = args.year
 conference = args.conference
 input_file = args.input_file
 
+# Instance dates and location come from the conference website cache (see conference_dates.py);
+# the site is only fetched on a cache miss with --resolve_dates. Unresolved values stay empty.
+scraper = ConferenceDateScraper()
+resolved = scraper.cached(conference, year)
+if resolved is None and args.resolve_dates:
+    results = scraper.resolve_many([(conference, year)])
+    resolved = results[0] if results and not results[0].error else None
+
 if utility.check_venue_matches(input_file, conference, year):
     conf_assitant = ConferenceAssistant(
         year        = year,
         conference  = conference,
         input_file  = input_file,
-        location    = LOCATION,
-        website     = WEBSITE,
+        location    = resolved.location if resolved else None,
+        website     = conference_url(conference, year),
         category    = CATEGORY,
         description = DESCRIPTION,
-        start_date  = START_DATE,
-        end_date    = END_DATE
+        start_date  = resolved.start_date if resolved else None,
+        end_date    = resolved.end_date if resolved else None
     )
 
     conf_assitant.run()
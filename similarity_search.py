@@ -0,0 +1,345 @@
+"""
+In-process nearest-neighbour search over paper embeddings.
+
+Used by PaperRepository.find_similar_papers when the database has no pgvector HNSW index.
+Vectors are L2-normalized float32, so cosine similarity is a dot product. Corpora above
+`IVF_MIN_ROWS` get an inverted-file (IVF) index: spherical k-means centroids, with each
+list's vectors stored contiguously so a query scans `nprobe` slices without gathering rows.
+Filtered queries whose filter leaves few rows are answered exactly instead.
+
+Exact search goes through top_k_similar(), a blocked matmul + argpartition kernel that
+also serves batch queries and PaperVectorIndex.related_papers_all().
+"""
+import math
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from config import EMBEDDING_STORE_DIR
+from models import Paper, ContentEmbedding, PaperEmbeddingIndex
+
+logger = logging.getLogger(__name__)
+
+IVF_MIN_ROWS = 5000
+# Filters leaving at most this many rows are scanned exactly
+EXACT_SCAN_ROWS = 2000
+# Corpus rows per matmul block; a (queries x block) float32 score tile stays a few MB per query batch
+SIMILARITY_BLOCK_ROWS = 16384
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indexes of the k largest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part])]
+
+
+def top_k_similar(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    mask: Optional[np.ndarray] = None,
+    block_rows: int = SIMILARITY_BLOCK_ROWS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k by dot product of each query against the normalized rows of `vectors`.
+
+    The corpus is scanned in blocks of `block_rows`; each block's (queries x block) score tile is
+    reduced to k candidates per query with argpartition and merged into the running top k, so
+    memory stays bounded whatever the corpus size. `mask` restricts the corpus rows.
+    Returns (rows, scores), both (len(queries), k) and best first; missing hits are row -1, score -inf.
+    """
+    queries = normalize_rows(np.atleast_2d(queries))
+    best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    if k <= 0:
+        return best_rows, best_scores
+
+    for start in range(0, len(vectors), block_rows):
+        block = vectors[start:start + block_rows]
+        rows = np.arange(start, start + len(block))
+        if mask is not None:
+            keep = mask[start:start + len(block)]
+            if not keep.any():
+                continue
+            if not keep.all():
+                block, rows = block[keep], rows[keep]
+
+        scores = queries @ block.T
+        if scores.shape[1] > k:
+            # The k largest land in the last k slots; avoids negating the whole tile
+            part = np.argpartition(scores, scores.shape[1] - k, axis=1)[:, -k:]
+            scores = np.take_along_axis(scores, part, axis=1)
+            rows = rows[part]
+        else:
+            rows = np.broadcast_to(rows, scores.shape)
+
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_rows = np.concatenate([best_rows, rows], axis=1)
+        part = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, part, axis=1)
+        best_rows = np.take_along_axis(merged_rows, part, axis=1)
+
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+class PaperVectorIndex:
+    """
+    Normalized embeddings of papers with the per-row metadata used for filtering.
+
+    `paper_ids`, `instance_ids` and `years` are aligned with the rows of `vectors`.
+    """
+
+    def __init__(
+        self,
+        paper_ids: np.ndarray,
+        vectors: np.ndarray,
+        instance_ids: np.ndarray,
+        years: np.ndarray,
+        nlist: Optional[int] = None,
+        seed: int = 0,
+        normalized: bool = False,
+    ):
+        self.paper_ids = np.asarray(paper_ids, dtype=np.int64)
+        # Already-normalized vectors (e.g. an EmbeddingStore memmap) are used without a copy
+        self.vectors = vectors if normalized else normalize_rows(vectors)
+        self.instance_ids = np.asarray(instance_ids, dtype=np.int64)
+        self.years = np.asarray(years, dtype=np.int64)
+        self._row_of = {int(pid): row for row, pid in enumerate(self.paper_ids)}
+
+        self.centroids = None
+        if len(self.paper_ids) >= IVF_MIN_ROWS:
+            self._build_ivf(nlist or int(math.sqrt(len(self.paper_ids))), seed)
+
+    @classmethod
+    def from_session(cls, session, model: str, **kwargs) -> "PaperVectorIndex":
+        """Load every embedding of `model` from the database."""
+        rows = session.execute(
+            select(Paper.paper_id, Paper.instance_id, Paper.year, ContentEmbedding.embedding)
+            .join(PaperEmbeddingIndex, PaperEmbeddingIndex.paper_id == Paper.paper_id)
+            .join(ContentEmbedding, ContentEmbedding.embedding_id == PaperEmbeddingIndex.embedding_id)
+            .where(ContentEmbedding.model == model)
+            .order_by(Paper.paper_id)
+        ).all()
+        if not rows:
+            return cls(np.empty(0), np.empty((0, 0)), np.empty(0), np.empty(0))
+        paper_ids, instance_ids, years, vectors = zip(*rows)
+        return cls(np.array(paper_ids), np.array(vectors, dtype=np.float32), np.array(instance_ids), np.array(years), **kwargs)
+
+    @classmethod
+    def from_store(cls, store, session, **kwargs) -> "PaperVectorIndex":
+        """
+        Index the latest row of every paper in an EmbeddingStore; only instance ids and
+        years are read from the database. Papers deleted from the database are dropped.
+        """
+        papers = np.array(
+            session.execute(select(Paper.paper_id, Paper.instance_id, Paper.year).order_by(Paper.paper_id)).all(),
+            dtype=np.int64,
+        ).reshape(-1, 3)
+        rows = store.live_rows()
+        if len(rows) == len(store):
+            rows = None
+        paper_ids = store.ids if rows is None else store.ids[rows]
+        positions = np.searchsorted(papers[:, 0], paper_ids)
+        positions[positions == len(papers)] = 0
+        known = papers[positions, 0] == paper_ids if len(papers) else np.zeros(len(paper_ids), dtype=bool)
+        if not known.all():
+            rows = np.flatnonzero(known) if rows is None else rows[known]
+            paper_ids, positions = paper_ids[known], positions[known]
+        # Without superseded or deleted rows the memmap itself is indexed
+        vectors = store.vectors if rows is None else store.vectors[rows]
+        return cls(
+            paper_ids, vectors, papers[positions, 1], papers[positions, 2], normalized=True, **kwargs
+        )
+
+    def __len__(self) -> int:
+        return len(self.paper_ids)
+
+    def _build_ivf(self, nlist: int, seed: int, iterations: int = 10, sample_size: int = 50000):
+        rng = np.random.default_rng(seed)
+        sample = self.vectors[rng.choice(len(self.vectors), min(sample_size, len(self.vectors)), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = normalize_rows(centroids)
+
+        assign = np.concatenate([
+            np.argmax(self.vectors[start:start + 8192] @ centroids.T, axis=1)
+            for start in range(0, len(self.vectors), 8192)
+        ])
+        # Reorder rows so each inverted list is one contiguous slice
+        order = np.argsort(assign, kind="stable")
+        self.paper_ids = self.paper_ids[order]
+        self.vectors = np.ascontiguousarray(self.vectors[order])
+        self.instance_ids = self.instance_ids[order]
+        self.years = self.years[order]
+        self._row_of = {int(pid): row for row, pid in enumerate(self.paper_ids)}
+        self.offsets = np.searchsorted(assign[order], np.arange(nlist + 1))
+        self.centroids = centroids
+        logger.info("Built IVF index: %d vectors, %d lists", len(self.vectors), nlist)
+
+    def vector_of(self, paper_id: int) -> Optional[np.ndarray]:
+        row = self._row_of.get(int(paper_id))
+        return None if row is None else self.vectors[row]
+
+    def mask(self, instance_ids=None, year: Optional[int] = None) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters, or None when unfiltered."""
+        mask = None
+        if instance_ids is not None:
+            mask = np.isin(self.instance_ids, np.asarray(list(instance_ids), dtype=np.int64))
+        if year is not None:
+            year_mask = self.years == int(year)
+            mask = year_mask if mask is None else mask & year_mask
+        return mask
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        mask: Optional[np.ndarray] = None,
+        exclude: Optional[int] = None,
+        nprobe: int = 16,
+    ) -> list[tuple[int, float]]:
+        """Return up to k (paper_id, cosine similarity) pairs, best first."""
+        if not len(self) or k <= 0:
+            return []
+        query = normalize_rows(query)
+        exclude_row = self._row_of.get(int(exclude)) if exclude is not None else None
+        want = k + (exclude_row is not None)
+
+        if self.centroids is None or (mask is not None and mask.sum() <= EXACT_SCAN_ROWS):
+            rows, scores = top_k_similar(self.vectors, query, want, mask=mask)
+            found = rows[0] >= 0
+            rows, scores = rows[0][found], scores[0][found]
+        else:
+            nprobe = min(nprobe, len(self.centroids))
+            while True:
+                lists = _top_k(self.centroids @ query, nprobe)
+                rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists])
+                scores = np.concatenate([
+                    self.vectors[self.offsets[c]:self.offsets[c + 1]] @ query for c in lists
+                ])
+                if mask is not None:
+                    keep = mask[rows]
+                    rows, scores = rows[keep], scores[keep]
+                # Widen the probe when a filter leaves too few candidates
+                if len(rows) >= want or nprobe >= len(self.centroids):
+                    break
+                nprobe = min(nprobe * 2, len(self.centroids))
+
+        best = _top_k(scores, want)
+        return [
+            (int(self.paper_ids[rows[i]]), float(scores[i]))
+            for i in best
+            if rows[i] != exclude_row
+        ][:k]
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        mask: Optional[np.ndarray] = None,
+    ) -> list[list[tuple[int, float]]]:
+        """Exact search for several queries at once; one best-first (paper_id, similarity) list per query."""
+        rows, scores = top_k_similar(self.vectors, queries, k, mask=mask)
+        return [
+            [(int(self.paper_ids[r]), float(score)) for r, score in zip(query_rows, query_scores) if r >= 0]
+            for query_rows, query_scores in zip(rows, scores)
+        ]
+
+    def related_papers_all(
+        self,
+        k: int = 10,
+        same_instance: bool = False,
+        query_block: int = 1024,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Exact k nearest neighbours of every paper, excluding itself, in one blocked pass.
+
+        With `same_instance`, neighbours come from the paper's own conference instance only.
+        Returns (paper_ids, neighbour_ids, scores); the latter two are (len(paper_ids), k),
+        best first, padded with -1 / -inf when fewer than k papers qualify.
+        """
+        neighbour_rows = np.full((len(self), k), -1, dtype=np.int64)
+        scores = np.full((len(self), k), -np.inf, dtype=np.float32)
+        if same_instance:
+            order = np.argsort(self.instance_ids, kind="stable")
+            bounds = np.flatnonzero(np.diff(self.instance_ids[order])) + 1
+            groups = np.split(order, bounds)
+        else:
+            groups = [None]
+
+        for group in groups:
+            corpus = self.vectors if group is None else self.vectors[group]
+            for start in range(0, len(corpus), query_block):
+                query_rows = np.arange(start, min(start + query_block, len(corpus)))
+                # One extra hit, since each paper finds itself
+                rows, block_scores = top_k_similar(corpus, corpus[query_rows], k + 1)
+                is_self = rows == query_rows[:, None]
+                keep = ~is_self
+                keep[~is_self.any(axis=1), -1] = False
+                rows = rows[keep].reshape(len(query_rows), k)
+                block_scores = block_scores[keep].reshape(len(query_rows), k)
+                targets = query_rows if group is None else group[query_rows]
+                neighbour_rows[targets] = np.where(rows >= 0, rows if group is None else group[rows], -1)
+                scores[targets] = block_scores
+
+        neighbour_ids = np.where(neighbour_rows >= 0, self.paper_ids[neighbour_rows], -1)
+        return self.paper_ids, neighbour_ids, scores
+
+
+# One index per (database, model), rebuilt when the ingest generation moves on
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _load_index(session, model: str) -> PaperVectorIndex:
+    if EMBEDDING_STORE_DIR:
+        from embedding_store import EmbeddingStore
+
+        try:
+            store = EmbeddingStore.for_model(session.get_bind().url, model)
+            sample = session.scalars(
+                select(ContentEmbedding.embedding).where(ContentEmbedding.model == model).limit(1)
+            ).first()
+            if len(store) and sample is not None and len(sample) != store.dim:
+                # The model was re-embedded at another width; the stored rows are unusable
+                logger.warning("Rebuilding %s: stored vectors have %d dimensions, the database has %d",
+                               store.path, store.dim, len(sample))
+                store.clear()
+            store.sync_from_database(session, model)
+            return PaperVectorIndex.from_store(store, session)
+        except (OSError, ValueError) as e:
+            logger.warning("Embedding store unavailable, loading vectors from the database: %s", e)
+    return PaperVectorIndex.from_session(session, model)
+
+
+def get_paper_index(session, model: str) -> PaperVectorIndex:
+    from repositories.query_cache import ingest_generation
+
+    key = (str(session.get_bind().url), model)
+    generation = ingest_generation.current()
+    cached = _indexes.get(key)
+    if cached is None or cached[0] != generation:
+        with _indexes_lock:
+            cached = _indexes.get(key)
+            if cached is None or cached[0] != generation:
+                cached = (generation, _load_index(session, model))
+                _indexes[key] = cached
+    return cached[1]
@@ -0,0 +1,85 @@
+"""
+AffiliationMatcher (repositories/affiliation_matcher.py): trigram-pruned fuzzy matching,
+checked against scoring every indexed name.
+
+    python -m pytest -q test/test_affiliation_matcher.py
+"""
+import pytest
+
+from name_normalizer import clean
+from repositories import AffiliationMatcher
+from repositories.affiliation_matcher import fuzz
+
+AFFILIATIONS = [
+    (1, "Massachusetts Institute of Technology", ["MIT"]),
+    (2, "Stanford University", []),
+    (3, "University of Oxford", ["Oxford University"]),
+    (4, "University of Cambridge", []),
+    (5, "Université de Montréal", ["UdeM", "Mila"]),
+    (6, "Carnegie Mellon University", ["CMU"]),
+    (7, "University of Toronto", []),
+]
+
+
+@pytest.fixture
+def matcher():
+    matcher = AffiliationMatcher(threshold=85, clean=clean)
+    for affiliation_id, name, aliases in AFFILIATIONS:
+        matcher.add(affiliation_id, name, aliases)
+    return matcher
+
+
+def _brute_force(name: str, threshold: int = 85):
+    """Best fuzz.ratio over every cleaned name and alias, without candidate pruning."""
+    cleaned = clean(name)
+    best_id, best_score = None, 0.0
+    for affiliation_id, affiliation, aliases in AFFILIATIONS:
+        for text in (affiliation, *aliases):
+            score = fuzz.ratio(cleaned, clean(text))
+            if score > best_score:
+                best_id, best_score = affiliation_id, score
+    return best_id if best_score >= threshold else None
+
+
+QUERIES = [
+    "MIT",
+    "Massachusets Institute of Technology",
+    "stanford university",
+    "Stanford Univ.",
+    "Univ. of Oxford",
+    "University of Cambrige",
+    "Universite de Montreal",
+    "Carnegie-Mellon University",
+    "University of Toronto, Canada",
+    "Unknown Lab",
+]
+
+
+def test_match_many_agrees_with_brute_force(matcher):
+    assert len(matcher) == 12
+    assert matcher.match_many(QUERIES) == {name: _brute_force(name) for name in QUERIES}
+
+
+def test_match_many_exact_and_fuzzy(matcher):
+    matched = matcher.match_many(["mila", "University of Cambrige", "Unknown Lab"])
+    assert matched == {"mila": 5, "University of Cambrige": 4, "Unknown Lab": None}
+
+
+def test_match_many_deduplicates_and_keeps_order(matcher):
+    matched = matcher.match_many(["CMU", "", "MIT", "CMU", None])
+    assert list(matched) == ["CMU", "", "MIT", None]
+    assert matched == {"CMU": 6, "": None, "MIT": 1, None: None}
+
+
+def test_match_many_empty(matcher):
+    assert matcher.match_many([]) == {}
+    assert AffiliationMatcher(clean=clean).match_many(["MIT"]) == {"MIT": None}
+
+
+def test_threshold(matcher):
+    affiliation_id, score = matcher.match_with_score("Stanford Univ.")
+    assert affiliation_id is None and 0 < score < 85
+    loose = AffiliationMatcher(threshold=70, clean=clean)
+    for affiliation_id, name, aliases in AFFILIATIONS:
+        loose.add(affiliation_id, name, aliases)
+    assert loose.match("Stanford Univ.") == 2
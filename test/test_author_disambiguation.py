@@ -0,0 +1,75 @@
+"""
+Name splitting, blocking and clustering in author_disambiguation.
+
+    python -m pytest -q test/test_author_disambiguation.py
+"""
+import pytest
+
+from author_disambiguation import AuthorMention, AuthorResolver, blocking_key, split_name, split_reference_authors
+
+
+@pytest.mark.parametrize("name, given, surname", [
+    ("Geoffrey E. Hinton", ["GEOFFREY", "E"], "HINTON"),
+    ("J.K. Rowling", ["J", "K"], "ROWLING"),
+    ("Hinton, Geoffrey E.", ["GEOFFREY", "E"], "HINTON"),
+    ("van der Berg, Anna", ["ANNA"], "BERG"),
+    ("Krizhevsky A", ["A"], "KRIZHEVSKY"),
+    ("Hinton GE", ["G", "E"], "HINTON"),
+    ("Hinton G.E.", ["G", "E"], "HINTON"),
+    ("van der Berg A", ["A"], "BERG"),
+    ("Jian WANG", ["JIAN"], "WANG"),
+    ("Plato", [], "PLATO"),
+    ("", [], ""),
+])
+def test_split_name(name, given, surname):
+    assert split_name(name) == (given, surname)
+
+
+def test_blocking_key_vancouver_matches_full_name():
+    assert blocking_key("Hinton GE") == blocking_key("Geoffrey E. Hinton") == "HINTON G"
+    assert blocking_key("Krizhevsky A") == blocking_key("Alex Krizhevsky") == "KRIZHEVSKY A"
+
+
+@pytest.mark.parametrize("authors, expected", [
+    ("John Smith, Jane Doe and Bob Lee", ["John Smith", "Jane Doe", "Bob Lee"]),
+    ("Smith, John; Doe, Jane", ["John Smith", "Jane Doe"]),
+    ("Smith, J. and Doe, J.", ["J. Smith", "J. Doe"]),
+    ("Smith, J., Doe, K., & Lee, M.", ["J. Smith", "K. Doe", "M. Lee"]),
+    ("Smith, John", ["John Smith"]),
+    ("Krizhevsky A, Sutskever I, Hinton GE", ["Krizhevsky A", "Sutskever I", "Hinton GE"]),
+    ("Ashish Vaswani, Noam Shazeer", ["Ashish Vaswani", "Noam Shazeer"]),
+])
+def test_split_reference_authors(authors, expected):
+    assert split_reference_authors(authors) == expected
+
+
+def _clusters(mentions):
+    return sorted(sorted(c.mention_ids) for c in AuthorResolver().resolve(mentions))
+
+
+def test_same_author_id_merges_despite_first_names():
+    clusters = _clusters([
+        AuthorMention("1", "Jon Smith", author_id="~J1"),
+        AuthorMention("2", "Jonathan Smith", author_id="~J1"),
+    ])
+    assert clusters == [["1", "2"]]
+
+
+def test_conflicting_first_names_and_ids_stay_apart():
+    shared = {"coauthors": {"Ada Lovelace", "Alan Turing"}, "affiliations": {"MIT"}}
+    assert _clusters([
+        AuthorMention("1", "Jane Smith", **shared),
+        AuthorMention("2", "John Smith", **shared),
+    ]) == [["1"], ["2"]]
+    assert _clusters([
+        AuthorMention("1", "Jane Smith", author_id="~J1", **shared),
+        AuthorMention("2", "Jane Smith", author_id="~J2", **shared),
+    ]) == [["1"], ["2"]]
+
+
+def test_vancouver_reference_joins_author():
+    clusters = _clusters([
+        AuthorMention("author", "Geoffrey E. Hinton", author_id="~G1", coauthors={"Alex Krizhevsky"}),
+        AuthorMention("reference", "Hinton GE", coauthors={"Krizhevsky A"}),
+    ])
+    assert clusters == [["author", "reference"]]
@@ -0,0 +1,60 @@
+"""
+Dashboard statistics in ConferenceInstanceRepository on a throwaway SQLite database:
+instances are listed before StatisticsRepository has written their instance_stats rows.
+
+    python -m pytest -q test/test_conference_instance_repository.py
+"""
+import pytest
+
+from db_manager import DBManager
+from models import Conference, ConferenceInstance, Paper
+from repositories import ConferenceInstanceRepository, StatisticsRepository
+
+# The undecorated methods, so results are not written to the shared query cache
+get_conference_stats = ConferenceInstanceRepository.get_conference_stats.__wrapped__
+get_yearly_conference_stats = ConferenceInstanceRepository.get_yearly_conference_stats.__wrapped__
+
+
+@pytest.fixture
+def session(tmp_path):
+    manager = DBManager(f"sqlite:///{tmp_path}/stats.db", reader_url=None)
+    manager.create_tables()
+    session = manager.get_session()
+    session.add_all([Conference(conference_id=1, name="NeurIPS"), Conference(conference_id=2, name="ICML")])
+    session.add_all([
+        ConferenceInstance(instance_id=1, conference_id=1, conference_name="NeurIPS", year=2023),
+        ConferenceInstance(instance_id=2, conference_id=1, conference_name="NeurIPS", year=2024),
+        ConferenceInstance(instance_id=3, conference_id=2, conference_name="ICML", year=2024),
+    ])
+    session.add_all([
+        Paper(instance_id=1, title="a", year=2023, citation_count=4),
+        Paper(instance_id=1, title="b", year=2023, citation_count=10),
+        Paper(instance_id=2, title="c", year=2024, citation_count=1),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_stats_before_refresh(session):
+    repository = ConferenceInstanceRepository(session)
+    stats = get_conference_stats(repository, "NeurIPS")
+    assert [(instance.year, count, avg, top) for instance, count, avg, top in stats] == [
+        (2023, 0, None, None),
+        (2024, 0, None, None),
+    ]
+    assert get_yearly_conference_stats(repository, 2024) == [("ICML", 0), ("NeurIPS", 0)]
+
+
+def test_stats_after_partial_refresh(session):
+    StatisticsRepository(session).refresh_instance(1)
+    repository = ConferenceInstanceRepository(session)
+    stats = get_conference_stats(repository, "NeurIPS")
+    assert [(instance.year, count, avg, top) for instance, count, avg, top in stats] == [
+        (2023, 2, 7.0, 10),
+        (2024, 0, None, None),
+    ]
+    assert get_conference_stats(repository, "NeurIPS", 2023)[0].paper_count == 2
+
+    StatisticsRepository(session).refresh_all()
+    assert get_yearly_conference_stats(repository, 2024) == [("ICML", 0), ("NeurIPS", 1)]
@@ -0,0 +1,134 @@
+"""
+EmbeddingStore (embedding_store.py): appends, superseded rows, compaction and width changes,
+plus the width-mismatch rebuild in similarity_search._load_index.
+
+    python -m pytest -q test/test_embedding_store.py
+"""
+import numpy as np
+import pytest
+
+import embedding_store
+import similarity_search
+from db_manager import DBManager
+from embedding_store import EmbeddingStore
+from models import Conference, ConferenceInstance, ContentEmbedding, Paper, PaperEmbeddingIndex
+
+MODEL = "test-model"
+
+
+def _vectors(rows: int, dim: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_append_normalizes_and_persists(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=4)
+    vectors = _vectors(3, 4)
+    store.append([10, 11, 12], vectors, ["ab" * 32, None, "cd" * 32])
+    assert len(store) == 3
+    np.testing.assert_allclose(store.vectors, _unit(vectors), rtol=1e-6)
+
+    reopened = EmbeddingStore(str(tmp_path))
+    assert (reopened.dim, len(reopened)) == (4, 3)
+    assert reopened.ids.tolist() == [10, 11, 12]
+    assert reopened.hashes[0] == bytes.fromhex("ab" * 16)
+    np.testing.assert_allclose(reopened.get(11), _unit(vectors)[1], rtol=1e-6)
+    assert reopened.get(99) is None
+
+
+def test_latest_row_wins_and_compact(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=4, quantize=True)
+    first, second = _vectors(3, 4, seed=1), _vectors(2, 4, seed=2)
+    store.append([1, 2, 3], first)
+    store.row_index()
+    store.append([2, 4], second)
+    assert store.live_rows().tolist() == [0, 2, 3, 4]
+    np.testing.assert_allclose(store.get(2), _unit(second)[0], rtol=1e-6)
+
+    store.compact()
+    assert len(store) == 4
+    assert store.ids.tolist() == [1, 3, 2, 4]
+    expected = _unit(np.vstack([first[0], first[2], second[0], second[1]]))
+    np.testing.assert_allclose(store.vectors, expected, rtol=1e-6)
+    codes, scales = store.quantized_vectors
+    np.testing.assert_allclose(codes * scales[:, None], expected, atol=0.01)
+
+    reopened = EmbeddingStore(str(tmp_path))
+    assert reopened.quantized and reopened.ids.tolist() == [1, 3, 2, 4]
+    reopened.compact()  # nothing superseded: no-op
+    assert len(reopened) == 4
+
+
+def test_unfinished_append_is_ignored(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=4)
+    store.append([1], _vectors(1, 4))
+    # Bytes of an append that crashed before meta.json was written
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(b"\x01" * 16 * 5)
+    reopened = EmbeddingStore(str(tmp_path))
+    assert len(reopened) == 1
+    reopened.append([2], _vectors(1, 4, seed=3))
+    assert (tmp_path / "vectors.f32").stat().st_size == 2 * 4 * 4
+    assert reopened.ids.tolist() == [1, 2]
+
+
+def test_width_mismatch_and_clear(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=8)
+    store.append([1, 2], _vectors(2, 4))  # an empty store takes the width of its first rows
+    assert store.dim == 4
+    with pytest.raises(ValueError):
+        store.append([3], _vectors(1, 6))
+
+    store.clear()
+    assert len(store) == 0 and store.ids.tolist() == []
+    store.append([3], _vectors(1, 6))
+    reopened = EmbeddingStore(str(tmp_path))
+    assert (reopened.dim, reopened.ids.tolist()) == (6, [3])
+
+
+@pytest.fixture
+def session(tmp_path):
+    manager = DBManager(f"sqlite:///{tmp_path}/store.db", reader_url=None)
+    manager.create_tables()
+    session = manager.get_session()
+    yield session
+    session.close()
+
+
+def _embed(session, vectors: np.ndarray, text_hash: str):
+    """(Re-)embed papers 1..len(vectors) under MODEL."""
+    session.query(PaperEmbeddingIndex).delete()
+    session.query(ContentEmbedding).delete()
+    for paper_id, vector in enumerate(vectors, start=1):
+        embedding = ContentEmbedding(embedding=vector.tolist(), model=MODEL, text_hash=text_hash)
+        session.add(embedding)
+        session.flush()
+        session.add(PaperEmbeddingIndex(paper_id=paper_id, embedding_id=embedding.embedding_id))
+    session.commit()
+
+
+def test_sync_and_width_rebuild(session, tmp_path, monkeypatch):
+    session.add(Conference(conference_id=1, name="TestConf"))
+    session.add(ConferenceInstance(instance_id=1, conference_id=1, conference_name="TestConf", year=2024))
+    session.add_all([Paper(paper_id=i, instance_id=1, title=f"paper {i}", year=2024) for i in (1, 2, 3)])
+    session.commit()
+    for module in (embedding_store, similarity_search):
+        monkeypatch.setattr(module, "EMBEDDING_STORE_DIR", str(tmp_path / "stores"))
+
+    _embed(session, _vectors(3, 4), "aa" * 32)
+    store = EmbeddingStore.for_model(session.get_bind().url, MODEL)
+    assert store.sync_from_database(session, MODEL) == 3
+    assert store.sync_from_database(session, MODEL) == 0
+
+    # Re-embedded at another width: _load_index drops the stored rows and syncs again
+    wider = _vectors(3, 6, seed=5)
+    _embed(session, wider, "bb" * 32)
+    index = similarity_search._load_index(session, MODEL)
+    assert index.vectors.shape == (3, 6)
+    assert sorted(index.paper_ids.tolist()) == [1, 2, 3]
+    np.testing.assert_allclose(index.vector_of(2), _unit(wider)[1], rtol=1e-6)
+    reopened = EmbeddingStore.for_model(session.get_bind().url, MODEL)
+    assert (reopened.dim, len(reopened)) == (6, 3)
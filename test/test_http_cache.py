@@ -0,0 +1,135 @@
+"""
+CachedSession (http_cache.py) against a local HTTP server: TTL hits, ETag / Last-Modified
+revalidation, and cache keys that include credentials and Vary headers.
+
+    python -m pytest -q test/test_http_cache.py
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_cache import CachedSession
+
+LAST_MODIFIED = "Mon, 19 Oct 2026 00:00:00 GMT"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/etag: ETag + Last-Modified; /vary: body depends on Accept-Language; /vary-star: Vary: *."""
+
+    def do_GET(self):
+        self.server.seen.append((self.path, dict(self.headers)))
+        version = self.server.version
+        if self.path == "/etag":
+            etag = f'"v{version}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body, headers = f"etag body v{version}", {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+        elif self.path == "/vary":
+            body = f"lang={self.headers.get('Accept-Language')} auth={self.headers.get('Authorization')}"
+            headers = {"Vary": "Accept-Language"}
+        elif self.path == "/vary-star":
+            body, headers = "uncacheable", {"Vary": "*"}
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.seen, server.version = [], 1
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _session(tmp_path, ttl: int) -> CachedSession:
+    session = CachedSession(cache_dir=str(tmp_path / "http"), ttl=ttl, max_retries=0)
+    session.trust_env = False  # no proxies for 127.0.0.1
+    return session
+
+
+def test_fresh_entries_skip_the_network(server, tmp_path):
+    session = _session(tmp_path, ttl=3600)
+    first = session.get(f"{server.url}/etag")
+    second = session.get(f"{server.url}/etag")
+    assert first.from_cache is False and second.from_cache is True
+    assert second.text == first.text == "etag body v1"
+    assert len(server.seen) == 1
+    assert (session.misses, session.hits) == (1, 1)
+
+
+def test_stale_entries_are_revalidated(server, tmp_path):
+    session = _session(tmp_path, ttl=0)
+    session.get(f"{server.url}/etag")
+
+    revalidated = session.get(f"{server.url}/etag")
+    _, headers = server.seen[-1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+    assert revalidated.status_code == 200 and revalidated.from_cache is True
+    assert revalidated.text == "etag body v1"
+    assert session.revalidated == 1
+
+    # A changed resource answers 200 and replaces the entry
+    server.version = 2
+    changed = session.get(f"{server.url}/etag")
+    assert changed.from_cache is False and changed.text == "etag body v2"
+    assert session.get(f"{server.url}/etag").text == "etag body v2"
+    assert server.seen[-1][1]["If-None-Match"] == '"v2"'
+
+
+def test_vary_headers_are_part_of_the_key(server, tmp_path):
+    session = _session(tmp_path, ttl=3600)
+    english = session.get(f"{server.url}/vary", headers={"Accept-Language": "en"})
+    french = session.get(f"{server.url}/vary", headers={"Accept-Language": "fr"})
+    assert english.text.startswith("lang=en") and french.text.startswith("lang=fr")
+    assert french.from_cache is False
+
+    again = session.get(f"{server.url}/vary", headers={"Accept-Language": "en"})
+    assert again.from_cache is True and again.text.startswith("lang=en")
+    assert len(server.seen) == 2
+
+
+def test_credentials_are_part_of_the_key(server, tmp_path):
+    session = _session(tmp_path, ttl=3600)
+    alice = session.get(f"{server.url}/vary", headers={"Authorization": "Bearer alice"})
+    bob = session.get(f"{server.url}/vary", headers={"Authorization": "Bearer bob"})
+    assert alice.text.endswith("auth=Bearer alice") and bob.text.endswith("auth=Bearer bob")
+    assert bob.from_cache is False
+    assert session.get(f"{server.url}/vary", headers={"Authorization": "Bearer alice"}).from_cache is True
+
+    # Session-level credentials count as well
+    session.headers["Authorization"] = "Bearer carol"
+    carol = session.get(f"{server.url}/vary")
+    assert carol.from_cache is False and carol.text.endswith("auth=Bearer carol")
+
+
+def test_vary_star_and_clear(server, tmp_path):
+    session = _session(tmp_path, ttl=3600)
+    session.get(f"{server.url}/vary-star")
+    assert session.get(f"{server.url}/vary-star").from_cache is False
+    assert len(server.seen) == 2
+
+    session.get(f"{server.url}/vary", headers={"Accept-Language": "en"})
+    session.clear()
+    assert not [p for p in (tmp_path / "http").rglob("*") if p.is_file()]
+    assert session.get(f"{server.url}/vary", headers={"Accept-Language": "en"}).from_cache is False
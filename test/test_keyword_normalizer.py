@@ -0,0 +1,112 @@
+"""
+Keyword canonicalization (keyword_normalizer) and the KeywordRepository.canonicalize_all backfill,
+on a throwaway SQLite database.
+
+    python -m pytest -q test/test_keyword_normalizer.py
+"""
+import pytest
+from sqlalchemy import func
+
+from keyword_normalizer import canonical_key, singularize
+from db_manager import DBManager
+from models import Conference, ConferenceInstance, Keyword, KeywordAlias, Paper, PaperKeyword
+from repositories import KeywordRepository
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("networks", "network"),
+    ("policies", "policy"),
+    ("boxes", "box"),
+    ("branches", "branch"),
+    ("analysis", "analysis"),
+    ("bus", "bus"),
+    ("robotics", "robotics"),
+    ("process", "process"),
+    ("consensus", "consensus"),
+    ("llms", "llm"),
+])
+def test_singularize(word, expected):
+    assert singularize(word) == expected
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ("Large Language Models (LLMs)", "large language model"),
+    ("large-language models", "large language model"),
+    ("Graph-Neural Networks", "graph neural network"),
+    ("Data Analysis", "data analysis"),
+    ("bus", "bus"),
+    ("LLMs", "llm"),
+    ("ViTs", "vit"),
+    ("Vision Transformer (ViT)", "vision transformer"),
+    ("Café Recommendations", "cafe recommendation"),
+    ("C++", "c++"),
+    ("", ""),
+])
+def test_canonical_key(keyword, expected):
+    assert canonical_key(keyword) == expected
+
+
+@pytest.fixture
+def session(tmp_path):
+    manager = DBManager(f"sqlite:///{tmp_path}/keywords.db", reader_url=None)
+    manager.create_tables()
+    session = manager.get_session()
+    yield session
+    session.close()
+
+
+def _load_legacy_keywords(session, papers: list[list[str]]):
+    """Keyword rows as ingested before canonical_key existed, one paper per keyword list."""
+    conference = Conference(name="TestConf")
+    session.add(conference)
+    session.flush()
+    instance = ConferenceInstance(conference_id=conference.conference_id, conference_name="TestConf", year=2024)
+    session.add(instance)
+    session.flush()
+
+    texts = list(dict.fromkeys(kw for keywords in papers for kw in keywords))
+    session.add_all([Keyword(keyword=text) for text in texts])
+    session.flush()
+    ids = dict(session.query(Keyword.keyword, Keyword.keyword_id).all())
+    for n, keywords in enumerate(papers):
+        paper = Paper(instance_id=instance.instance_id, title=f"paper {n}", year=2024)
+        session.add(paper)
+        session.flush()
+        session.add_all([PaperKeyword(paper_id=paper.paper_id, keyword_id=ids[kw]) for kw in keywords])
+    session.commit()
+
+
+def test_canonicalize_all_is_idempotent(session):
+    _load_legacy_keywords(session, [
+        ["LLM", "Large Language Models"],
+        ["large language model", "LLMs"],
+        ["Vision Transformer (ViT)", "ViTs"],
+        ["Diffusion Models", "diffusion model", "Data Analysis"],
+    ])
+    repository = KeywordRepository(session)
+
+    first = repository.canonicalize_all()
+    assert first["merged_rows"] > 0
+    keys = sorted(session.query(Keyword.canonical_key).all())
+    assert keys == [("data analysis",), ("diffusion model",), ("large language model",), ("vision transformer",)]
+    links = sorted(session.query(PaperKeyword.paper_id, PaperKeyword.keyword_id).all())
+    aliases = sorted(session.query(KeywordAlias.alias_key, KeywordAlias.canonical_key).all())
+
+    second = repository.canonicalize_all()
+    assert second["merged_rows"] == 0
+    assert sorted(session.query(PaperKeyword.paper_id, PaperKeyword.keyword_id).all()) == links
+    assert sorted(session.query(KeywordAlias.alias_key, KeywordAlias.canonical_key).all()) == aliases
+
+    duplicates = (
+        session.query(PaperKeyword.paper_id, PaperKeyword.keyword_id)
+        .group_by(PaperKeyword.paper_id, PaperKeyword.keyword_id)
+        .having(func.count() > 1)
+        .all()
+    )
+    assert duplicates == []
+    # Every paper carried two spellings of one keyword and keeps a single link for it
+    assert len(links) == 5
+
+    # Later ingests resolve merged acronyms through keyword_alias
+    resolved = repository.resolve_many(["LLMs", "large language models", "ViT"], create_missing=False)
+    assert len(set(resolved.values())) == 2
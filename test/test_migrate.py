@@ -0,0 +1,65 @@
+"""
+Migration runner (database_helper/migrate.py): statement splitting and the PostgreSQL-only gate.
+
+    python -m pytest -q test/test_migrate.py
+"""
+import pytest
+from sqlalchemy import text
+
+from database_helper.migrate import MIGRATIONS_DIR, _split_statements, migrate
+from db_manager import DBManager
+
+
+def test_split_strips_comments_outside_quotes():
+    sql = """
+    -- leading comment; not a statement
+    INSERT INTO t (a, b) VALUES ('x -- y', 'it''s; fine'); -- trailing
+    /* block; comment */ SELECT "odd--name;" FROM t;
+    """
+    assert _split_statements(sql) == [
+        "INSERT INTO t (a, b) VALUES ('x -- y', 'it''s; fine')",
+        'SELECT "odd--name;" FROM t',
+    ]
+
+
+def test_split_keeps_dollar_quoted_bodies_whole():
+    sql = "DO $$\nBEGIN\n    PERFORM 1; -- keep\nEND\n$$;\nDROP INDEX IF EXISTS i;"
+    assert _split_statements(sql) == [
+        "DO $$\nBEGIN\n    PERFORM 1; -- keep\nEND\n$$",
+        "DROP INDEX IF EXISTS i",
+    ]
+
+
+def test_split_migration_files():
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        statements = _split_statements(path.read_text(encoding="utf-8"))
+        assert statements, path.name
+        assert not any(stmt.startswith(("--", "/*")) for stmt in statements), path.name
+    hnsw = _split_statements((MIGRATIONS_DIR / "007_pgvector_hnsw.sql").read_text(encoding="utf-8"))
+    assert hnsw[-1].endswith("WHERE model = 'sentence-transformers/all-mpnet-base-v2'")
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    manager = DBManager(f"sqlite:///{tmp_path}/migrate.db", reader_url=None)
+    manager.create_tables()
+    return manager
+
+
+def test_sqlite_refuses_to_migrate(sqlite_manager):
+    with pytest.raises(SystemExit, match="PostgreSQL-only"):
+        migrate(sqlite_manager)
+    with sqlite_manager.engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM schema_migrations")).scalar() == 0
+
+
+def test_sqlite_baseline(sqlite_manager, capsys):
+    migrate(sqlite_manager, baseline=True)
+    with sqlite_manager.engine.connect() as connection:
+        versions = [row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))]
+    assert sorted(versions) == [path.stem for path in sorted(MIGRATIONS_DIR.glob("*.sql"))]
+
+    capsys.readouterr()
+    migrate(sqlite_manager)  # nothing pending: no-op rather than an error
+    migrate(sqlite_manager, status_only=True)
+    assert "pending" not in capsys.readouterr().out
@@ -0,0 +1,102 @@
+"""
+Name normalization (name_normalizer): folding, cleaning, alias mapping and the column variant.
+
+    python -m pytest -q test/test_name_normalizer.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import name_normalizer
+from name_normalizer import clean, fold, load_aliases, normalize, normalize_series
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Zürich", "Zurich"),
+    ("Université de Montréal", "Universite de Montreal"),
+    ("Ångström", "Angstrom"),
+    ("plain", "plain"),
+])
+def test_fold(text, expected):
+    assert fold(text) == expected
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Université de Montréal.", "UNIVERSITE DE MONTREAL"),
+    ("  Carnegie   Mellon\tUniversity ", "CARNEGIE MELLON UNIVERSITY"),
+    ("Dept. of C.S., U.C. Berkeley", "DEPT OF CS UC BERKELEY"),
+    ("Mass Inst of Tech", "MASS INST OF TECH"),
+    ("", ""),
+])
+def test_clean(name, expected):
+    assert clean(name) == expected
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Massachusetts Institute of Technology", "MIT"),
+    ("mass inst. of tech", "MIT"),
+    ("MIT", "MIT"),
+    ("Université de Montréal.", "UNIVERSITE DE MONTREAL"),
+    ("", ""),
+    (None, None),
+])
+def test_normalize(name, expected):
+    assert normalize(name) == expected
+
+
+def test_load_aliases_merges_csv_and_config(tmp_path):
+    csv_path = tmp_path / "canonical.csv"
+    csv_path.write_text(
+        "alias,canonical\n"
+        "Univ. of Oxford,University of Oxford\n"
+        "CMU,Carnegie-Mellon Univ\n"
+        ",ignored\n",
+        encoding="utf-8",
+    )
+    org_config = {"tracked_organizations": {"US": [
+        {"name": "Carnegie Mellon University", "aliases": ["CMU", "Carnegie-Mellon"]},
+        {"name": "Stanford University"},
+    ]}}
+    aliases = load_aliases(org_config, str(csv_path))
+    assert aliases == {
+        "UNIV OF OXFORD": "UNIVERSITY OF OXFORD",
+        # organizations.yaml wins over the CSV
+        "CMU": "CARNEGIE MELLON UNIVERSITY",
+        "CARNEGIEMELLON": "CARNEGIE MELLON UNIVERSITY",
+    }
+    assert load_aliases({}, str(tmp_path / "missing.csv")) == {}
+
+
+def test_canonical_name_never_maps_elsewhere():
+    org_config = {"tracked_organizations": {"X": [
+        {"name": "Google", "aliases": ["Google DeepMind"]},
+        {"name": "Google DeepMind", "aliases": ["DeepMind"]},
+    ]}}
+    aliases = load_aliases(org_config, None)
+    assert "GOOGLE DEEPMIND" not in aliases
+    assert aliases == {"DEEPMIND": "GOOGLE DEEPMIND"}
+
+
+def test_normalize_uses_current_aliases(monkeypatch):
+    monkeypatch.setattr(name_normalizer, "ALIASES", {"FOO LAB": "BAR INSTITUTE"})
+    normalize.cache_clear()
+    try:
+        assert normalize("Foo Lab.") == "BAR INSTITUTE"
+    finally:
+        monkeypatch.undo()
+        normalize.cache_clear()
+    assert normalize("Foo Lab.") == "FOO LAB"
+
+
+def test_normalize_series_matches_normalize():
+    names = pd.Series(
+        ["Massachusetts Institute of Technology", None, "Zürich", np.nan, "Zürich", "MIT"],
+        index=[10, 11, 12, 13, 14, 15],
+        name="affiliation",
+    )
+    result = normalize_series(names)
+    assert result.name == "affiliation"
+    assert list(result.index) == list(names.index)
+    assert result.isna().tolist() == [False, True, False, True, False, False]
+    assert result.dropna().tolist() == ["MIT", "ZURICH", "ZURICH", "MIT"]
+    assert normalize_series(pd.Series([], dtype=object)).tolist() == []
@@ -0,0 +1,48 @@
+"""
+The ingest generation counter behind cached_query (repositories/query_cache.py).
+
+    python -m pytest -q test/test_query_cache.py
+"""
+import os
+import sys
+import threading
+import subprocess
+from pathlib import Path
+
+from repositories.query_cache import IngestGeneration
+
+ROOT = Path(__file__).parents[1]
+
+
+def _bump_with_timeout(generation: IngestGeneration, timeout: float = 5.0) -> int:
+    """bump() on a worker thread, so a deadlock fails the test instead of hanging it."""
+    result = []
+    worker = threading.Thread(target=lambda: result.append(generation.bump()), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    assert result, "bump() did not return (deadlock?)"
+    return result[0]
+
+
+def test_bump_twice(tmp_path):
+    generation = IngestGeneration(str(tmp_path / "generation"))
+    assert generation.current() == 0
+    assert _bump_with_timeout(generation) == 1
+    assert _bump_with_timeout(generation) == 2
+    assert generation.current() == 2
+
+
+def test_bump_existing_file_in_fresh_process(tmp_path):
+    path = tmp_path / "generation"
+    path.write_text("41", encoding="utf-8")
+    script = (
+        "from repositories.query_cache import IngestGeneration\n"
+        f"print(IngestGeneration({str(path)!r}).bump())\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=30,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "42"
+    assert IngestGeneration(str(path)).current() == 42
@@ -0,0 +1,106 @@
+"""
+Exact nearest-neighbour kernels in similarity_search, checked against a brute-force NumPy sort.
+
+    python -m pytest -q test/test_similarity_search.py
+"""
+import numpy as np
+import pytest
+
+from similarity_search import PaperVectorIndex, normalize_rows, top_k_similar
+
+
+def _corpus(rows: int = 60, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return normalize_rows(np.random.default_rng(seed).normal(size=(rows, dim)))
+
+
+def _brute_force(vectors, queries, k, mask=None):
+    scores = normalize_rows(queries) @ vectors.T
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    best = np.take_along_axis(scores, order, axis=1)
+    return np.where(np.isfinite(best), order, -1), best
+
+
+@pytest.mark.parametrize("k, block_rows", [(1, 7), (5, 7), (5, 1000), (12, 16)])
+def test_top_k_similar_matches_brute_force(k, block_rows):
+    vectors = _corpus()
+    queries = np.random.default_rng(1).normal(size=(9, 8))
+    rows, scores = top_k_similar(vectors, queries, k, block_rows=block_rows)
+    expected_rows, expected_scores = _brute_force(vectors, queries, k)
+    np.testing.assert_array_equal(rows, expected_rows)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_top_k_similar_masked_corpus_is_padded():
+    vectors = _corpus()
+    mask = np.zeros(len(vectors), dtype=bool)
+    mask[[3, 17, 41]] = True
+    queries = np.random.default_rng(2).normal(size=(4, 8))
+    rows, scores = top_k_similar(vectors, queries, 5, mask=mask, block_rows=10)
+    expected_rows, expected_scores = _brute_force(vectors, queries, 5, mask)
+    np.testing.assert_array_equal(rows, expected_rows)
+    assert set(rows[:, :3].ravel()) == {3, 17, 41}
+    assert (rows[:, 3:] == -1).all() and np.isneginf(scores[:, 3:]).all()
+    np.testing.assert_allclose(scores[:, :3], expected_scores[:, :3], rtol=1e-5)
+
+
+def test_top_k_similar_k_larger_than_corpus():
+    vectors = _corpus(rows=4)
+    rows, scores = top_k_similar(vectors, vectors[0], 10, block_rows=3)
+    assert rows.shape == scores.shape == (1, 10)
+    assert rows[0, 0] == 0
+    assert sorted(rows[0, :4]) == [0, 1, 2, 3]
+    assert (rows[0, 4:] == -1).all() and np.isneginf(scores[0, 4:]).all()
+
+
+def _index(rows: int = 60, instances: int = 3) -> PaperVectorIndex:
+    vectors = _corpus(rows)
+    paper_ids = np.arange(100, 100 + rows)
+    instance_ids = np.arange(rows) % instances
+    return PaperVectorIndex(paper_ids, vectors, instance_ids, np.full(rows, 2024))
+
+
+def _brute_force_related(index, k, same_instance):
+    scores = index.vectors @ index.vectors.T
+    np.fill_diagonal(scores, -np.inf)
+    if same_instance:
+        scores[index.instance_ids[:, None] != index.instance_ids[None, :]] = -np.inf
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    best = np.take_along_axis(scores, order, axis=1)
+    return np.where(np.isfinite(best), index.paper_ids[order], -1), best
+
+
+@pytest.mark.parametrize("same_instance", [False, True])
+@pytest.mark.parametrize("k, query_block", [(3, 7), (5, 1024)])
+def test_related_papers_all_matches_brute_force(same_instance, k, query_block):
+    index = _index()
+    paper_ids, neighbour_ids, scores = index.related_papers_all(k, same_instance=same_instance, query_block=query_block)
+    expected_ids, expected_scores = _brute_force_related(index, k, same_instance)
+    np.testing.assert_array_equal(paper_ids, index.paper_ids)
+    np.testing.assert_array_equal(neighbour_ids, expected_ids)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+    # A paper is never its own neighbour
+    assert not (neighbour_ids == paper_ids[:, None]).any()
+    if same_instance:
+        instance_of = dict(zip(index.paper_ids, index.instance_ids))
+        for paper_id, neighbours in zip(paper_ids, neighbour_ids):
+            assert all(instance_of[n] == instance_of[paper_id] for n in neighbours)
+
+
+def test_related_papers_all_pads_small_instances():
+    # Instance 1 holds a single paper and instance 0 three, so k=4 leaves every row padded
+    index = PaperVectorIndex(np.arange(4), _corpus(rows=4), np.array([0, 0, 1, 0]), np.full(4, 2024))
+    paper_ids, neighbour_ids, scores = index.related_papers_all(4, same_instance=True)
+    expected_ids, expected_scores = _brute_force_related(index, 4, same_instance=True)
+    np.testing.assert_array_equal(neighbour_ids, expected_ids)
+    assert (neighbour_ids[2] == -1).all() and np.isneginf(scores[2]).all()
+    assert (neighbour_ids[[0, 1, 3], 2:] == -1).all()
+    np.testing.assert_allclose(scores[:, :2], expected_scores[:, :2], rtol=1e-5)
+
+
+def test_search_excludes_query_paper():
+    index = _index()
+    hits = index.search(index.vector_of(105), k=5, exclude=105)
+    expected_ids, _ = _brute_force_related(index, 5, same_instance=False)
+    assert [paper_id for paper_id, _ in hits] == list(expected_ids[5])
@@ -0,0 +1,200 @@
+"""
+Research topics from paper embeddings.
+
+`fit` clusters every embedded paper with spherical mini-batch k-means: centroids are
+L2-normalized and compared by cosine similarity, and vectors are streamed from the
+PaperVectorIndex (an EmbeddingStore memmap when enabled) in sorted random batches, so
+memory stays at one batch plus the centroids. Topics are labelled with their most
+distinctive keywords.
+
+`update` assigns papers embedded since the last run (e.g. a newly ingested conference)
+to the nearest existing topic and moves those centroids by a running mean. Topic ids stay
+stable, so the per-instance counts in topic_instance_stats remain comparable across years
+and only the instances of the new papers are recounted.
+
+    python topic_clustering.py fit --topics 50
+    python topic_clustering.py update
+"""
+import math
+import logging
+import argparse
+from collections import Counter, defaultdict
+
+import numpy as np
+from sqlalchemy import select
+
+from config import EMBEDDING_MODEL
+from models import Keyword, PaperKeyword
+from repositories import StatisticsRepository, TopicRepository
+from repositories.query_cache import ingest_generation
+from similarity_search import get_paper_index, normalize_rows, SIMILARITY_BLOCK_ROWS
+
+logger = logging.getLogger(__name__)
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray, chunk_rows: int = SIMILARITY_BLOCK_ROWS):
+    """(label, cosine similarity) of the nearest centroid for each normalized row."""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    similarities = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), chunk_rows):
+        scores = vectors[start:start + chunk_rows] @ centroids.T
+        labels[start:start + len(scores)] = np.argmax(scores, axis=1)
+        similarities[start:start + len(scores)] = scores[np.arange(len(scores)), labels[start:start + len(scores)]]
+    return labels, similarities
+
+
+def _cluster_sums(vectors: np.ndarray, labels: np.ndarray, n_clusters: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-cluster vector sums and member counts, as one (clusters x rows) one-hot matmul."""
+    one_hot = np.zeros((n_clusters, len(vectors)), dtype=np.float32)
+    one_hot[labels, np.arange(len(vectors))] = 1.0
+    return one_hot @ vectors, np.bincount(labels, minlength=n_clusters)
+
+
+class SphericalMiniBatchKMeans:
+    """
+    Mini-batch k-means on the unit sphere (Sculley, 2010, with cosine similarity).
+    Each batch moves a centroid towards the mean of its batch members with a per-centroid
+    learning rate of members / total members seen, then re-normalizes it.
+    """
+
+    def __init__(self, n_clusters: int, batch_size: int = 4096, epochs: int = 3, seed: int = 0):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.rng = np.random.default_rng(seed)
+        self.centroids = None
+        self.counts = np.zeros(n_clusters, dtype=np.int64)
+
+    def _init_centroids(self, vectors: np.ndarray, sample_size: int = 20000):
+        """k-means++ seeding on a random sample."""
+        sample = vectors[np.sort(self.rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False))]
+        centroids = [sample[self.rng.integers(len(sample))]]
+        distance = 1.0 - sample @ centroids[0]
+        for _ in range(1, self.n_clusters):
+            weights = np.maximum(distance, 0)
+            total = weights.sum()
+            pick = self.rng.choice(len(sample), p=weights / total) if total > 0 else self.rng.integers(len(sample))
+            centroids.append(sample[pick])
+            distance = np.minimum(distance, 1.0 - sample @ sample[pick])
+        self.centroids = np.array(centroids, dtype=np.float32)
+
+    def partial_fit(self, batch: np.ndarray):
+        labels, _ = nearest_centroids(batch, self.centroids)
+        sums, members = _cluster_sums(batch, labels, self.n_clusters)
+        self.counts += members
+        hit = members > 0
+        rate = (members[hit] / self.counts[hit])[:, None].astype(np.float32)
+        self.centroids[hit] = normalize_rows(
+            (1 - rate) * self.centroids[hit] + rate * sums[hit] / members[hit][:, None]
+        )
+        return self
+
+    def fit(self, vectors: np.ndarray):
+        if len(vectors) < self.n_clusters:
+            raise ValueError(f"Cannot form {self.n_clusters} topics from {len(vectors)} papers.")
+        self._init_centroids(vectors)
+        for epoch in range(self.epochs):
+            order = self.rng.permutation(len(vectors))
+            for start in range(0, len(vectors), self.batch_size):
+                # Sorted rows read a memmap sequentially
+                self.partial_fit(np.asarray(vectors[np.sort(order[start:start + self.batch_size])]))
+            logger.info("k-means epoch %d/%d done", epoch + 1, self.epochs)
+        return self
+
+    def predict(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return nearest_centroids(vectors, self.centroids)
+
+
+def label_topics(session, paper_ids: np.ndarray, labels: np.ndarray, n_topics: int, words: int = 3) -> list[str]:
+    """
+    Name each topic by its most distinctive keywords: in-topic frequency weighted by
+    log(1 + average keyword mass per topic / the keyword's overall frequency) (class-based TF-IDF).
+    """
+    topic_of = dict(zip(paper_ids.tolist(), labels.tolist()))
+    counts = defaultdict(Counter)
+    totals = Counter()
+    for paper_id, keyword in session.execute(
+        select(PaperKeyword.paper_id, Keyword.keyword).join(Keyword, Keyword.keyword_id == PaperKeyword.keyword_id)
+    ):
+        topic = topic_of.get(paper_id)
+        if topic is not None:
+            counts[topic][keyword] += 1
+            totals[keyword] += 1
+
+    average = sum(totals.values()) / max(n_topics, 1)
+    names = []
+    for topic in range(n_topics):
+        keywords = counts.get(topic)
+        if not keywords:
+            names.append(f"Topic {topic}")
+            continue
+        best = sorted(keywords, key=lambda kw: (-keywords[kw] * math.log(1 + average / totals[kw]), kw))[:words]
+        names.append(" / ".join(best)[:255])
+    return names
+
+
+def fit_topics(session, model: str = EMBEDDING_MODEL, n_topics: int = 50, batch_size: int = 4096,
+               epochs: int = 3, seed: int = 0) -> dict:
+    """Cluster all embedded papers from scratch, replacing the stored topics."""
+    index = get_paper_index(session, model)
+    kmeans = SphericalMiniBatchKMeans(n_topics, batch_size=batch_size, epochs=epochs, seed=seed).fit(index.vectors)
+    labels, similarities = kmeans.predict(index.vectors)
+    paper_counts = np.bincount(labels, minlength=n_topics)
+
+    repository = TopicRepository(session)
+    repository.replace_topics(
+        model, kmeans.centroids, paper_counts, label_topics(session, index.paper_ids, labels, n_topics)
+    )
+    repository.assign_papers(index.paper_ids, labels, similarities)
+    session.commit()
+    StatisticsRepository(session).refresh_topic_stats()
+    ingest_generation.bump()
+    return {"papers": len(index), "topics": n_topics, "empty_topics": int((paper_counts == 0).sum())}
+
+
+def update_topics(session, model: str = EMBEDDING_MODEL) -> dict:
+    """Assign papers without a topic to the nearest existing one and fold them into its centroid."""
+    repository = TopicRepository(session)
+    topic_ids, centroids, paper_counts = repository.load_centroids(model)
+    index = get_paper_index(session, model)
+    assigned = np.fromiter(repository.get_assigned_paper_ids(), dtype=np.int64)
+    rows = np.flatnonzero(~np.isin(index.paper_ids, assigned))
+    if not len(rows):
+        return {"assigned": 0}
+
+    vectors = np.asarray(index.vectors[rows])
+    labels, similarities = nearest_centroids(vectors, centroids)
+    sums, members = _cluster_sums(vectors, labels, len(topic_ids))
+    # centroid * count stands in for the sum of the members seen so far
+    moved = members > 0
+    centroids[moved] = normalize_rows(centroids[moved] * paper_counts[moved][:, None] + sums[moved])
+    paper_counts += members
+
+    repository.update_centroids(topic_ids[moved], centroids[moved], paper_counts[moved])
+    repository.assign_papers(index.paper_ids[rows], topic_ids[labels], similarities)
+    session.commit()
+    instance_ids = sorted(set(index.instance_ids[rows].tolist()))
+    StatisticsRepository(session).refresh_topic_stats(instance_ids)
+    ingest_generation.bump()
+    return {"assigned": len(rows), "topics_moved": int(moved.sum()), "instances": instance_ids}
+
+
+if __name__ == "__main__":
+    from db_manager import DBManager
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['fit', 'update'], help='fit: recluster everything; update: assign new papers')
+    parser.add_argument('--model', default=EMBEDDING_MODEL, help='embedding model name')
+    parser.add_argument('--topics', type=int, default=50, help='number of topics (fit only)')
+    parser.add_argument('--epochs', type=int, default=3, help='passes over the embeddings (fit only)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    session = DBManager(reader_url=None).get_session()
+    try:
+        if args.command == 'fit':
+            print(fit_topics(session, args.model, n_topics=args.topics, epochs=args.epochs))
+        else:
+            print(update_topics(session, args.model))
+    finally:
+        session.close()
@@ -1,14 +1,24 @@
 import re
-import requests
+import ast
 import pandas as pd
 from datetime import datetime
 from bs4 import BeautifulSoup
+from http_cache import get_shared_session
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet input is optional
+    pq = None
+
+# Metadata columns that hold lists (author ids, author names, keywords)
+LIST_COLUMNS = ("author_ids", "author_names", "keywords")
 
 def get_date_from_openreview(url: str) -> str:
     """
     Extract the date from the OpenReview URL.
     """
-    response = requests.get(url)
+    date = None
+    response = get_shared_session().get(url, timeout=30)
 
     if response.status_code == 200:
         html = response.text
@@ -55,9 +65,31 @@ def extract_conference_and_year(text: str):
         return conference_name, year
     return None, None
 
+def load_metadata(path: str, columns: list = None) -> pd.DataFrame:
+    """
+    Load harvested conference metadata from a CSV or Parquet file.
+    List-valued columns are returned as Python lists in both cases: Parquet stores them
+    natively and is memory-mapped, CSV cells are parsed back from their Python literals.
+    """
+    if path.endswith(".parquet"):
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet metadata: pip install pyarrow")
+        table = pq.read_table(path, columns=columns, memory_map=True)
+        list_columns = [c for c in LIST_COLUMNS if c in table.column_names]
+        df = table.drop(list_columns).to_pandas()
+        for col in list_columns:
+            df[col] = table.column(col).to_pylist()
+        return df[table.column_names]
+
+    df = pd.read_csv(path, usecols=columns)
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: ast.literal_eval(v) if isinstance(v, str) and v else [])
+    return df
+
 def check_venue_matches(csv_file: str, provided_conference: str, provided_year: int) -> bool:
-    # Read CSV into a DataFrame.
-    df = pd.read_csv(csv_file)
+    # Read the venue column into a DataFrame.
+    df = load_metadata(csv_file, columns=["venue"])
     
     # Get the venue from the first row.
     venue_value = df.iloc[0]['venue']